@@ -48,8 +48,8 @@ if ! $PYTHON_BIN -c "import PyInstaller" >/dev/null 2>&1; then
   $PYTHON_BIN -m pip install pyinstaller
 fi
 
-# Shapely / ezdxf are required by the generator
-$PYTHON_BIN -m pip install --upgrade ezdxf shapely >/dev/null
+# ezdxf / NumPy are required by the generator, Shapely by outline panels
+$PYTHON_BIN -m pip install --upgrade ezdxf numpy shapely >/dev/null
 
 # -------- Clean old artifacts --------------------------------------------------
 if [[ "$CLEAN" == "1" ]]; then
@@ -76,10 +76,12 @@ else
   say "Icon not found ($ICON); continuing without custom icon."
 fi
 
-# Collect all data/hooks for shapely & ezdxf to avoid missing libs at runtime
+# Collect all data/hooks for shapely & ezdxf to avoid missing libs at runtime;
+# the perfdxf package imports some of its modules lazily, so collect it whole
 COLLECT_ARGS="
   --collect-all shapely
   --collect-all ezdxf
+  --collect-submodules perfdxf
 "
 
 # -------- Build ----------------------------------------------------------------
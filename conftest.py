@@ -0,0 +1,2 @@
+# conftest.py
+# Lets the tests import the perfdxf package from the repository root.
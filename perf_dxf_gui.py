@@ -1,150 +1,66 @@
 # perf_dxf_gui.py
 # GUI wrapper for Perf DXF Generator with increased row spacing and icon support.
-# Dependencies: ezdxf, shapely  (pip install ezdxf shapely)
-
-import math
+# A preview canvas beside the form redraws shortly after each edit, with the
+# open area and cut length of the spec (estimate.py) below it.
+# Dependencies: ezdxf, numpy  (pip install ezdxf numpy)
+
+import os
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from pathlib import Path
 
-import ezdxf
-from shapely.geometry import Polygon, Point
-from shapely.affinity import translate
-
-
-# ---------------- Core generator (unchanged behavior) ----------------
-def generate_dxf(params, save_path):
-    shape_choice = params["shape_choice"]
-    offset = float(params["offset"])
-    hole_shape_choice = params["hole_shape_choice"]
-    hole_size = float(params["hole_size"])
-    spacing = float(params["spacing"])
-    pattern_choice = params["pattern_choice"]
-    keep_clipped = bool(params["keep_clipped"])
-
-    hole_radius = hole_size / 2.0 if hole_shape_choice == "circle" else None
-    step = spacing  # center-to-center
-
-    doc = ezdxf.new()
-    doc.header["$INSUNITS"] = 1
-    msp = doc.modelspace()
-
-    for lname, color in [("OUTER", 7), ("HOLES", 3), ("HOLES-CLIPPED", 1)]:
-        if lname not in doc.layers:
-            doc.layers.add(name=lname, color=color)
-
-    if shape_choice == "rectangle":
-        outer_length = float(params["outer_length"])
-        outer_width = float(params["outer_width"])
-        inner_length = outer_length - 2 * offset
-        inner_width = outer_width - 2 * offset
-        if inner_length <= 0 or inner_width <= 0:
-            raise ValueError("Offset too large for given rectangle dimensions.")
-
-        outer_rect = Polygon([
-            (-outer_length / 2, -outer_width / 2),
-            ( outer_length / 2, -outer_width / 2),
-            ( outer_length / 2,  outer_width / 2),
-            (-outer_length / 2,  outer_width / 2),
-        ])
-        msp.add_lwpolyline(list(outer_rect.exterior.coords), close=True, dxfattribs={"layer": "OUTER"})
-
-        inner_region = Polygon([
-            (-inner_length / 2, -inner_width / 2),
-            ( inner_length / 2, -inner_width / 2),
-            ( inner_length / 2,  inner_width / 2),
-            (-inner_length / 2,  inner_width / 2),
-        ])
-        grid_span_x = inner_length
-        grid_span_y = inner_width
-        half_x = inner_length / 2
-        half_y = inner_width / 2
-    else:
-        outer_diameter = float(params["outer_diameter"])
-        inner_radius = (outer_diameter / 2) - offset
-        if inner_radius <= 0:
-            raise ValueError("Offset too large for given diameter.")
-        msp.add_circle(center=(0, 0), radius=outer_diameter / 2, dxfattribs={"layer": "OUTER"})
-        inner_region = Point(0, 0).buffer(inner_radius, resolution=180)
-        grid_span_x = grid_span_y = inner_radius * 2
-
-    def square_geom_centered(s):
-        h = s / 2.0
-        return Polygon([(-h, -h), (h, -h), (h, h), (-h, h)])
-
-    square_proto = square_geom_centered(hole_size) if hole_shape_choice == "square" else None
-
-    if pattern_choice == "straight":
-        nx = math.ceil(grid_span_x / step) + 1
-        ny = math.ceil(grid_span_y / step) + 1
-        wX = (nx - 1) * step
-        wY = (ny - 1) * step
-        x0 = -wX / 2
-        y0 = -wY / 2
-        centers = [(x0 + i * step, y0 + j * step) for i in range(nx) for j in range(ny)]
-    else:
-        row_step = step * math.sqrt(3) / 2.0
-        ny = math.ceil(grid_span_y / row_step) + 1
-        nx = math.ceil(grid_span_x / step) + 2
-        wX = (nx - 1) * step
-        wY = (ny - 1) * row_step
-        x0 = -wX / 2
-        y0 = -wY / 2
-        centers = []
-        for j in range(ny):
-            y = y0 + j * row_step
-            xoff = step / 2.0 if (j % 2 == 1) else 0.0
-            for i in range(nx):
-                centers.append((x0 + i * step + xoff, y))
-
-    for (x, y) in centers:
-        if hole_shape_choice == "circle":
-            if shape_choice == "rectangle":
-                full_inside = (abs(x) <= half_x - hole_radius) and (abs(y) <= half_y - hole_radius)
-            else:
-                full_inside = (math.hypot(x, y) <= inner_radius - hole_radius)
-            if full_inside:
-                msp.add_circle(center=(x, y), radius=hole_radius, dxfattribs={"layer": "HOLES"})
-            else:
-                if not keep_clipped:
-                    continue
-                circle_poly = Point(x, y).buffer(hole_radius, resolution=96)
-                clipped = circle_poly.intersection(inner_region)
-                if clipped.is_empty:
-                    continue
-                if clipped.geom_type == "Polygon":
-                    msp.add_lwpolyline(list(clipped.exterior.coords), close=True,
-                                       dxfattribs={"layer": "HOLES-CLIPPED"})
-                elif clipped.geom_type == "MultiPolygon":
-                    for geom in clipped.geoms:
-                        msp.add_lwpolyline(list(geom.exterior.coords), close=True,
-                                           dxfattribs={"layer": "HOLES-CLIPPED"})
-        else:
-            if shape_choice == "rectangle":
-                s2 = hole_size / 2.0
-                full_inside = (abs(x) <= half_x - s2) and (abs(y) <= half_y - s2)
-            else:
-                r_sq = (hole_size * math.sqrt(2)) / 2.0
-                full_inside = (math.hypot(x, y) <= inner_radius - r_sq)
-            if full_inside:
-                sq = translate(square_proto, xoff=x, yoff=y)
-                msp.add_lwpolyline(list(sq.exterior.coords), close=True, dxfattribs={"layer": "HOLES"})
-            else:
-                if not keep_clipped:
-                    continue
-                g = translate(square_proto, xoff=x, yoff=y)
-                clipped = g.intersection(inner_region)
-                if clipped.is_empty:
-                    continue
-                if clipped.geom_type == "Polygon":
-                    msp.add_lwpolyline(list(clipped.exterior.coords), close=True,
-                                       dxfattribs={"layer": "HOLES-CLIPPED"})
-                elif clipped.geom_type == "MultiPolygon":
-                    for geom in clipped.geoms:
-                        msp.add_lwpolyline(list(geom.exterior.coords), close=True,
-                                           dxfattribs={"layer": "HOLES-CLIPPED"})
-
-    doc.saveas(save_path)
+from perfdxf.params import check_params
+from perfdxf.generator import generate_dxf
+from perfdxf.instrument import Observer, Cancelled
+from perfdxf.preview import Preview, OUTER_COLOR, HOLE_RGB, CLIPPED_RGB
+
+POLL_MS = 50  # how often the UI drains worker events
+PREVIEW_MS = 150  # preview redraws wait for this long a pause in typing
+PREVIEW_SIZE = 420  # canvas pixels, square
+
+
+class _Job(Observer):
+    """One queued generation; also observes its own run to report progress.
+
+    Runs on the worker thread, so it only posts events; the Tk side reads
+    them in PerfDXFGUI._poll.
+    """
+
+    def __init__(self, params, path, use_cache, events):
+        self.params = params
+        self.path = path
+        self.use_cache = use_cache
+        self.cancelled = threading.Event()
+        self._events = events
+
+    @property
+    def name(self):
+        return Path(self.path).name
+
+    def on_phase(self, name, start, seconds):
+        if self.cancelled.is_set():
+            raise Cancelled()
+
+    def on_progress(self, done, total):
+        if self.cancelled.is_set():
+            raise Cancelled()
+        self._events.put(("progress", self, done, total))
+
+    def run(self):
+        """Generate; returns True if served from the cache."""
+        if self.cancelled.is_set():
+            raise Cancelled()
+        if self.use_cache:
+            from perfdxf.cache import DXFCache
+            return DXFCache().generate(self.params, self.path, observers=[self])
+        # write beside the target and move it into place, so self.path is never half written
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        generate_dxf(self.params, tmp, observers=[self])
+        os.replace(tmp, self.path)
+        return False
 
 
 # ---------------- Tk GUI ----------------
@@ -176,6 +92,7 @@ class PerfDXFGUI(tk.Tk):
         self.spacing = tk.StringVar(value="2.0")
         self.pattern_choice = tk.StringVar(value="straight")
         self.keep_clipped = tk.BooleanVar(value=True)
+        self.use_cache = tk.BooleanVar(value=True)
 
         # Common padding
         self.row_gap = row_gap
@@ -248,13 +165,57 @@ class PerfDXFGUI(tk.Tk):
                         variable=self.keep_clipped).grid(row=r, column=0, columnspan=2, sticky="w", pady=(0, self.row_gap))
         r += 1
 
+        # Result cache
+        ttk.Checkbutton(frm, text="Reuse previously generated files (result cache)",
+                        variable=self.use_cache).grid(row=r, column=0, columnspan=2, sticky="w", pady=(0, self.row_gap))
+        r += 1
+
+        # Progress
+        self.progress = ttk.Progressbar(frm, orient="horizontal", mode="determinate", maximum=100)
+        self.progress.grid(row=r, column=0, columnspan=2, sticky="ew", pady=(0, 4))
+        r += 1
+        self.status = tk.StringVar(value="Ready")
+        ttk.Label(frm, textvariable=self.status).grid(row=r, column=0, columnspan=2, sticky="w",
+                                                       pady=(0, self.row_gap))
+        r += 1
+
         # Buttons
         btns = ttk.Frame(frm)
         btns.grid(row=r, column=0, columnspan=2, sticky="e")
         ttk.Button(btns, text="Generate DXF…", command=self.on_generate).grid(row=0, column=0, padx=(0, 10))
-        ttk.Button(btns, text="Quit", command=self.destroy).grid(row=0, column=1)
+        self.cancel_btn = ttk.Button(btns, text="Cancel", command=self.on_cancel, state="disabled")
+        self.cancel_btn.grid(row=0, column=1, padx=(0, 10))
+        ttk.Button(btns, text="Quit", command=self.on_quit).grid(row=0, column=2)
+
+        # Preview
+        pv = ttk.Frame(self, padding=(0, padx, padx, padx))
+        pv.grid(row=0, column=1, sticky="n")
+        self.canvas = tk.Canvas(pv, width=PREVIEW_SIZE, height=PREVIEW_SIZE, bg="white",
+                                highlightthickness=1, highlightbackground="#c0c0c0")
+        self.canvas.grid(row=0, column=0)
+        self.preview_status = tk.StringVar(value="")
+        ttk.Label(pv, textvariable=self.preview_status).grid(row=1, column=0, sticky="w", pady=(4, 0))
+        self.estimate_text = tk.StringVar(value="")
+        ttk.Label(pv, textvariable=self.estimate_text).grid(row=2, column=0, sticky="w")
+        self._preview = Preview(PREVIEW_SIZE, PREVIEW_SIZE)
+        self._preview_after = None
+        self._preview_image = None  # Tk drops images nothing references
+        for var in (self.shape_choice, self.outer_length, self.outer_width, self.outer_diameter, self.offset,
+                    self.hole_shape_choice, self.hole_size, self.spacing, self.pattern_choice, self.keep_clipped):
+            var.trace_add("write", self._schedule_preview)
 
         self._toggle_outer_fields()
+        self._redraw_preview()
+
+        # Background generation: jobs run one after another on a worker thread
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()
+        self._current = None
+        self._pending = 0  # queued + running
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+        self.protocol("WM_DELETE_WINDOW", self.on_quit)
+        self.after(POLL_MS, self._poll)
 
     def _toggle_outer_fields(self):
         is_rect = self.shape_choice.get() == "rectangle"
@@ -266,40 +227,59 @@ class PerfDXFGUI(tk.Tk):
         for child in self.circ_frame.winfo_children():
             child.configure(state=state_circ)
 
-    def _float(self, s, name):
+    # ---------------- Preview ----------------
+    def _schedule_preview(self, *_):
+        if self._preview_after is not None:
+            self.after_cancel(self._preview_after)
+        self._preview_after = self.after(PREVIEW_MS, self._redraw_preview)
+
+    def _redraw_preview(self):
+        self._preview_after = None
         try:
-            return float(s)
-        except Exception:
-            raise ValueError(f"{name} must be a number.")
+            params = self._validate()
+        except Exception as e:
+            self.preview_status.set(f"Invalid: {e}")
+            return  # keep the last good picture
+        t0 = time.perf_counter()
+        scene = self._preview.update(params)
+        c = self.canvas
+        c.delete("all")
+        self._preview_image = None
+        if scene.too_many:
+            self.preview_status.set(f"Too many holes to preview ({scene.too_many:,} positions)")
+            self.estimate_text.set("")
+            return
+        if scene.image is not None:
+            self._preview_image = tk.PhotoImage(data=scene.image, format="PPM")
+            c.create_image(0, 0, image=self._preview_image, anchor="nw")
+        hole = "#%02x%02x%02x" % HOLE_RGB
+        draw = c.create_oval if scene.hole_shape == "circle" else c.create_rectangle
+        for box in scene.holes:
+            draw(*box, outline=hole)
+        clipped = "#%02x%02x%02x" % CLIPPED_RGB
+        for line in scene.clipped:
+            c.create_line(*line, fill=clipped)
+        for line in scene.outer:
+            c.create_line(*line, fill=OUTER_COLOR)
+        ms = (time.perf_counter() - t0) * 1000.0
+        extra = f" ({scene.clipped_count:,} clipped)" if scene.clipped_count else ""
+        self.preview_status.set(f"{scene.full:,} holes{extra} — preview {ms:.0f} ms")
+        est = scene.estimate
+        self.estimate_text.set(f"Open area {est['open_area_pct']:.2f}% — cut length {est['cut_length']:,.1f} in")
 
     def _validate(self):
-        params = dict(
+        return check_params(dict(
             shape_choice=self.shape_choice.get(),
-            offset=self._float(self.offset.get(), "Offset"),
+            offset=self.offset.get(),
             hole_shape_choice=self.hole_shape_choice.get(),
-            hole_size=self._float(self.hole_size.get(), "Hole size"),
-            spacing=self._float(self.spacing.get(), "Spacing"),
+            hole_size=self.hole_size.get(),
+            spacing=self.spacing.get(),
             pattern_choice=self.pattern_choice.get(),
             keep_clipped=self.keep_clipped.get(),
-        )
-        if params["hole_size"] <= 0: raise ValueError("Hole size must be > 0.")
-        if params["spacing"] <= 0: raise ValueError("Spacing (center-to-center) must be > 0.")
-        if params["offset"] < 0: raise ValueError("Offset must be ≥ 0.")
-
-        if params["shape_choice"] == "rectangle":
-            params["outer_length"] = self._float(self.outer_length.get(), "Length")
-            params["outer_width"]  = self._float(self.outer_width.get(), "Width")
-            if params["outer_length"] <= 0 or params["outer_width"] <= 0:
-                raise ValueError("Length and Width must be > 0.")
-            if (params["outer_length"] - 2*params["offset"] <= 0) or (params["outer_width"] - 2*params["offset"] <= 0):
-                raise ValueError("Offset too large for given rectangle dimensions.")
-        else:
-            params["outer_diameter"] = self._float(self.outer_diameter.get(), "Diameter")
-            if params["outer_diameter"] <= 0:
-                raise ValueError("Diameter must be > 0.")
-            if (params["outer_diameter"]/2 - params["offset"] <= 0):
-                raise ValueError("Offset too large for given diameter.")
-        return params
+            outer_length=self.outer_length.get(),
+            outer_width=self.outer_width.get(),
+            outer_diameter=self.outer_diameter.get(),
+        ))
 
     def on_generate(self):
         try:
@@ -318,12 +298,101 @@ class PerfDXFGUI(tk.Tk):
         )
         if not path:
             return
+        self._pending += 1
+        self._jobs.put(_Job(params, path, self.use_cache.get(), self._events))
+        self._show_status()
+
+    def on_cancel(self):
+        job = self._current
+        if job is not None:
+            job.cancelled.set()
+            self.status.set(f"Cancelling {job.name}…")
+
+    def on_quit(self):
+        # Stop the running job so it can remove its partial file, and drop the queue
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            job.cancelled.set()
+        if self._current is not None:
+            self._current.cancelled.set()
+            self.status.set(f"Stopping {self._current.name}…")
+            self.update_idletasks()
+        self._jobs.put(None)
+        # wait for it however long the save takes: a killed worker would leave its temp file behind
+        self._worker.join()
+        self.destroy()
+
+    # ---------------- Worker thread ----------------
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._events.put(("start", job))
+            try:
+                cached = job.run()
+            except Cancelled:
+                self._events.put(("cancelled", job))
+            except Exception as e:
+                self._events.put(("error", job, e))
+            else:
+                self._events.put(("done", job, cached))
+
+    # ---------------- Tk side ----------------
+    def _poll(self):
         try:
-            generate_dxf(params, path)
-        except Exception as e:
-            messagebox.showerror("Generation error", f"Failed to generate DXF:\n{e}")
+            while True:
+                self._handle(*self._events.get_nowait())
+        except queue.Empty:
+            pass
+        self.after(POLL_MS, self._poll)
+
+    def _handle(self, kind, job, *args):
+        if kind == "start":
+            self._current = job
+            self.progress["value"] = 0
+            self.cancel_btn.configure(state="normal")
+            self._show_status()
+            return
+        if kind == "progress":
+            done, total = args
+            if job is self._current and total:
+                self.progress["value"] = 100.0 * done / total
+                self._show_status("Saving" if done >= total else None)
+            return
+
+        # The job has ended one way or another
+        self._current = None
+        self._pending -= 1
+        self.cancel_btn.configure(state="disabled")
+        if kind == "done":
+            self.progress["value"] = 100
+            cached = " (from cache)" if args[0] else ""
+            self.status.set(f"Saved: {job.name}{cached}" + self._queued_text())
+            if not self._pending:
+                messagebox.showinfo("Success", f"Saved: {job.path}{cached}")
+        elif kind == "cancelled":
+            self.progress["value"] = 0
+            self.status.set(f"Cancelled {job.name}" + self._queued_text())
+        else:
+            self.progress["value"] = 0
+            self.status.set(f"Failed: {job.name}" + self._queued_text())
+            messagebox.showerror("Generation error", f"Failed to generate DXF:\n{args[0]}")
+
+    def _queued_text(self):
+        waiting = self._pending - (self._current is not None)
+        return f" — {waiting} queued" if waiting > 0 else ""
+
+    def _show_status(self, verb=None):
+        job = self._current
+        if job is None:
+            self.status.set("Queued" + self._queued_text())
             return
-        messagebox.showinfo("Success", f"Saved: {path}")
+        verb = verb or "Generating"
+        self.status.set(f"{verb} {job.name}… {self.progress['value']:.0f}%" + self._queued_text())
 
 
 if __name__ == "__main__":
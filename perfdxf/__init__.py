@@ -0,0 +1,36 @@
+# perfdxf
+# Perforated panel DXF generator: importable core shared by the GUI, CLI and batch tools.
+#
+#   from perfdxf import generate_dxf, check_params
+#   generate_dxf(check_params({...}), "panel.dxf")
+#
+# Submodules are imported on first use, so "import perfdxf" stays cheap and
+# ezdxf / tkinter are never loaded unless the caller needs them.
+
+import importlib
+
+_EXPORTS = {
+    "check_params": "params",
+    "OPTION_DEFAULTS": "params",
+    "CHOICES": "params",
+    "generate_dxf": "generator",
+    "GENERATOR_VERSION": "generator",
+    "Observer": "instrument",
+    "Lattice": "grid",
+    "DXFStreamWriter": "dxf_stream",
+    "DXFCache": "cache",
+    "estimate": "estimate",
+    "search": "optimize",
+    "run_batch": "batch",
+    "load_manifest": "batch",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
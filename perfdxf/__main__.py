@@ -0,0 +1,8 @@
+# __main__.py
+# python -m perfdxf ...  (see cli.py)
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
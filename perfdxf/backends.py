@@ -0,0 +1,405 @@
+# backends.py
+# Streaming output backends besides the ASCII DXF writer (dxf_stream.py):
+#
+# - "dxf-binary": the same DXF R12 drawing as dxf-stream in binary DXF, with
+#   coordinates as 8-byte doubles instead of decimal text.  ezdxf and most
+#   CAD programs read it directly.
+# - "svg": an SVG drawing in inches (y up), for quick previews in a browser.
+#   Layers become CSS classes, the HOLE block becomes a <symbol>.
+# - "gcode": plain G-code for the punch cell.  Full holes are single hits at
+#   their centers; clipped holes and the outline are contoured with G01/G02/
+#   G03 moves.  The M codes for a hit and for contouring depend on the
+#   machine's post-processor, so they are writer arguments.
+#
+# Each writer takes the same modelspace-style calls as DXFStreamWriter
+# (add_circle, add_lwpolyline, add_blockref, new_block), so generate_dxf
+# feeds every format the same classified and clipped hole stream, one entity
+# at a time, with no ezdxf document in between.
+
+import math
+import struct
+
+from .dxf_stream import LAYERS, FLUSH_BYTES
+
+
+class _Block:
+    """Block entities recorded as (kind, args) for the writer to render or replay."""
+
+    def __init__(self, name):
+        self.name = name
+        self.entities = []
+
+    def add_circle(self, center, radius, dxfattribs=None):
+        self.entities.append(("circle", (center, radius, dxfattribs)))
+
+    def add_lwpolyline(self, points, format="xyseb", close=False, dxfattribs=None):
+        self.entities.append(("lwpolyline", (points, format, close, dxfattribs)))
+
+
+def _grid(insert, attribs):
+    """Insertion points of an INSERT, or of every cell of a MINSERT array."""
+    x, y = insert[0], insert[1]
+    cols = int(attribs.get("column_count", 1))
+    rows = int(attribs.get("row_count", 1))
+    dx = float(attribs.get("column_spacing", 0.0))
+    dy = float(attribs.get("row_spacing", 0.0))
+    return [(x + c * dx, y + r * dy) for r in range(rows) for c in range(cols)]
+
+
+def _vertices(points, format):
+    """(x, y, bulge) of each point laid out as in ``format``."""
+    bi = format.find("b")
+    return [(float(p[0]), float(p[1]), float(p[bi]) if bi >= 0 and len(p) > bi else 0.0) for p in points]
+
+
+def _arc(x0, y0, x1, y1, bulge):
+    """(center x, center y, radius) of the bulge arc from (x0, y0) to (x1, y1)."""
+    c = math.hypot(x1 - x0, y1 - y0)
+    off = c * (1.0 - bulge * bulge) / (4.0 * bulge)  # center left of the chord for CCW arcs
+    cx = (x0 + x1) / 2.0 - (y1 - y0) / c * off
+    cy = (y0 + y1) / 2.0 + (x1 - x0) / c * off
+    return cx, cy, c * (1.0 + bulge * bulge) / (4.0 * abs(bulge))
+
+
+class StreamWriter:
+    """Buffered output to a binary stream or path; subclasses render entities to bytes.
+
+    Same life cycle as DXFStreamWriter: blocks first, then entities, then
+    close() (or abort() on failure).  The stream is only closed when the
+    writer opened it from a path.
+    """
+
+    def __init__(self, target):
+        if hasattr(target, "write"):
+            self._stream = target
+            self._owns_stream = False
+        else:
+            self._stream = open(target, "wb")
+            self._owns_stream = True
+        self._blocks = {}
+        self._buf = []
+        self._buf_len = 0
+        self.entities_written = 0
+        self.bytes_written = 0
+        self._started = False
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self):
+        """Stop without writing the trailer; closes the stream if we opened it."""
+        self._closed = True
+        self._buf = []
+        if self._owns_stream:
+            self._stream.close()
+
+    def new_block(self, name):
+        """Define a block; must happen before the first entity, as with DXFStreamWriter."""
+        if self._started:
+            raise RuntimeError("Blocks must be defined before any entity is written.")
+        block = self._blocks[name] = _Block(name)
+        return block
+
+    # ---------------- Subclass hooks ----------------
+    def _head(self):
+        return b""
+
+    def _tail(self):
+        return b""
+
+    # ---------------- Buffering ----------------
+    def _emit(self, data, count=1):
+        if not self._started:
+            self._started = True
+            self._buf.append(self._head())
+        self._buf.append(data)
+        self._buf_len += len(data)
+        self.entities_written += count
+        if self._buf_len >= FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self):
+        data = b"".join(self._buf)
+        self._stream.write(data)
+        self.bytes_written += len(data)
+        self._buf = []
+        self._buf_len = 0
+
+    def close(self):
+        """Write the trailer and flush everything."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._started:
+            self._started = True
+            self._buf.append(self._head())
+        self._buf.append(self._tail())
+        self._flush()
+        if self._owns_stream:
+            self._stream.close()
+        elif hasattr(self._stream, "flush"):
+            self._stream.flush()
+
+
+# ---------------- Binary DXF ----------------
+_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+_REAL = struct.Struct("<Bd")
+_INT = struct.Struct("<Bh")
+_XYZ = struct.Struct("<BdBdBd")
+_CIRCLE = struct.Struct("<BdBdBdBd")
+
+
+def _tags(*pairs):
+    """R12 binary tags: 1-byte group codes; strings, 16-bit ints or doubles by code range."""
+    parts = []
+    for code, value in pairs:
+        if code < 10:
+            parts.append(bytes((code,)) + str(value).encode("ascii") + b"\x00")
+        elif code < 60:
+            parts.append(_REAL.pack(code, value))
+        else:
+            parts.append(_INT.pack(code, value))
+    return b"".join(parts)
+
+
+class BinaryDXFWriter(StreamWriter):
+    """DXF R12 in binary DXF encoding; the entities of DXFStreamWriter, tag for tag."""
+
+    def __init__(self, target, layers=LAYERS, insunits=1):
+        super().__init__(target)
+        self._layers = list(layers)
+        self._insunits = insunits
+        self._prefix = {}  # (entity, layer) -> encoded type and layer tags
+
+    def _start(self, kind, layer):
+        key = (kind, layer)
+        prefix = self._prefix.get(key)
+        if prefix is None:
+            prefix = self._prefix[key] = _tags((0, kind), (8, layer))
+        return prefix
+
+    def _circle(self, layer, x, y, r):
+        return self._start("CIRCLE", layer) + _CIRCLE.pack(10, x, 20, y, 30, 0.0, 40, r)
+
+    def _polyline(self, layer, points, format, close):
+        parts = [self._start("POLYLINE", layer), _tags((66, 1), (10, 0.0), (20, 0.0), (30, 0.0),
+                                                       (70, 1 if close else 0))]
+        vertex = self._start("VERTEX", layer)
+        for x, y, b in _vertices(points, format):
+            parts.append(vertex + _XYZ.pack(10, x, 20, y, 30, 0.0))
+            if b:
+                parts.append(_REAL.pack(42, b))
+        parts.append(self._start("SEQEND", layer))
+        return b"".join(parts)
+
+    def _head(self):
+        parts = [
+            _SENTINEL,
+            _tags((0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, "AC1009"),
+                  (9, "$INSUNITS"), (70, int(self._insunits)), (0, "ENDSEC")),
+            _tags((0, "SECTION"), (2, "TABLES"), (0, "TABLE"), (2, "LTYPE"), (70, 1),
+                  (0, "LTYPE"), (2, "CONTINUOUS"), (70, 0), (3, "Solid line"), (72, 65), (73, 0), (40, 0.0),
+                  (0, "ENDTAB"), (0, "TABLE"), (2, "LAYER"), (70, len(self._layers) + 1)),
+        ]
+        for name, color in [("0", 7)] + self._layers:
+            parts.append(_tags((0, "LAYER"), (2, name), (70, 0), (62, int(color)), (6, "CONTINUOUS")))
+        parts.append(_tags((0, "ENDTAB"), (0, "ENDSEC"), (0, "SECTION"), (2, "BLOCKS")))
+        for block in self._blocks.values():
+            parts.append(_tags((0, "BLOCK"), (8, "0"), (2, block.name), (70, 0),
+                               (10, 0.0), (20, 0.0), (30, 0.0), (3, block.name)))
+            for kind, args in block.entities:
+                layer = (args[-1] or {}).get("layer", "0")
+                if kind == "circle":
+                    parts.append(self._circle(layer, args[0][0], args[0][1], args[1]))
+                else:
+                    parts.append(self._polyline(layer, *args[:3]))
+            parts.append(_tags((0, "ENDBLK"), (8, "0")))
+        parts.append(_tags((0, "ENDSEC"), (0, "SECTION"), (2, "ENTITIES")))
+        return b"".join(parts)
+
+    def _tail(self):
+        return _tags((0, "ENDSEC"), (0, "EOF"))
+
+    def add_circle(self, center, radius, dxfattribs=None):
+        self._emit(self._circle((dxfattribs or {}).get("layer", "0"), center[0], center[1], radius))
+
+    def add_lwpolyline(self, points, format="xyseb", close=False, dxfattribs=None):
+        self._emit(self._polyline((dxfattribs or {}).get("layer", "0"), points, format, close))
+
+    def add_blockref(self, name, insert, dxfattribs=None):
+        """INSERT of a block; column_count/row_count attribs make it a MINSERT array."""
+        attribs = dxfattribs or {}
+        data = self._start("INSERT", attribs.get("layer", "0")) + _tags(
+            (2, name), (10, float(insert[0])), (20, float(insert[1])), (30, 0.0))
+        cols = int(attribs.get("column_count", 1))
+        rows = int(attribs.get("row_count", 1))
+        if cols > 1 or rows > 1:
+            data += _tags((70, cols), (71, rows), (44, float(attribs.get("column_spacing", 0.0))),
+                          (45, float(attribs.get("row_spacing", 0.0))))
+        self._emit(data)
+
+
+# ---------------- SVG ----------------
+# ACI colors of the layers, as CSS
+_ACI_RGB = {1: "#ff0000", 2: "#ffff00", 3: "#00a000", 4: "#00ffff", 5: "#0000ff", 6: "#ff00ff", 7: "#000000"}
+
+
+class SVGWriter(StreamWriter):
+    """SVG drawing of the panel; ``extent`` is its (x0, y0, x1, y1) box in inches.
+
+    Coordinates keep the DXF's units and y-up orientation inside a flipped
+    group; strokes are one screen pixel wide at any zoom.
+    """
+
+    def __init__(self, target, extent, layers=LAYERS, precision=5):
+        super().__init__(target)
+        self._extent = extent
+        self._layers = list(layers)
+        self._fmt = f"{{:.{int(precision)}f}}".format
+
+    def _attrs(self, layer):
+        return f' class="{layer}"' if layer != "0" else ""  # layer 0 inherits from the INSERT
+
+    def _circle(self, layer, x, y, r):
+        f = self._fmt
+        return f'<circle{self._attrs(layer)} cx="{f(x)}" cy="{f(y)}" r="{f(r)}"/>\n'
+
+    def _path(self, layer, points, format, close):
+        f = self._fmt
+        pts = _vertices(points, format)
+        d = [f"M{f(pts[0][0])} {f(pts[0][1])}"]
+        n = len(pts)
+        for k in range(n if close else n - 1):
+            x0, y0, b = pts[k]
+            x1, y1 = pts[(k + 1) % n][:2]
+            if b and (x0, y0) != (x1, y1):
+                r = _arc(x0, y0, x1, y1, b)[2]
+                # flags are read in the unflipped user space, where CCW (b > 0) is the positive sweep
+                d.append(f"A{f(r)} {f(r)} 0 {int(abs(b) > 1.0)} {int(b > 0)} {f(x1)} {f(y1)}")
+            elif k < n - 1:
+                d.append(f"L{f(x1)} {f(y1)}")
+        if close:
+            d.append("Z")
+        return f'<path{self._attrs(layer)} d="{"".join(d)}"/>\n'
+
+    def _head(self):
+        x0, y0, x1, y1 = self._extent
+        w, h = x1 - x0, y1 - y0
+        f = self._fmt
+        style = "circle,path{vector-effect:non-scaling-stroke}" + "".join(
+            f".{name}{{stroke:{_ACI_RGB.get(color, '#000000')}}}" for name, color in self._layers)
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{f(w)}in" height="{f(h)}in" viewBox="{f(x0)} {f(-y1)} {f(w)} {f(h)}">\n',
+            f"<style>{style}</style>\n",
+            "<defs>\n",
+        ]
+        for block in self._blocks.values():
+            parts.append(f'<symbol id="{block.name}" overflow="visible">')
+            for kind, args in block.entities:
+                layer = (args[-1] or {}).get("layer", "0")
+                if kind == "circle":
+                    parts.append(self._circle(layer, args[0][0], args[0][1], args[1]))
+                else:
+                    parts.append(self._path(layer, *args[:3]))
+            parts.append("</symbol>\n")
+        parts.append('</defs>\n<g transform="scale(1,-1)" fill="none" stroke="#000000" stroke-width="1">\n')
+        return "".join(parts).encode("utf-8")
+
+    def _tail(self):
+        return b"</g>\n</svg>\n"
+
+    def add_circle(self, center, radius, dxfattribs=None):
+        self._emit(self._circle((dxfattribs or {}).get("layer", "0"), float(center[0]), float(center[1]),
+                                float(radius)).encode("ascii"))
+
+    def add_lwpolyline(self, points, format="xyseb", close=False, dxfattribs=None):
+        self._emit(self._path((dxfattribs or {}).get("layer", "0"), points, format, close).encode("ascii"))
+
+    def add_blockref(self, name, insert, dxfattribs=None):
+        """<use> of a block symbol; a MINSERT array becomes one <use> per cell."""
+        attribs = dxfattribs or {}
+        f = self._fmt
+        cls = self._attrs(attribs.get("layer", "0"))
+        cells = _grid(insert, attribs)
+        self._emit("".join(f'<use{cls} xlink:href="#{name}" x="{f(x)}" y="{f(y)}"/>\n'
+                           for x, y in cells).encode("ascii"), len(cells))
+
+
+# ---------------- G-code ----------------
+HIT = "M20"  # punch stroke at the current position
+CONTOUR_ON = "M21"  # start contouring (nibbling) along the following moves
+CONTOUR_OFF = "M22"
+
+
+class GCodeWriter(StreamWriter):
+    """G-code in inches (G20, absolute G90) for a punch cell.
+
+    Full holes on layer HOLES (circles, or square outlines punched at the
+    center of their box) and block references become ``hit`` strokes.  Everything else
+    is contoured between ``contour_on`` and ``contour_off``, arcs as G02/G03
+    with I/J centers.  Holes are visited in the order they are written, so
+    cut_order applies directly.
+    """
+
+    def __init__(self, target, hit=HIT, contour_on=CONTOUR_ON, contour_off=CONTOUR_OFF, precision=4):
+        super().__init__(target)
+        self._hit = hit
+        self._on = contour_on
+        self._off = contour_off
+        self._fmt = f"{{:.{int(precision)}f}}".format
+
+    def _punch(self, x, y):
+        f = self._fmt
+        return f"G00 X{f(x)} Y{f(y)}\n{self._hit}\n"
+
+    def _contour(self, points, format, close):
+        f = self._fmt
+        pts = _vertices(points, format)
+        lines = [f"G00 X{f(pts[0][0])} Y{f(pts[0][1])}\n{self._on}\n"]
+        n = len(pts)
+        for k in range(n if close else n - 1):
+            x0, y0, b = pts[k]
+            x1, y1 = pts[(k + 1) % n][:2]
+            if b and (x0, y0) != (x1, y1):
+                cx, cy, _ = _arc(x0, y0, x1, y1, b)
+                lines.append(f"{'G03' if b > 0 else 'G02'} X{f(x1)} Y{f(y1)} I{f(cx - x0)} J{f(cy - y0)}\n")
+            else:
+                lines.append(f"G01 X{f(x1)} Y{f(y1)}\n")
+        lines.append(f"{self._off}\n")
+        return "".join(lines)
+
+    def _head(self):
+        return b"%\n(perfdxf panel, inches)\nG20\nG90\nG17\nG40\n"
+
+    def _tail(self):
+        return b"M30\n%\n"
+
+    def add_circle(self, center, radius, dxfattribs=None):
+        if (dxfattribs or {}).get("layer", "0") == "HOLES":
+            text = self._punch(float(center[0]), float(center[1]))
+        else:
+            x, y, r = float(center[0]), float(center[1]), float(radius)
+            text = self._contour([(x - r, y, 1.0), (x + r, y, 1.0)], "xyb", True)
+        self._emit(text.encode("ascii"))
+
+    def add_lwpolyline(self, points, format="xyseb", close=False, dxfattribs=None):
+        if close and (dxfattribs or {}).get("layer", "0") == "HOLES":
+            xs, ys = zip(*((p[0], p[1]) for p in points))
+            text = self._punch((min(xs) + max(xs)) / 2.0, (min(ys) + max(ys)) / 2.0)
+        else:
+            text = self._contour(points, format, close)
+        self._emit(text.encode("ascii"))
+
+    def add_blockref(self, name, insert, dxfattribs=None):
+        """One hit per insertion point (every cell of a MINSERT array)."""
+        cells = _grid(insert, dxfattribs or {})
+        self._emit("".join(self._punch(x, y) for x, y in cells).encode("ascii"), len(cells))
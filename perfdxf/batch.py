@@ -0,0 +1,160 @@
+# batch.py
+# Batch runner for the Perf DXF Generator: one DXF per manifest entry, in parallel.
+#
+# A manifest is either JSON (a list of params dicts, or {"jobs": [...]}) or CSV
+# with one params dict per row.  Each entry uses the same keys as the GUI
+# (see check_params in params.py), plus an optional "name" for the
+# output file.  Usage:
+#
+#   python -m perfdxf.batch panels.csv -o out/ -j 8
+#
+# With --cache, repeated specs are served from the result cache (cache.py).
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .params import OUTPUT_FORMATS, check_params
+from .generator import generate_dxf
+from .cache import DXFCache, DEFAULT_MAX_BYTES
+
+REPORT_NAME = "batch_report.json"
+
+def load_manifest(path):
+    """Read a CSV or JSON manifest and return its list of raw job dicts."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            jobs = []
+            for row in csv.DictReader(f):
+                jobs.append({k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip()})
+            return jobs
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    jobs = data["jobs"] if isinstance(data, dict) else data
+    if not isinstance(jobs, list) or not all(isinstance(j, dict) for j in jobs):
+        raise ValueError("JSON manifest must be a list of params objects (or {\"jobs\": [...]}).")
+    return jobs
+
+
+def output_name(index, job):
+    """Deterministic file name for manifest entry ``index``."""
+    if job.get("name"):
+        stem = str(job["name"])
+    else:
+        stem = f'{index:04d}_{job.get("shape_choice")}_{job.get("pattern_choice")}_{job.get("hole_shape_choice")}'
+    stem = "".join(c if c.isalnum() or c in "-_." else "_" for c in stem)
+    suffix = OUTPUT_FORMATS.get(job.get("output_format"), ".dxf")
+    return stem if stem.lower().endswith(suffix) else stem + suffix
+
+
+def _run_job(index, job, path, cache_opts=None):
+    """Worker entry point; never raises, so one bad job can't stop the batch."""
+    t0 = time.perf_counter()
+    result = {"index": index, "name": job.get("name"), "path": str(path), "ok": False, "error": None}
+    try:
+        params = check_params({k: v for k, v in job.items() if k != "name"})
+        if cache_opts is None:
+            generate_dxf(params, path)
+        else:
+            cache = DXFCache(cache_opts["root"], cache_opts["max_bytes"])
+            hit = cache.generate(params, path, link=cache_opts["link"])
+            result["cache"] = "hit" if hit else "miss"
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = round(time.perf_counter() - t0, 4)
+    return result
+
+
+def run_batch(jobs, out_dir, workers=None, progress=None, cache_opts=None):
+    """Generate every job into ``out_dir`` across a process pool.
+
+    Returns one result dict per job, in manifest order.  ``progress`` is
+    called with each result as it completes.  ``cache_opts`` ({"root",
+    "max_bytes", "link"}) routes jobs through the result cache.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = [out_dir / output_name(i, job) for i, job in enumerate(jobs)]
+    if len(set(paths)) != len(paths):
+        raise ValueError("Manifest produces duplicate output names; give the jobs distinct \"name\" values.")
+
+    results = [None] * len(jobs)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_job, i, job, paths[i], cache_opts): i for i, job in enumerate(jobs)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:  # worker process died
+                res = {"index": i, "name": jobs[i].get("name"), "path": str(paths[i]), "ok": False,
+                       "error": f"{type(e).__name__}: {e}", "seconds": None}
+            results[i] = res
+            if progress:
+                progress(res)
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a DXF for every entry of a CSV/JSON manifest.")
+    ap.add_argument("manifest", help="CSV or JSON file of params dicts")
+    ap.add_argument("-o", "--out-dir", default="dxf_out", help="output directory (default: dxf_out)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--cache", nargs="?", const="", default=None, metavar="DIR",
+                    help="reuse/store results in the DXF cache (default dir: $PERF_DXF_CACHE or per-user)")
+    ap.add_argument("--cache-size", type=float, default=DEFAULT_MAX_BYTES / 2**20, metavar="MB",
+                    help="cache size limit in MiB (default: %(default)g)")
+    ap.add_argument("--cache-link", action="store_true", help="hard-link cached files instead of copying")
+    args = ap.parse_args(argv)
+
+    jobs = load_manifest(args.manifest)
+    cache_opts = None
+    if args.cache is not None:
+        cache_opts = {"root": args.cache or None, "max_bytes": int(args.cache_size * 2**20), "link": args.cache_link}
+
+    def progress(res):
+        status = "ok  " if res["ok"] else "FAIL"
+        cached = " cached" if res.get("cache") == "hit" else ""
+        print(f'[{status}] {res["index"]:4d} {Path(res["path"]).name} ({res["seconds"]}s{cached})'
+              + ("" if res["ok"] else f' - {res["error"]}'), flush=True)
+
+    t0 = time.perf_counter()
+    results = run_batch(jobs, args.out_dir, args.workers, progress, cache_opts)
+    wall = time.perf_counter() - t0
+
+    failed = [r for r in results if not r["ok"]]
+    report = {
+        "manifest": str(args.manifest),
+        "jobs": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "wall_seconds": round(wall, 3),
+        "job_seconds": round(sum(r["seconds"] or 0 for r in results), 3),
+        "results": results,
+    }
+    if cache_opts is not None:
+        report["cache_hits"] = sum(1 for r in results if r.get("cache") == "hit")
+        report["cache_misses"] = sum(1 for r in results if r.get("cache") == "miss")
+    report_path = Path(args.out_dir) / REPORT_NAME
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{report['succeeded']}/{len(results)} generated in {wall:.2f}s; report: {report_path}")
+    if cache_opts is not None:
+        print(f"cache: {report['cache_hits']} hits, {report['cache_misses']} misses")
+    for r in failed:
+        print(f'  failed {r["index"]:4d} {Path(r["path"]).name}: {r["error"]}')
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+# bench.py
+# Reproducible benchmark sweep for generate_dxf.
+#
+# Every case (outer shape x hole shape x pattern x keep_clipped x format x
+# hole count) runs in a fresh interpreter, so peak RSS belongs to that case
+# alone.  Each case is measured twice: once end to end through generate_dxf,
+# and once with instrument.py observers attached for the phase breakdown
+# (setup / arrays / grid / classify / clip / entities / save) and counters.
+#
+#   python -m perfdxf.bench -o bench.json
+#   python -m perfdxf.bench --sizes 1e2,1e4 --formats dxf,dxf-stream -o quick.json
+#   python -m perfdxf.bench --sizes 1e5 --formats dxf-stream,dxf-binary,svg,gcode -o formats.json
+#   python -m perfdxf.bench -o new.json --compare bench.json
+#
+# Each result also has "per_hole": microseconds and output bytes per hole
+# written, the figures for comparing output formats.
+#
+# With --compare the exit status is 1 when any case got slower than
+# --threshold times its baseline.
+
+import argparse
+import importlib
+import itertools
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from .instrument import PHASES, Observer, Summary
+
+SIZES = (1e2, 1e3, 1e4, 1e5, 1e6)
+
+HOLE_RATIO = 0.6  # hole size / spacing
+SPACING = 0.25
+OFFSET = 0.125
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB (None if unknown)."""
+    try:
+        import resource
+    except ImportError:
+        return _peak_rss_windows()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _peak_rss_windows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+    except ImportError:
+        return None
+
+    class PMC(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+    try:
+        pmc = PMC()
+        pmc.cb = ctypes.sizeof(pmc)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(pmc), pmc.cb):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return round(pmc.PeakWorkingSetSize / 2**20, 1)
+
+
+# ---------------- Cases ----------------
+def case_params(shape, hole, pattern, keep_clipped, output_format, holes):
+    """Panel params whose lattice has roughly ``holes`` centers.
+
+    Spacing and hole size stay fixed; the blank grows with the hole count
+    (4:3 rectangles), so the share of clipped holes falls as sqrt(1/holes).
+    """
+    cell = SPACING * SPACING * (math.sqrt(3) / 2 if pattern == "staggered" else 1.0)
+    area = holes * cell
+    params = dict(shape_choice=shape, offset=OFFSET, hole_shape_choice=hole,
+                  hole_size=SPACING * HOLE_RATIO, spacing=SPACING, pattern_choice=pattern,
+                  keep_clipped=keep_clipped, output_format=output_format, hole_blocks="none")
+    if shape == "rectangle":
+        params["outer_length"] = round(math.sqrt(area * 4 / 3) + 2 * OFFSET, 4)
+        params["outer_width"] = round(math.sqrt(area * 3 / 4) + 2 * OFFSET, 4)
+    else:
+        params["outer_diameter"] = round(2 * math.sqrt(area / math.pi) + 2 * OFFSET, 4)
+    return params
+
+
+def case_key(case):
+    return "{shape}-{hole}-{pattern}-{clip}-{format}-{holes}".format(
+        clip="clip" if case["keep_clipped"] else "noclip", **case)
+
+
+def build_cases(shapes, holes, patterns, clipped, formats, sizes):
+    return [dict(shape=s, hole=h, pattern=p, keep_clipped=k, format=f, holes=n)
+            for n, f, s, h, p, k in itertools.product(sizes, formats, shapes, holes, patterns, clipped)]
+
+
+# ---------------- Measurements (run in a child interpreter) ----------------
+class _PhaseRSS(Observer):
+    """Peak RSS seen at the end of each phase span."""
+
+    def __init__(self):
+        self.rss = {}
+
+    def on_phase(self, name, start, seconds):
+        self.rss[name] = peak_rss_mb()
+
+
+def measure_total(params, path):
+    from .generator import generate_dxf
+
+    t0 = time.perf_counter()
+    generate_dxf(params, path)
+    seconds = time.perf_counter() - t0
+    return {"seconds": round(seconds, 6), "peak_rss_mb": peak_rss_mb(), "bytes": os.path.getsize(path)}
+
+
+def measure_phases(params, path):
+    """One instrumented generate_dxf run: per-phase time and peak RSS, plus counters."""
+    from .generator import generate_dxf
+
+    summary, rss = Summary(), _PhaseRSS()
+    generate_dxf(params, path, observers=[summary, rss])
+    report = summary.report
+    phases = {name: {"seconds": secs, "peak_rss_mb": rss.rss.get(name)}
+              for name, secs in report["phases"].items() if name in rss.rss}
+    return {"seconds": report["seconds"], "phases": phases, "counters": report["counters"]}
+
+
+def run_case(case, mode):
+    params = case_params(case["shape"], case["hole"], case["pattern"], case["keep_clipped"],
+                         case["format"], case["holes"])
+    if case["format"] == "dxf":
+        importlib.import_module("ezdxf")  # load it now so its import time is not charged to a phase
+    fd, path = tempfile.mkstemp(suffix=".dxf")
+    os.close(fd)
+    try:
+        return measure_total(params, path) if mode == "total" else measure_phases(params, path)
+    finally:
+        os.remove(path)
+
+
+def _child(case, mode, timeout):
+    cmd = [sys.executable, "-m", "perfdxf.bench", "--run-case", json.dumps(case), "--mode", mode]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_root(), os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, env=env)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}")
+    return json.loads(proc.stdout)
+
+
+def _root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_case(case, repeat=1, timeout=None):
+    """Measure one case in child interpreters; the fastest of ``repeat`` totals is kept."""
+    result = dict(case, key=case_key(case), error=None)
+    try:
+        totals = [_child(case, "total", timeout) for _ in range(repeat)]
+        result["total"] = min(totals, key=lambda t: t["seconds"])
+        result.update(_child(case, "phases", timeout))
+        result["instrumented_seconds"] = result.pop("seconds")
+        written = max(result["counters"]["holes_full"] + result["counters"]["holes_clipped"], 1)
+        result["per_hole"] = {"us": round(result["total"]["seconds"] * 1e6 / written, 3),
+                              "bytes": round(result["total"]["bytes"] / written, 1)}
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def environment():
+    from . import generator
+
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "generator_version": generator.GENERATOR_VERSION,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    for mod in ("numpy", "ezdxf"):
+        try:
+            info[mod] = __import__(mod).__version__
+        except ImportError:
+            info[mod] = None
+    try:
+        info["git"] = subprocess.run(["git", "-C", _root(), "rev-parse", "--short", "HEAD"],
+                                     capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        info["git"] = None
+    return info
+
+
+# ---------------- Comparison ----------------
+def compare(results, baseline, threshold, min_seconds=0.02):
+    """Cases whose total time grew by more than ``threshold`` x the baseline."""
+    old = {r["key"]: r for r in baseline["results"] if not r.get("error")}
+    regressions = []
+    for r in results:
+        b = old.get(r["key"])
+        if r.get("error") or b is None:
+            continue
+        new_s, old_s = r["total"]["seconds"], b["total"]["seconds"]
+        if new_s > min_seconds and new_s > threshold * max(old_s, min_seconds):
+            regressions.append({"key": r["key"], "baseline_seconds": old_s, "seconds": new_s,
+                                "ratio": round(new_s / max(old_s, 1e-9), 2)})
+    return regressions
+
+
+def _list(kind, allowed=None):
+    def parse(text):
+        items = [kind(t) for t in text.split(",") if t.strip()]
+        if allowed is not None and not set(items) <= set(allowed):
+            raise argparse.ArgumentTypeError(f"choose from: {', '.join(map(str, allowed))}")
+        return items
+    return parse
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark generate_dxf over a parameter sweep.")
+    ap.add_argument("-o", "--output", default="bench_results.json", help="JSON results file (default: %(default)s)")
+    ap.add_argument("--sizes", type=_list(float), default=list(SIZES), help="hole counts (default: 1e2,...,1e6)")
+    ap.add_argument("--shapes", type=_list(str, ("rectangle", "circle")), default=["rectangle", "circle"])
+    ap.add_argument("--holes", type=_list(str, ("circle", "square")), default=["circle", "square"])
+    ap.add_argument("--patterns", type=_list(str, ("straight", "staggered")), default=["straight", "staggered"])
+    ap.add_argument("--clipped", type=_list(str, ("on", "off")), default=["on", "off"], help="keep_clipped values")
+    ap.add_argument("--formats", type=_list(str, ("dxf-stream", "dxf", "dxf-binary", "svg", "gcode")),
+                    default=["dxf-stream"],
+                    help="output formats (default: dxf-stream; dxf at 1e6 holes needs several GB)")
+    ap.add_argument("--repeat", type=int, default=1, help="end-to-end runs per case; the fastest is kept")
+    ap.add_argument("--timeout", type=float, default=None, help="seconds before a case is abandoned")
+    ap.add_argument("--compare", metavar="BASELINE", help="earlier results file to check for regressions")
+    ap.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    ap.add_argument("--run-case", help=argparse.SUPPRESS)
+    ap.add_argument("--mode", choices=("total", "phases"), default="total", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.run_case:
+        json.dump(run_case(json.loads(args.run_case), args.mode), sys.stdout)
+        return 0
+
+    cases = build_cases(args.shapes, args.holes, args.patterns, [c == "on" for c in args.clipped],
+                        args.formats, [int(n) for n in args.sizes])
+    results = []
+    for n, case in enumerate(cases, 1):
+        r = bench_case(case, args.repeat, args.timeout)
+        results.append(r)
+        if r["error"]:
+            print(f"[{n}/{len(cases)}] {r['key']}: {r['error']}", flush=True)
+        else:
+            ph = " ".join(f"{p}={r['phases'][p]['seconds']:.3f}" for p in PHASES if p in r["phases"])
+            print(f"[{n}/{len(cases)}] {r['key']}: {r['total']['seconds']:.3f}s "
+                  f"{r['total']['peak_rss_mb']}MB {r['counters']['entities']} entities "
+                  f"{r['total']['bytes']} bytes, {r['per_hole']['us']}us {r['per_hole']['bytes']}B/hole ({ph})",
+                  flush=True)
+
+    report = {"environment": environment(), "phases": list(PHASES), "results": results}
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline"] = {"file": args.compare, "environment": baseline.get("environment")}
+        report["regressions"] = compare(results, baseline, args.threshold)
+        for reg in report["regressions"]:
+            print(f"  regression {reg['key']}: {reg['baseline_seconds']:.3f}s -> {reg['seconds']:.3f}s "
+                  f"(x{reg['ratio']})")
+        status = 1 if report["regressions"] else 0
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(results)} cases -> {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
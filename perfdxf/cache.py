@@ -0,0 +1,310 @@
+# cache.py
+# Content-addressed on-disk cache of generated DXF files.
+#
+# Entries are keyed by a SHA-256 of the normalized params (check_params) plus
+# GENERATOR_VERSION, and stored as <root>/<key[:2]>/<key><suffix>, with the
+# output format's file suffix (.dxf, .svg, .nc).  A hit refreshes the entry's
+# mtime; when the cache grows past max_bytes the least recently used entries
+# are deleted.  Every lookup appends one byte to <root>/stats/hits or
+# <root>/stats/misses, so the file sizes count them across processes (appends
+# don't race the way a read-modify-write counter would) and "stats" can
+# report the hit rate.  Usage from the command line:
+#
+#   python -m perfdxf.cache stats
+#   python -m perfdxf.cache invalidate panels.csv
+#   python -m perfdxf.cache clear
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from .params import OPTION_DEFAULTS, OUTPUT_FORMATS, check_params
+from .generator import GENERATOR_VERSION, generate_dxf
+
+DEFAULT_MAX_BYTES = 1 << 30  # 1 GiB
+STATS_DIR = "stats"  # lookup counters, under the cache root
+
+
+def default_cache_dir():
+    """$PERF_DXF_CACHE, else a per-user cache directory."""
+    if os.environ.get("PERF_DXF_CACHE"):
+        return Path(os.environ["PERF_DXF_CACHE"])
+    if os.environ.get("LOCALAPPDATA"):
+        return Path(os.environ["LOCALAPPDATA"]) / "perf_dxf" / "cache"
+    return Path.home() / ".cache" / "perf_dxf"
+
+
+def cache_key(params):
+    """Canonical hash of a params dict; equal specs give equal keys.
+
+    Outline panels are keyed by the outline file's contents, not its path.
+    """
+    norm = check_params({k: v for k, v in params.items() if k != "name"})
+    if norm["shape_choice"] == "outline":
+        path = norm.pop("outline_path")
+        try:
+            with open(path, "rb") as f:
+                norm["outline_sha256"] = hashlib.sha256(f.read()).hexdigest()
+        except OSError as e:
+            raise ValueError(f"Cannot read outline DXF {path}: {e}")
+    blob = json.dumps({"version": GENERATOR_VERSION, "params": norm},
+                      sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class DXFCache:
+    """Size-bounded LRU store of generated DXF files."""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, params):
+        key = cache_key(params)
+        suffix = OUTPUT_FORMATS.get(params.get("output_format", OPTION_DEFAULTS["output_format"]), ".dxf")
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def _entries(self):
+        if not self.root.is_dir():
+            return
+        suffixes = tuple(set(OUTPUT_FORMATS.values()))
+        for sub in os.scandir(self.root):
+            if sub.is_dir() and sub.name != STATS_DIR:
+                for e in os.scandir(sub.path):
+                    if e.name.endswith(suffixes):
+                        yield e
+
+    def _count(self, name):
+        """Add one to the persistent ``name`` counter (best effort)."""
+        try:
+            os.makedirs(self.root / STATS_DIR, exist_ok=True)
+            with open(self.root / STATS_DIR / name, "ab") as f:
+                f.write(b".")
+        except OSError:
+            pass
+
+    def _counter(self, name):
+        try:
+            return os.path.getsize(self.root / STATS_DIR / name)
+        except OSError:
+            return 0
+
+    # ---------------- Lookup ----------------
+    def lookup(self, params):
+        """Path of the cached DXF for ``params`` (refreshing its LRU age), or None."""
+        path = self._path(params)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            self._count("misses")
+            return None
+        self.hits += 1
+        self._count("hits")
+        return path
+
+    def get_bytes(self, params):
+        """Cached DXF bytes for ``params``, or None on a miss."""
+        path = self.lookup(params)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:  # evicted by another process in between
+            return None
+
+    def get(self, params, dest, link=False):
+        """Place the cached DXF at ``dest``; returns False on a miss.
+
+        With ``link`` the file is hard-linked instead of copied (falls back to a
+        copy across filesystems).  Don't edit linked outputs in place.
+        """
+        path = self.lookup(params)
+        if path is None:
+            return False
+        try:
+            if link:
+                try:
+                    if os.path.lexists(dest):
+                        os.remove(dest)
+                    os.link(path, dest)
+                    return True
+                except OSError:
+                    pass
+            shutil.copyfile(path, dest)
+        except FileNotFoundError:
+            return False
+        return True
+
+    # ---------------- Store ----------------
+    def put(self, params, src):
+        """Store the DXF file ``src`` (path) or bytes as the entry for ``params``."""
+        path = self._path(params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(src, (bytes, bytearray)):
+                    f.write(src)
+                else:
+                    with open(src, "rb") as s:
+                        shutil.copyfileobj(s, f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+        return path
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for e in self._entries():
+            try:
+                st = e.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, e.path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def invalidate(self, params=None):
+        """Drop the entry for ``params``, or every entry when params is None."""
+        if params is not None:
+            try:
+                os.remove(self._path(params))
+                return 1
+            except FileNotFoundError:
+                return 0
+        n = 0
+        for e in list(self._entries()):
+            try:
+                os.remove(e.path)
+                n += 1
+            except FileNotFoundError:
+                pass
+        return n
+
+    def reset_stats(self):
+        """Zero the persistent hit/miss counters."""
+        for name in ("hits", "misses"):
+            try:
+                os.remove(self.root / STATS_DIR / name)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        """Entry count and size; hits/misses of this instance and total_* of every lookup recorded."""
+        sizes = []
+        for e in self._entries():
+            try:
+                sizes.append(e.stat().st_size)
+            except FileNotFoundError:
+                pass
+        lookups = self.hits + self.misses
+        total_hits, total_misses = self._counter("hits"), self._counter("misses")
+        total = total_hits + total_misses
+        return {
+            "root": str(self.root),
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "total_hits": total_hits,
+            "total_misses": total_misses,
+            "total_hit_rate": round(total_hits / total, 4) if total else None,
+        }
+
+    # ---------------- Generate through the cache ----------------
+    def generate(self, params, save_path, link=False, observers=None, workers=None):
+        """generate_dxf through the cache; returns True when served from it.
+
+        ``save_path`` may be a path or a writable binary stream.  ``observers``
+        and ``workers`` are passed to generate_dxf on a miss.
+        """
+        if hasattr(save_path, "write"):
+            data = self.get_bytes(params)
+            hit = data is not None
+            if not hit:
+                data = _generate_bytes(params, observers, workers)
+                self.put(params, data)
+            save_path.write(data)
+            return hit
+        if self.get(params, save_path, link=link):
+            return True
+        # save_path may still be a hard link to another entry (link=True);
+        # generate beside it and replace it rather than writing through it
+        tmp = f"{save_path}.{os.getpid()}.tmp"
+        try:
+            generate_dxf(params, tmp, observers=observers, workers=workers)
+            os.replace(tmp, save_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.put(params, save_path)
+        return False
+
+
+def _generate_bytes(params, observers=None, workers=None):
+    fd, tmp = tempfile.mkstemp(suffix=".dxf")
+    os.close(fd)
+    try:
+        generate_dxf(params, tmp, observers=observers, workers=workers)
+        with open(tmp, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(tmp)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Inspect or clear the Perf DXF result cache.")
+    ap.add_argument("--dir", default=None, help=f"cache directory (default: {default_cache_dir()})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="show entry count, size and hit rate")
+    sub.add_parser("clear", help="delete every entry and zero the hit/miss counts")
+    inv = sub.add_parser("invalidate", help="delete the entries for a CSV/JSON manifest")
+    inv.add_argument("manifest")
+    args = ap.parse_args(argv)
+
+    cache = DXFCache(args.dir)
+    if args.cmd == "stats":
+        st = cache.stats()
+        keys = ("root", "entries", "bytes", "max_bytes", "total_hits", "total_misses", "total_hit_rate")
+        print(json.dumps({k: st[k] for k in keys}, indent=2))
+    elif args.cmd == "clear":
+        print(f"Removed {cache.invalidate()} entries from {cache.root}")
+        cache.reset_stats()
+    else:
+        from .batch import load_manifest
+        n = 0
+        for i, job in enumerate(load_manifest(args.manifest)):
+            try:
+                n += cache.invalidate(job)
+            except ValueError as e:
+                print(f"  skipped entry {i}: {e}")
+        print(f"Removed {n} entries from {cache.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# cli.py
+# Command-line front-end for the Perf DXF Generator.
+#
+#   python -m perfdxf --diameter 25.875 --hole-size 1 --spacing 2 -o panel.dxf
+#   python -m perfdxf --length 24 --width 18 --hole circle --hole-size 0.25 \
+#       --spacing 0.375 --pattern staggered --keep-clipped -o - > panel.dxf
+#   python -m perfdxf --outline part.dxf --keepout-layer KEEPOUT --hole circle \
+#       --hole-size 0.25 --spacing 0.375 -o panel.dxf
+#   python -m perfdxf --length 24 --width 18 --hole-size 0.25 --spacing 0.5 \
+#       --order serpentine --format gcode -o panel.nc
+#   python -m perfdxf --diameter 48 --hole circle --hole-size 0.125 --spacing 0.1875 --estimate
+#
+# Only argparse and params.py are imported up front; the generator (numpy) is
+# loaded after the arguments are checked, and ezdxf only for --format dxf or --outline.
+# numpy sets the floor for a run: on a slow single-CPU machine a small panel
+# takes ~135 ms wall, of which ~115 ms is importing numpy and ~12 ms starting
+# the interpreter, so "well under 100 ms" is not reached there.
+
+import argparse
+import os
+import sys
+
+from .params import CHOICES, CUT_ORDERS, HOLE_BLOCKS, OUTPUT_FORMATS, check_params
+
+
+def default_output_name(params):
+    """File name the interactive generator has always used (with the output format's suffix)."""
+    suffix = OUTPUT_FORMATS[params.get("output_format", "dxf")]
+    return f'{params["shape_choice"]}_{params["pattern_choice"]}_grid_trimmed_centered{suffix}'
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="perfdxf", description="Generate a perforated panel DXF.")
+    outer = ap.add_argument_group("outer shape (give --diameter, --length and --width, or --outline)")
+    outer.add_argument("--diameter", type=float, help="outer diameter (in) of a circular blank")
+    outer.add_argument("--length", type=float, help="outer length (in) of a rectangular blank")
+    outer.add_argument("--width", type=float, help="outer width (in) of a rectangular blank")
+    outer.add_argument("--outline", metavar="FILE", help="DXF file with the closed outer outline and cutouts")
+    outer.add_argument("--outline-layer", metavar="LAYER", help="read the outline from this layer only")
+    outer.add_argument("--keepout-layer", metavar="LAYER",
+                       help="closed contours on this layer get no holes and are not cut")
+    ap.add_argument("--offset", type=float, default=0.125, help="offset from edge (in) (default: %(default)g)")
+    ap.add_argument("--hole", choices=CHOICES["hole_shape_choice"], default="square",
+                    help="hole shape (default: %(default)s)")
+    ap.add_argument("--hole-size", type=float, required=True, help="hole diameter or square side (in)")
+    ap.add_argument("--spacing", type=float, required=True, help="center-to-center spacing (in)")
+    ap.add_argument("--pattern", choices=CHOICES["pattern_choice"], default="straight",
+                    help="hole pattern (default: %(default)s)")
+    ap.add_argument("--keep-clipped", action="store_true", help="include clipped holes on layer HOLES-CLIPPED")
+    ap.add_argument("--format", choices=tuple(OUTPUT_FORMATS), default="dxf-stream",
+                    help="dxf-stream: DXF R12 written while generating (default); dxf: ezdxf document; "
+                         "dxf-binary: binary DXF R12; svg: SVG preview; gcode: punch G-code")
+    ap.add_argument("--blocks", choices=HOLE_BLOCKS, default="none",
+                    help="write full holes as HOLE block references (default: %(default)s)")
+    ap.add_argument("--symmetry", action="store_true",
+                    help="clip one boundary hole per mirror-symmetry class and reflect it onto the rest")
+    ap.add_argument("--clip-memo", action="store_true",
+                    help="reuse clipped-hole shapes for holes at the same offset from the boundary")
+    ap.add_argument("--order", choices=CUT_ORDERS, default="lattice",
+                    help="cut order of the holes: serpentine rows, Hilbert curve, or nearest neighbour + 2-opt "
+                         "(default: %(default)s)")
+    ap.add_argument("-j", "--workers", type=int, default=1,
+                    help="worker processes for one panel, 0 = CPU count (dxf-stream only; default: %(default)s)")
+    ap.add_argument("--estimate", action="store_true",
+                    help="print hole counts, open area and cut length instead of writing a file")
+    ap.add_argument("-o", "--output", default=None,
+                    help="output file, or - for stdout (default: <shape>_<pattern>_grid_trimmed_centered.dxf, "
+                         ".svg or .nc)")
+    ap.add_argument("--cache", nargs="?", const="", default=None, metavar="DIR",
+                    help="reuse/store the result in the DXF cache (default dir: $PERF_DXF_CACHE or per-user)")
+    ap.add_argument("--cache-size", type=float, default=1024, metavar="MB",
+                    help="cache size limit in MiB (default: %(default)g)")
+    prof = ap.add_argument_group("profiling")
+    prof.add_argument("--profile", action="store_true", help="print phase times and counters to stderr")
+    prof.add_argument("--trace", metavar="FILE", help="write a Chrome trace-event JSON of the phases")
+    prof.add_argument("--log", metavar="FILE", help="write a JSON-lines phase log")
+    return ap
+
+
+def observers_from_args(args):
+    if not (args.profile or args.trace or args.log or args.order != "lattice"):
+        return None
+    from .instrument import Summary, ChromeTrace, PhaseLog
+    observers = [Summary()]
+    if args.trace:
+        observers.append(ChromeTrace(args.trace))
+    if args.log:
+        observers.append(PhaseLog(args.log))
+    return observers
+
+
+def params_from_args(args):
+    given = [args.diameter is not None, args.length is not None or args.width is not None, args.outline is not None]
+    if sum(given) > 1:
+        raise ValueError("Give only one of --diameter, --length/--width or --outline.")
+    raw = dict(
+        shape_choice="outline" if args.outline else "circle" if args.diameter is not None else "rectangle",
+        offset=args.offset,
+        hole_shape_choice=args.hole,
+        hole_size=args.hole_size,
+        spacing=args.spacing,
+        pattern_choice=args.pattern,
+        keep_clipped=args.keep_clipped,
+        output_format=args.format,
+        hole_blocks=args.blocks,
+        symmetry=args.symmetry,
+        clip_memo=args.clip_memo,
+        cut_order=args.order,
+    )
+    if args.outline:
+        raw.update(outline_path=args.outline, outline_layer=args.outline_layer, keepout_layer=args.keepout_layer)
+    elif args.diameter is not None:
+        raw["outer_diameter"] = args.diameter
+    else:
+        raw.update(outer_length=args.length, outer_width=args.width)
+    return check_params(raw)
+
+
+def run(params, output, cache_dir=None, cache_max_bytes=None, observers=None, workers=None):
+    """Generate ``params`` into ``output`` (path or "-"); returns True on a cache hit.
+
+    ``observers`` only see runs that actually generate (not cache hits).
+    """
+    target = sys.stdout.buffer if output == "-" else output
+    if cache_dir is not None:
+        from .cache import DXFCache
+        return DXFCache(cache_dir or None, cache_max_bytes).generate(params, target, observers=observers,
+                                                                     workers=workers)
+    from .generator import generate_dxf
+    generate_dxf(params, target, observers=observers, workers=workers)
+    return False
+
+
+def main(argv=None):
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    try:
+        params = params_from_args(args)
+    except ValueError as e:
+        ap.error(str(e))
+    if args.estimate:
+        from .estimate import estimate, format_estimate
+        try:
+            est = estimate(params)
+        except ValueError as e:
+            print(f"{ap.prog}: error: {e}", file=sys.stderr)
+            return 1
+        print(format_estimate(est))
+        return 0
+    output = args.output or default_output_name(params)
+    observers = observers_from_args(args)
+    try:
+        workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+        hit = run(params, output, args.cache, int(args.cache_size * 2**20), observers, workers)
+    except ValueError as e:  # e.g. an unreadable outline file
+        print(f"{ap.prog}: error: {e}", file=sys.stderr)
+        return 1
+    if output != "-":
+        print(f"Saved as {output}" + (" (from cache)" if hit else ""), file=sys.stderr)
+    report = observers[0].report if observers else None
+    if report and args.order != "lattice":
+        before, after = report["counters"]["travel_before"], report["counters"]["travel_after"]
+        saved = f" ({1 - after / before:.0%} less)" if before else ""
+        print(f"Travel between holes: {before:,} in -> {after:,} in{saved}", file=sys.stderr)
+    if args.profile and report:
+        from .instrument import format_report
+        print(format_report(report), file=sys.stderr)
+    return 0
+
+
+# ---------------- Interactive prompts ----------------
+def get_float(prompt, default=None):
+    try:
+        v = input(prompt)
+        if not v.strip() and default is not None:
+            return default
+        return float(v)
+    except ValueError:
+        print("Invalid input. Please enter a number.")
+        return get_float(prompt, default)
+
+
+def interactive():
+    """Ask for the panel on stdin, as the original console script did."""
+    shape_choice = (input("Choose outer shape circle (c) or rectangle (r) [circle]: ").strip().lower() or "circle")
+    shape_choice = "circle" if shape_choice in {"c","circle"} else "rectangle"
+    raw = {"shape_choice": shape_choice}
+
+    if shape_choice == "rectangle":
+        raw["outer_length"] = get_float("Enter outer length in inches (e.g. 24): ")
+        raw["outer_width"]  = get_float("Enter outer width in inches (e.g. 18): ")
+    else:
+        raw["outer_diameter"] = get_float("Enter outer diameter in inches (e.g. 25.875): ")
+
+    raw["offset"] = get_float("Enter offset from edge in inches (default 0.125): ", 0.125)
+
+    hole_shape_choice = (input("Choose hole shape square (s) or circle (c) [square]: ").strip().lower() or "square")
+    hole_shape_choice = "square" if hole_shape_choice in {"s","square"} else "circle"
+    raw["hole_shape_choice"] = hole_shape_choice
+
+    if hole_shape_choice == "square":
+        raw["hole_size"] = get_float("Enter square size in inches (e.g. 1): ")
+    else:
+        raw["hole_size"] = get_float("Enter circle diameter in inches (e.g. 1): ")
+
+    raw["spacing"] = get_float("Enter center-to-center spacing between holes in inches (e.g. 2): ")
+
+    pattern_choice = (input("Choose pattern straight or staggered [straight]: ").strip().lower() or "straight")
+    raw["pattern_choice"] = pattern_choice if pattern_choice in {"straight","staggered"} else "straight"
+
+    raw["keep_clipped"] = (input("Include clipped holes? [y/N]: ").strip().lower() == "y")
+
+    params = check_params(raw)
+    outname = default_output_name(params)
+    run(params, outname)
+    print(f"Saved as {outname}")
+    input("Press Enter to exit...")
+    return 0
@@ -0,0 +1,114 @@
+# clip.py
+# Closed-form clipping of boundary holes against the usable region of the blank.
+#
+# Every clip_* function returns a list of closed loops, each a list of
+# (x, y, bulge) vertices ready for add_lwpolyline(..., format="xyb", close=True).
+# The bulge on a vertex describes the segment to the next vertex: 0 for a straight
+# line, tan(sweep/4) for a counter-clockwise arc, so arcs stay exact in the DXF.
+# All shapes involved are convex, so a clip is always empty or a single loop.
+
+import math
+
+EPS = 1e-9  # inches; points closer than this are treated as coincident
+
+_TWO_PI = 2.0 * math.pi
+
+
+def clip_circle_to_rect(x, y, r, half_x, half_y):
+    """Circle hole of radius r at (x, y) clipped to |X| <= half_x, |Y| <= half_y."""
+    return _disk_box(x, y, r, -half_x, -half_y, half_x, half_y)
+
+
+def clip_square_to_rect(x, y, h, half_x, half_y):
+    """Axis-aligned square hole of half-side h at (x, y) clipped to the rectangle."""
+    x0 = max(x - h, -half_x)
+    x1 = min(x + h, half_x)
+    y0 = max(y - h, -half_y)
+    y1 = min(y + h, half_y)
+    if x1 - x0 <= EPS or y1 - y0 <= EPS:
+        return []
+    return [[(x0, y0, 0.0), (x1, y0, 0.0), (x1, y1, 0.0), (x0, y1, 0.0)]]
+
+
+def clip_circle_to_circle(x, y, r, radius):
+    """Circle hole of radius r at (x, y) clipped to the origin-centered circle."""
+    d = math.hypot(x, y)
+    if d >= r + radius - EPS:
+        return []
+    if d <= abs(radius - r):
+        # one circle contains the other
+        if r <= radius:
+            return [_full_circle(x, y, r)]
+        return [_full_circle(0.0, 0.0, radius)]
+    # chord between the two intersection points, at distance a from the hole center
+    a = (d * d + r * r - radius * radius) / (2.0 * d)
+    hh = math.sqrt(max(r * r - a * a, 0.0))
+    ux = -x / d
+    uy = -y / d
+    mx = x + a * ux
+    my = y + a * uy
+    p = (mx - hh * uy, my + hh * ux)
+    q = (mx + hh * uy, my - hh * ux)
+    alpha = math.acos(max(-1.0, min(1.0, a / r)))             # half-angle of the hole arc
+    beta = math.acos(max(-1.0, min(1.0, (d - a) / radius)))   # half-angle of the region arc
+    # hole arc q -> p (counter-clockwise about the hole), then region arc p -> q
+    return [[(q[0], q[1], math.tan(alpha / 2.0)), (p[0], p[1], math.tan(beta / 2.0))]]
+
+
+def clip_square_to_circle(x, y, h, radius):
+    """Axis-aligned square hole of half-side h at (x, y) clipped to the origin-centered circle."""
+    return _disk_box(0.0, 0.0, radius, x - h, y - h, x + h, y + h)
+
+
+def _full_circle(cx, cy, r):
+    # two half-circle bulges
+    return [(cx - r, cy, 1.0), (cx + r, cy, 1.0)]
+
+
+def _disk_box(cx, cy, r, x0, y0, x1, y1):
+    """Intersection of the disk (cx, cy, r) with the box [x0, x1] x [y0, y1].
+
+    The clipped boundary visits its vertices in the same order as a walk around
+    the box, so the box edges are walked counter-clockwise collecting the corners
+    inside the disk and the points where an edge meets the circle.  Between two
+    consecutive vertices the boundary runs along the box edge when no box corner
+    lies between them, and along the circle otherwise.
+    """
+    r2 = r * r
+    near = r2 + 3.0 * r * EPS  # corners this close to the circle count as on it
+    verts = []  # (x, y, edge, distance along edge); distance 0 is the corner
+
+    for e, px, py, ex, ey, length in ((0, x0, y0, 1.0, 0.0, x1 - x0), (1, x1, y0, 0.0, 1.0, y1 - y0),
+                                      (2, x1, y1, -1.0, 0.0, x1 - x0), (3, x0, y1, 0.0, -1.0, y1 - y0)):
+        dx = px - cx
+        dy = py - cy
+        d2 = dx * dx + dy * dy
+        if d2 <= near:
+            verts.append((px, py, e, 0.0))
+        # circle crossings of the edge line, as distances from the corner;
+        # crossings at either end are already covered by the corner test
+        b = dx * ex + dy * ey
+        disc = b * b - d2 + r2
+        if disc <= 0.0:
+            continue  # misses or only touches the edge line
+        root = math.sqrt(disc)
+        for t in (-b - root, -b + root):
+            if EPS < t < length - EPS:
+                verts.append((px + t * ex, py + t * ey, e, t))
+
+    if len(verts) < 2:
+        if not verts and x0 + r <= cx <= x1 - r and y0 + r <= cy <= y1 - r:
+            return [_full_circle(cx, cy, r)]
+        return []  # disjoint, or touching at a single point
+
+    n = len(verts)
+    loop = []
+    for k in range(n):
+        px, py, ep, tp = verts[k]
+        qx, qy, eq, tq = verts[(k + 1) % n]
+        bulge = 0.0
+        if not ((eq == ep and tq > tp) or (eq == (ep + 1) % 4 and tq == 0.0)):
+            sweep = (math.atan2(qy - cy, qx - cx) - math.atan2(py - cy, px - cx)) % _TWO_PI
+            bulge = math.tan(sweep / 4.0)
+        loop.append((px, py, bulge))
+    return [loop]
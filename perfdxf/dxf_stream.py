@@ -0,0 +1,221 @@
+# dxf_stream.py
+# Streaming DXF writer for the Perf DXF Generator.
+#
+# Writes an ASCII DXF R12 file section by section while holes are generated, so
+# memory stays flat no matter how many holes a panel has.  R12 needs no entity
+# handles or OBJECTS section, which is what makes single-pass output possible;
+# closed outlines are written as POLYLINE/VERTEX/SEQEND with arc bulges.
+# The add_circle / add_lwpolyline / add_blockref methods mirror ezdxf's
+# modelspace API, and new_block() mirrors doc.blocks.new(), so the generator can
+# draw into either one.
+
+LAYERS = [("OUTER", 7), ("HOLES", 3), ("HOLES-CLIPPED", 1)]
+
+FLUSH_BYTES = 1 << 20  # hand buffered text to the stream about once per MiB
+
+
+def _circle(layer, x, y, r):
+    return f"  0\nCIRCLE\n  8\n{layer}\n 10\n{float(x)}\n 20\n{float(y)}\n 30\n0.0\n 40\n{float(r)}\n"
+
+
+def _polyline(layer, points, format, close):
+    bi = format.find("b")
+    parts = [f"  0\nPOLYLINE\n  8\n{layer}\n 66\n1\n 10\n0.0\n 20\n0.0\n 30\n0.0\n 70\n{1 if close else 0}\n"]
+    for p in points:
+        parts.append(f"  0\nVERTEX\n  8\n{layer}\n 10\n{float(p[0])}\n 20\n{float(p[1])}\n 30\n0.0\n")
+        if bi >= 0 and len(p) > bi and p[bi]:
+            parts.append(f" 42\n{float(p[bi])}\n")
+    parts.append(f"  0\nSEQEND\n  8\n{layer}\n")
+    return "".join(parts)
+
+
+def _insert(name, insert, attribs):
+    parts = [f"  0\nINSERT\n  8\n{attribs.get('layer', '0')}\n  2\n{name}\n"
+             f" 10\n{float(insert[0])}\n 20\n{float(insert[1])}\n 30\n0.0\n"]
+    cols = int(attribs.get("column_count", 1))
+    rows = int(attribs.get("row_count", 1))
+    if cols > 1 or rows > 1:
+        parts.append(f" 70\n{cols}\n 71\n{rows}\n"
+                     f" 44\n{float(attribs.get('column_spacing', 0.0))}\n"
+                     f" 45\n{float(attribs.get('row_spacing', 0.0))}\n")
+    return "".join(parts)
+
+
+class EntityBuffer:
+    """Entities rendered to DXF text in memory, for DXFStreamWriter.add_entities().
+
+    Same drawing methods as the writer.  R12 entities carry no handles, so
+    text rendered elsewhere (e.g. in a worker process) is exactly what the
+    writer itself would have produced.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.entities_written = 0
+
+    def add_circle(self, center, radius, dxfattribs=None):
+        self.parts.append(_circle((dxfattribs or {}).get("layer", "0"), center[0], center[1], radius))
+        self.entities_written += 1
+
+    def add_lwpolyline(self, points, format="xyseb", close=False, dxfattribs=None):
+        self.parts.append(_polyline((dxfattribs or {}).get("layer", "0"), points, format, close))
+        self.entities_written += 1
+
+    def add_blockref(self, name, insert, dxfattribs=None):
+        self.parts.append(_insert(name, insert, dxfattribs or {}))
+        self.entities_written += 1
+
+    def text(self):
+        return "".join(self.parts)
+
+
+class _Block:
+    """Block definition collected in memory; see DXFStreamWriter.new_block()."""
+
+    def __init__(self, name):
+        self.name = name
+        self.parts = []
+
+    def add_circle(self, center, radius, dxfattribs=None):
+        self.parts.append(_circle((dxfattribs or {}).get("layer", "0"), center[0], center[1], radius))
+
+    def add_lwpolyline(self, points, format="xyseb", close=False, dxfattribs=None):
+        self.parts.append(_polyline((dxfattribs or {}).get("layer", "0"), points, format, close))
+
+    def text(self):
+        return (f"  0\nBLOCK\n  8\n0\n  2\n{self.name}\n 70\n0\n 10\n0.0\n 20\n0.0\n 30\n0.0\n"
+                f"  3\n{self.name}\n" + "".join(self.parts) + "  0\nENDBLK\n  8\n0\n")
+
+
+class DXFStreamWriter:
+    """Write a DXF R12 file to a binary stream or path, one entity at a time.
+
+    Use as a context manager, or call close() to write the trailer.  The stream
+    is only closed by close() when the writer opened it from a path.
+    """
+
+    def __init__(self, target, layers=LAYERS, insunits=1):
+        if hasattr(target, "write"):
+            self._stream = target
+            self._owns_stream = False
+        else:
+            self._stream = open(target, "wb")
+            self._owns_stream = True
+        self._layers = list(layers)
+        self._insunits = insunits
+        self._blocks = []
+        self._buf = []
+        self._buf_len = 0
+        self.entities_written = 0
+        self.bytes_written = 0
+        self._started = False
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self):
+        """Stop without writing the trailer; closes the stream if we opened it."""
+        self._closed = True
+        self._buf = []
+        if self._owns_stream:
+            self._stream.close()
+
+    # ---------------- Blocks ----------------
+    def new_block(self, name):
+        """Define a block; its entities are drawn relative to the origin.
+
+        Blocks must be defined before the first entity is added, since the
+        BLOCKS section precedes ENTITIES in the file.
+        """
+        if self._started:
+            raise RuntimeError("Blocks must be defined before any entity is written.")
+        block = _Block(name)
+        self._blocks.append(block)
+        return block
+
+    # ---------------- Entities (ezdxf modelspace-style API) ----------------
+    def add_circle(self, center, radius, dxfattribs=None):
+        self._emit(_circle((dxfattribs or {}).get("layer", "0"), center[0], center[1], radius))
+
+    def add_lwpolyline(self, points, format="xyseb", close=False, dxfattribs=None):
+        """Closed or open 2D polyline; points are tuples laid out as in ``format``."""
+        self._emit(_polyline((dxfattribs or {}).get("layer", "0"), points, format, close))
+
+    def add_blockref(self, name, insert, dxfattribs=None):
+        """INSERT of a block; column_count/row_count attribs make it a MINSERT array."""
+        self._emit(_insert(name, insert, dxfattribs or {}))
+
+    def add_entities(self, text, count):
+        """Append ``count`` entities already rendered by an EntityBuffer."""
+        if not self._started:
+            self._write_head()
+        self._buf.append(text)
+        self._buf_len += len(text)
+        self.entities_written += count
+        if self._buf_len >= FLUSH_BYTES:
+            self._flush()
+
+    # ---------------- Sections ----------------
+    def _write_head(self):
+        parts = [
+            "  0\nSECTION\n  2\nHEADER\n",
+            "  9\n$ACADVER\n  1\nAC1009\n",
+            f"  9\n$INSUNITS\n 70\n{int(self._insunits)}\n",
+            "  0\nENDSEC\n",
+            "  0\nSECTION\n  2\nTABLES\n",
+            "  0\nTABLE\n  2\nLTYPE\n 70\n1\n",
+            "  0\nLTYPE\n  2\nCONTINUOUS\n 70\n0\n  3\nSolid line\n 72\n65\n 73\n0\n 40\n0.0\n",
+            "  0\nENDTAB\n",
+            f"  0\nTABLE\n  2\nLAYER\n 70\n{len(self._layers) + 1}\n",
+        ]
+        for name, color in [("0", 7)] + self._layers:
+            parts.append(f"  0\nLAYER\n  2\n{name}\n 70\n0\n 62\n{int(color)}\n  6\nCONTINUOUS\n")
+        parts += [
+            "  0\nENDTAB\n",
+            "  0\nENDSEC\n",
+            "  0\nSECTION\n  2\nBLOCKS\n",
+        ]
+        parts += [block.text() for block in self._blocks]
+        parts += [
+            "  0\nENDSEC\n",
+            "  0\nSECTION\n  2\nENTITIES\n",
+        ]
+        self._buf.append("".join(parts))
+        self._started = True
+
+    def _emit(self, text):
+        if not self._started:
+            self._write_head()
+        self._buf.append(text)
+        self._buf_len += len(text)
+        self.entities_written += 1
+        if self._buf_len >= FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self):
+        data = "".join(self._buf).encode("ascii")
+        self._stream.write(data)
+        self.bytes_written += len(data)
+        self._buf = []
+        self._buf_len = 0
+
+    def close(self):
+        """Finish the ENTITIES section, write EOF and flush everything."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._started:
+            self._write_head()
+        self._buf.append("  0\nENDSEC\n  0\nEOF\n")
+        self._flush()
+        if self._owns_stream:
+            self._stream.close()
+        elif hasattr(self._stream, "flush"):
+            self._stream.flush()
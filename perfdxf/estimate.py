@@ -0,0 +1,161 @@
+# estimate.py
+# Quote figures for a panel spec without generating any geometry.
+#
+#   from perfdxf.estimate import estimate
+#   est = estimate(check_params({...}))
+#   print(est["holes"], est["open_area_pct"], est["cut_length"])
+#
+# The lattice is classified in CHUNK-sized batches exactly as generate_dxf
+# does, but only counted.  Full holes all have the same area and perimeter.
+# Boundary holes are clipped in closed form (clip.py) and the area and length
+# of their bulge loops are summed exactly, arcs included.  Holes whose clipped
+# shapes are congruent (same offsets from the edges they cross, same distance
+# from a circular blank's center, ...) are clipped once, the way memo.py
+# keys its prototypes, so a million-hole panel takes tens of milliseconds.
+# Outline panels clip every boundary hole with Shapely instead.
+
+import math
+import time
+
+import numpy as np
+
+from .generator import Panel, CHUNK
+from .grid import FULL, CLIPPED
+from .memo import QUANTUM
+
+
+def loop_area(loop):
+    """Signed area of a closed (x, y, bulge) loop; positive when counter-clockwise."""
+    area = 0.0
+    n = len(loop)
+    for k, (x0, y0, b) in enumerate(loop):
+        x1, y1 = loop[(k + 1) % n][:2]
+        area += (x0 * y1 - x1 * y0) / 2.0
+        if b:
+            # circular segment between the chord and the arc, on the arc's side
+            theta = 4.0 * math.atan(abs(b))
+            c = math.hypot(x1 - x0, y1 - y0)
+            r = c / (2.0 * math.sin(theta / 2.0))
+            area += math.copysign(r * r * (theta - math.sin(theta)) / 2.0, b)
+    return area
+
+
+def loop_length(loop):
+    """Perimeter of a closed (x, y, bulge) loop, arcs at their true length."""
+    length = 0.0
+    n = len(loop)
+    for k, (x0, y0, b) in enumerate(loop):
+        x1, y1 = loop[(k + 1) % n][:2]
+        c = math.hypot(x1 - x0, y1 - y0)
+        if b:
+            theta = 4.0 * math.atan(abs(b))
+            c *= theta / (2.0 * math.sin(theta / 2.0))  # arc = r * theta, r = c / (2 sin(theta / 2))
+        length += c
+    return length
+
+
+def _shape_keys(panel, xs, ys):
+    """Integer rows that are equal for boundary holes with congruent clipped shapes."""
+    def q(v):
+        return np.rint(v / QUANTUM).astype(np.int64)
+
+    h = panel.h
+    if panel.shape_choice == "rectangle":
+        hx, hy = panel.bounds
+        # offsets to the four edges; an edge at least h away doesn't shape the hole
+        return np.stack([q(np.minimum(v, h)) for v in (xs + hx, hx - xs, ys + hy, hy - ys)], axis=1)
+    if panel.hole_shape_choice == "circle":
+        return q(np.hypot(xs, ys))[:, None]
+    ax, ay = np.abs(xs), np.abs(ys)
+    return np.stack([q(np.minimum(ax, ay)), q(np.maximum(ax, ay))], axis=1)
+
+
+def clipped_totals(panel, xs, ys):
+    """(area, cut length) summed over the clipped boundary holes centered at (xs, ys)."""
+    if not len(xs):
+        return 0.0, 0.0
+    if panel.region is not None:
+        reps, counts = np.arange(len(xs)), np.ones(len(xs), dtype=np.int64)
+    else:
+        _, reps, counts = np.unique(_shape_keys(panel, xs, ys), axis=0, return_index=True, return_counts=True)
+    area = length = 0.0
+    for k, n in zip(reps.tolist(), counts.tolist()):
+        loops = panel.clip(float(xs[k]), float(ys[k]))
+        area += n * sum(loop_area(loop) for loop in loops)
+        length += n * sum(loop_length(loop) for loop in loops)
+    return area, length
+
+
+def blank(panel):
+    """(area, perimeter) of the blank, cutouts excluded."""
+    if panel.shape_choice == "rectangle":
+        hx, hy = panel.outer
+        return 4.0 * hx * hy, 4.0 * (hx + hy)
+    if panel.region is not None:
+        from .outline import _even_odd
+
+        return _even_odd(panel.outer).area, sum(loop_length(loop) for loop in panel.outer)
+    r = panel.outer[0]
+    return math.pi * r * r, 2.0 * math.pi * r
+
+
+def summary(panel, full, clipped, totals, keep_clipped):
+    """Estimate dict from counts: ``full`` holes, ``clipped`` boundary holes with ``totals`` from clipped_totals()."""
+    if panel.hole_shape_choice == "circle":
+        hole_area, hole_length = math.pi * panel.h * panel.h, 2.0 * math.pi * panel.h
+    else:
+        hole_area, hole_length = panel.hole_size * panel.hole_size, 4.0 * panel.hole_size
+    if not keep_clipped:
+        clipped, totals = 0, (0.0, 0.0)
+    blank_area, outer_length = blank(panel)
+    open_area = full * hole_area + totals[0]
+    hole_cuts = full * hole_length + totals[1]
+    return {
+        "holes": full + clipped,
+        "holes_considered": len(panel.lattice),
+        "holes_full": full,
+        "holes_clipped": clipped,
+        "blank_area": blank_area,
+        "open_area": open_area,
+        "open_area_pct": 100.0 * open_area / blank_area if blank_area else 0.0,
+        "clipped_area": totals[0],
+        "cut_length": outer_length + hole_cuts,
+        "cut_length_holes": hole_cuts,
+    }
+
+
+def estimate(params):
+    """Hole counts, open area and cut length of checked ``params`` (see check_params).
+
+    Areas are in square inches and lengths in inches.  Counts match what
+    generate_dxf would write: boundary holes are only counted (and cut) with
+    keep_clipped.  ``cut_length`` includes the blank's outline; ``seconds``
+    is the time taken.
+    """
+    t0 = time.perf_counter()
+    panel = Panel(params)
+    lattice = panel.lattice
+    full = 0
+    cx, cy = [], []
+    for start in range(0, len(lattice), CHUNK):
+        xs, ys = lattice.centers(start, start + CHUNK)
+        codes = panel.classify(xs, ys)
+        full += int(np.count_nonzero(codes == FULL))
+        at = codes == CLIPPED
+        cx.append(xs[at])
+        cy.append(ys[at])
+    cx = np.concatenate(cx) if cx else np.empty(0)
+    cy = np.concatenate(cy) if cy else np.empty(0)
+    keep = bool(params["keep_clipped"])
+    result = summary(panel, full, len(cx), clipped_totals(panel, cx, cy) if keep else (0.0, 0.0), keep)
+    result["seconds"] = round(time.perf_counter() - t0, 6)
+    return result
+
+
+def format_estimate(est):
+    """Short human-readable table of an estimate()."""
+    return "\n".join([
+        f"Holes:          {est['holes']:>14,}  ({est['holes_full']:,} full, {est['holes_clipped']:,} clipped)",
+        f"Open area:      {est['open_area_pct']:>13.2f}%  ({est['open_area']:,.3f} of {est['blank_area']:,.3f} sq in)",
+        f"Cut length:     {est['cut_length']:>14,.2f} in  ({est['cut_length_holes']:,.2f} in of holes)",
+    ])
@@ -0,0 +1,440 @@
+# generator.py
+# Core panel generator: lattice -> classify -> clip -> DXF entities.
+#
+# ezdxf is only imported for output_format "dxf"; the streaming writers
+# (dxf_stream.py, backends.py) need nothing beyond numpy.
+
+import io
+import os
+
+from .grid import Lattice, classify_rectangle, classify_circle, full_arrays, OUTSIDE, FULL, CLIPPED
+from .dxf_stream import DXFStreamWriter, EntityBuffer, LAYERS
+from .backends import BinaryDXFWriter, SVGWriter, GCodeWriter
+from .clip import clip_circle_to_rect, clip_square_to_rect, clip_circle_to_circle, clip_square_to_circle
+from .params import OPTION_DEFAULTS
+from .instrument import Recorder, recorder
+from .symmetry import Symmetry
+from .memo import ClipMemo
+
+# Bump whenever generate_dxf output changes for the same params (invalidates cached DXFs)
+GENERATOR_VERSION = "2"
+
+CHUNK = 65536  # hole centers classified per batch
+PROGRESS_STEP = 4096  # holes drawn between progress callbacks
+HOLE_BLOCK = "HOLE"
+
+
+def _rect_coords(half_x, half_y):
+    """Closed CCW ring of an origin-centered rectangle (last point repeats the first)."""
+    return [(-half_x, -half_y), (half_x, -half_y), (half_x, half_y), (-half_x, half_y), (-half_x, -half_y)]
+
+
+def _new_document(layers):
+    import ezdxf
+
+    doc = ezdxf.new()
+    doc.header["$INSUNITS"] = 1
+    for lname, color in layers:
+        if lname not in doc.layers:
+            doc.layers.add(name=lname, color=color)
+    return doc
+
+
+def _save_document(doc, save_path):
+    """Save an ezdxf document to a path or binary stream; returns the byte count."""
+    if hasattr(save_path, "write"):
+        text = io.StringIO()
+        doc.write(text)
+        data = text.getvalue().encode(doc.output_encoding)
+        save_path.write(data)
+        return len(data)
+    doc.saveas(save_path)
+    return os.path.getsize(save_path)
+
+
+class Panel:
+    """Geometry of one panel: outer outline, usable region, hole lattice.
+
+    Holds the classify/clip functions matching the outer and hole shapes, so
+    callers other than generate_dxf (benchmarks, previews) run the same steps.
+    """
+
+    def __init__(self, params):
+        self.shape_choice = params["shape_choice"]
+        offset = float(params["offset"])
+        self.hole_shape_choice = params["hole_shape_choice"]
+        self.hole_size = float(params["hole_size"])
+        self.step = float(params["spacing"])  # center-to-center
+        self.pattern_choice = params["pattern_choice"]
+        self.keep_clipped = bool(params["keep_clipped"])
+        self.hole_radius = self.hole_size / 2.0 if self.hole_shape_choice == "circle" else None
+        self.h = self.hole_size / 2.0  # radius or half-side, for clipping
+        self.region = None  # OutlineRegion for outlines read from a DXF
+        center = (0.0, 0.0)
+
+        if self.shape_choice == "rectangle":
+            outer_length = float(params["outer_length"])
+            outer_width = float(params["outer_width"])
+            inner_length = outer_length - 2 * offset
+            inner_width = outer_width - 2 * offset
+            if inner_length <= 0 or inner_width <= 0:
+                raise ValueError("Offset too large for given rectangle dimensions.")
+            self.outer = (outer_length / 2, outer_width / 2)
+            grid_span_x = inner_length
+            grid_span_y = inner_width
+            self.bounds = (inner_length / 2, inner_width / 2)
+            self._classify = classify_rectangle
+            self._clip = clip_circle_to_rect if self.hole_shape_choice == "circle" else clip_square_to_rect
+        elif self.shape_choice == "outline":
+            from .outline import OutlineRegion, read_outline
+
+            loops, keepouts = read_outline(params["outline_path"], params.get("outline_layer"),
+                                           params.get("keepout_layer"))
+            self.region = OutlineRegion(loops, keepouts, offset, self.hole_shape_choice, self.hole_size, self.step)
+            self.outer = loops
+            x0, y0, x1, y1 = self.bounds = self.region.bounds
+            grid_span_x = x1 - x0
+            grid_span_y = y1 - y0
+            center = ((x0 + x1) / 2, (y0 + y1) / 2)
+        else:
+            outer_diameter = float(params["outer_diameter"])
+            inner_radius = (outer_diameter / 2) - offset
+            if inner_radius <= 0:
+                raise ValueError("Offset too large for given diameter.")
+            self.outer = (outer_diameter / 2,)
+            grid_span_x = grid_span_y = inner_radius * 2
+            self.bounds = (inner_radius,)
+            self._classify = classify_circle
+            self._clip = clip_circle_to_circle if self.hole_shape_choice == "circle" else clip_square_to_circle
+
+        self.lattice = Lattice(self.pattern_choice, grid_span_x, grid_span_y, self.step, center)
+        self.square = _rect_coords(self.h, self.h) if self.hole_shape_choice == "square" else None
+
+    def classify(self, xs, ys):
+        """OUTSIDE / FULL / CLIPPED code for each hole center."""
+        if self.region is not None:
+            return self.region.classify(xs, ys)
+        return self._classify(xs, ys, *self.bounds, self.hole_shape_choice, self.hole_size)
+
+    def clip(self, x, y):
+        """Bulge loops of the hole at (x, y) cut to the usable region."""
+        if self.region is not None:
+            return self.region.clip(x, y)
+        return self._clip(x, y, self.h, *self.bounds)
+
+    def extent(self):
+        """(x0, y0, x1, y1) box around the outer outline."""
+        if self.shape_choice == "rectangle":
+            hx, hy = self.outer
+            return -hx, -hy, hx, hy
+        if self.region is not None:
+            from .outline import flatten
+
+            pts = [p for loop in self.outer for p in flatten(loop)]
+            xs, ys = zip(*pts)
+            return min(xs), min(ys), max(xs), max(ys)
+        r = self.outer[0]
+        return -r, -r, r, r
+
+    def add_outer(self, msp):
+        if self.shape_choice == "rectangle":
+            msp.add_lwpolyline(_rect_coords(*self.outer), close=True, dxfattribs={"layer": "OUTER"})
+        elif self.region is not None:
+            for loop in self.outer:  # keep-outs are not cut, so not drawn
+                msp.add_lwpolyline(loop, format="xyb", close=True, dxfattribs={"layer": "OUTER"})
+        else:
+            msp.add_circle(center=(0, 0), radius=self.outer[0], dxfattribs={"layer": "OUTER"})
+
+    def add_hole(self, msp, x, y, layer="HOLES"):
+        """Draw one full hole centered at (x, y)."""
+        if self.hole_shape_choice == "circle":
+            msp.add_circle(center=(x, y), radius=self.hole_radius, dxfattribs={"layer": layer})
+        else:
+            sq = [(x + px, y + py) for px, py in self.square]
+            msp.add_lwpolyline(sq, close=True, dxfattribs={"layer": layer})
+
+
+# Streaming writer of each output_format but "dxf"; all take the same modelspace calls
+STREAM_WRITERS = {
+    "dxf-stream": lambda target, panel: DXFStreamWriter(target, layers=LAYERS, insunits=1),
+    "dxf-binary": lambda target, panel: BinaryDXFWriter(target, layers=LAYERS, insunits=1),
+    "svg": lambda target, panel: SVGWriter(target, panel.extent(), layers=LAYERS),
+    "gcode": lambda target, panel: GCodeWriter(target),
+}
+
+
+def open_writer(output_format, save_path, panel):
+    """Return (doc, msp) for ``output_format``; doc is None for the stream writers."""
+    if output_format in STREAM_WRITERS:
+        return None, STREAM_WRITERS[output_format](save_path, panel)
+    if output_format == "dxf":
+        doc = _new_document(LAYERS)
+        return doc, doc.modelspace()
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def close_writer(doc, msp, save_path):
+    """Finish the output; returns (entities, bytes) written."""
+    if doc is None:
+        msp.close()
+        return msp.entities_written, msp.bytes_written
+    return len(msp), _save_document(doc, save_path)
+
+
+def discard_writer(doc, msp, save_path):
+    """Drop a half-written output, deleting ``save_path`` if it is a path."""
+    if doc is None:
+        msp.abort()
+    if save_path is not None and not hasattr(save_path, "write"):
+        try:
+            os.remove(save_path)
+        except OSError:
+            pass
+
+
+def generate_dxf(params, save_path, observers=None, workers=None):
+    """Write the perforated panel described by ``params`` to ``save_path``.
+
+    ``params["output_format"]`` selects the writer: "dxf" (default) builds an
+    ezdxf document in memory and saves it; "dxf-stream" streams a DXF R12 file
+    while holes are generated; "dxf-binary", "svg" and "gcode" stream the
+    same entities as binary DXF, SVG or punch G-code (backends.py).
+    ``save_path`` may also be any writable binary stream.
+
+    ``params["hole_blocks"]`` controls how full holes are written: "none"
+    (default) draws each one; "insert" defines the hole once as block HOLE and
+    places one INSERT per hole; "minsert" covers them with rectangular MINSERT
+    arrays.  Clipped holes are always drawn individually.
+
+    ``params["symmetry"]`` clips one boundary hole per mirror/diagonal
+    symmetry class and reflects the result onto the others (symmetry.py);
+    the geometry is unchanged up to the last bit of the coordinates.
+    ``params["clip_memo"]`` likewise reuses clipped-hole prototypes keyed by
+    the hole's offset from the boundary (memo.py).  Neither applies to
+    outline panels (shape_choice "outline", see outline.py).
+
+    ``params["cut_order"]`` reorders the individually drawn holes to shorten
+    the machine's travel between them: "lattice" (default) keeps the lattice
+    order, "serpentine", "hilbert" and "nn" are described in order.py.  The
+    travel before and after is reported in the travel_* counters.  Ordering
+    needs every hole at once, so these runs hold the panel's holes in memory
+    and don't use ``workers``.
+
+    ``workers`` > 1 splits the lattice into CHUNK-sized tiles that a process
+    pool classifies, clips and renders to DXF text; the tiles are written
+    back in order, so the file is byte-for-byte the serial one.  Tiles are
+    ranges of emission indices, i.e. bands of full columns (straight) or
+    rows (staggered), so most of them reach the boundary: there is no
+    separate interior-tile path, and which holes are clipped is decided per
+    hole by the classification, as in a serial run.  Only "dxf-stream" output runs
+    in parallel, and not with clip_memo, whose prototypes depend on the
+    order holes are visited.  Phase times then add up the workers' time.
+
+    ``observers`` (see instrument.py) receive per-phase timings, counters and
+    progress; one raising instrument.Cancelled stops the run.  If generation
+    fails or is cancelled, up to and including the "save" phase, the file
+    at ``save_path`` is removed.
+    """
+    output_format = params.get("output_format", OPTION_DEFAULTS["output_format"])
+    hole_blocks = params.get("hole_blocks", OPTION_DEFAULTS["hole_blocks"])
+
+    rec = recorder(observers, params)
+    panel = Panel(params)
+    doc, msp = open_writer(output_format, save_path, panel)
+    written = doc is None  # the stream writer has already created save_path
+    try:
+        _draw(panel, doc, msp, hole_blocks, rec, dict(OPTION_DEFAULTS, **params), workers or 1)
+        written = True
+        entities, size = close_writer(doc, msp, save_path)
+        rec.count("entities", entities)
+        rec.count("bytes", size)
+        # observers may still cancel here, so the finished file is removed too
+        rec.lap("save")
+    except BaseException:
+        discard_writer(doc, msp, save_path if written else None)
+        raise
+    rec.finish()
+
+
+def _draw(panel, doc, msp, hole_blocks, rec, options, workers=1):
+    simple = panel.region is None  # symmetry and memo keys assume a centered rectangle/circle
+    memo = ClipMemo(panel) if options["clip_memo"] and simple else None
+    clip = panel.clip if memo is None else memo.clip
+    sym = Symmetry(panel, clip) if options["symmetry"] and simple else None
+    if hole_blocks != "none":
+        block = msp.new_block(HOLE_BLOCK) if doc is None else doc.blocks.new(name=HOLE_BLOCK)
+        panel.add_hole(block, 0, 0, layer="0")
+
+    panel.add_outer(msp)
+
+    lattice = panel.lattice
+    total = len(lattice)
+    rec.count("holes_considered", total)
+    rec.lap("setup")
+    walk = True  # whether any hole still has to be visited one by one
+    if hole_blocks == "minsert":
+        row_spacing = lattice.row_period * lattice.row_step
+        for i, j, ncols, nrows in full_arrays(lattice, panel.classify):
+            attribs = {"layer": "HOLES"}
+            if ncols > 1 or nrows > 1:
+                attribs.update(column_count=ncols, row_count=nrows,
+                               column_spacing=panel.step, row_spacing=row_spacing)
+            msp.add_blockref(HOLE_BLOCK, lattice.center(i, j), dxfattribs=attribs)
+            rec.count("holes_full", ncols * nrows)
+        walk = panel.keep_clipped
+        rec.lap("arrays")
+
+    starts = range(0, total if walk else 0, CHUNK)
+    if options["cut_order"] != "lattice":
+        _draw_ordered(panel, msp, starts, hole_blocks, clip, sym, rec, total, options["cut_order"])
+    # memo prototypes depend on the order holes are visited, so memo runs stay serial
+    elif workers > 1 and len(starts) > 1 and options["output_format"] == "dxf-stream" and memo is None:
+        _draw_parallel(msp, starts, workers, hole_blocks, rec, options, total)
+    else:
+        for start in starts:
+            _chunk(panel, msp, start, hole_blocks, clip, sym, rec, total)
+    if memo is not None:
+        rec.count("memo_hits", memo.hits)
+        rec.count("memo_misses", memo.misses)
+    if panel.region is not None:
+        rec.count("geos_calls", panel.region.geos_calls)
+    rec.progress(total, total)
+
+
+def _draw_parallel(msp, starts, workers, hole_blocks, rec, options, total):
+    """Run _chunk() for each tile (band) start in a process pool, writing results in order.
+
+    At most two tiles per worker are in flight, so memory stays bounded
+    however far the pool runs ahead of the writer.
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options, hole_blocks))
+    todo = iter(starts)
+    try:
+        pending = deque(pool.submit(_render_chunk, start) for start in islice(todo, 2 * workers))
+        while pending:
+            text, entities, phases, counters, done = pending.popleft().result()
+            start = next(todo, None)
+            if start is not None:
+                pending.append(pool.submit(_render_chunk, start))
+            msp.add_entities(text, entities)
+            rec.merge(phases, counters)
+            rec.lap("tiles")
+            rec.progress(done, total)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+_worker = None  # (panel, hole_blocks, sym) of a pool worker, built once per process
+
+
+def _init_worker(options, hole_blocks):
+    global _worker
+    panel = Panel(options)
+    sym = Symmetry(panel) if options["symmetry"] and panel.region is None else None
+    _worker = (panel, hole_blocks, sym)
+
+
+def _render_chunk(start):
+    """_chunk() into an EntityBuffer; returns its text plus the tile's phases and counters."""
+    panel, hole_blocks, sym = _worker
+    out = EntityBuffer()
+    rec = Recorder([])
+    geos_calls = panel.region.geos_calls if panel.region is not None else 0
+    _chunk(panel, out, start, hole_blocks, panel.clip, sym, rec, len(panel.lattice))
+    if panel.region is not None:
+        rec.count("geos_calls", panel.region.geos_calls - geos_calls)
+    return (out.text(), out.entities_written, rec.phases, rec.counters,
+            min(start + CHUNK, len(panel.lattice)))
+
+
+def _chunk(panel, msp, start, hole_blocks, clip, sym, rec, total):
+    """Classify, clip and draw lattice centers start..start + CHUNK - 1."""
+    n, holes, clipped = _select(panel, start, hole_blocks, clip, sym, rec)
+    _emit(panel, msp, holes, clipped, hole_blocks, rec, lambda m: start + m * n // len(holes), total)
+
+
+def _select(panel, start, hole_blocks, clip, sym, rec):
+    """Holes to draw among lattice centers start..start + CHUNK - 1.
+
+    Returns (centers covered, kept holes as (x, y, code) in lattice order,
+    loops of the kept holes that aren't FULL).
+    """
+    xs, ys = panel.lattice.centers(start, start + CHUNK)
+    rec.lap("grid")
+    codes = panel.classify(xs, ys)
+    if hole_blocks == "minsert":
+        keep = codes == CLIPPED  # full holes are already placed as arrays
+    else:
+        keep = (codes != OUTSIDE) if panel.keep_clipped else (codes == FULL)
+    holes = list(zip(xs[keep].tolist(), ys[keep].tolist(), codes[keep].tolist()))
+    rec.lap("classify")
+
+    # Only holes crossing the boundary are clipped, in closed form
+    if sym is None:
+        clipped = [clip(x, y) for x, y, code in holes if code != FULL]
+        rec.count("clip_calls", len(clipped))
+    else:
+        calls = sym.calls
+        clipped = sym.clip_chunk(start, codes, keep, holes)
+        rec.count("clip_calls", sym.calls - calls)
+        rec.count("clip_reused", len(clipped) - (sym.calls - calls))
+    rec.lap("clip")
+    return len(xs), holes, clipped
+
+
+def _emit(panel, msp, holes, clipped, hole_blocks, rec, done, total):
+    """Draw ``holes`` and the ``clipped`` loops of the non-FULL ones, in order.
+
+    ``done(m)`` maps holes drawn so far to lattice positions for progress.
+    """
+    loops = iter(clipped)
+    for k in range(0, len(holes), PROGRESS_STEP):
+        for x, y, code in holes[k:k + PROGRESS_STEP]:
+            if code == FULL:
+                if hole_blocks == "insert":
+                    msp.add_blockref(HOLE_BLOCK, (x, y), dxfattribs={"layer": "HOLES"})
+                else:
+                    panel.add_hole(msp, x, y)
+                continue
+            for loop in next(loops):
+                msp.add_lwpolyline(loop, format="xyb", close=True,
+                                   dxfattribs={"layer": "HOLES-CLIPPED"})
+        rec.progress(done(min(k + PROGRESS_STEP, len(holes))), total)
+    rec.count("holes_full", len(holes) - len(clipped))
+    rec.count("holes_clipped", len(clipped))
+    rec.count("loops", sum(map(len, clipped)))
+    rec.lap("entities")
+
+
+def _draw_ordered(panel, msp, starts, hole_blocks, clip, sym, rec, total, method):
+    """Like the _chunk() loop, but collects every hole first and draws them in ``method`` order.
+
+    Progress covers the lattice walk in its first half and drawing in the second.
+    """
+    import numpy as np
+    from .order import cut_order, travel
+
+    holes, clipped = [], []
+    for start in starts:
+        n, chunk_holes, chunk_clipped = _select(panel, start, hole_blocks, clip, sym, rec)
+        holes += chunk_holes
+        clipped += chunk_clipped
+        rec.progress((start + n) // 2, total)
+    if not holes:
+        return
+    xs, ys, codes = np.array(holes).T
+    perm = cut_order(method, xs, ys, panel.lattice)
+    rec.count("travel_before", round(travel(xs, ys)))
+    rec.count("travel_after", round(travel(xs, ys, perm)))
+    rec.lap("order")
+    # position of each hole's loops in ``clipped`` (lattice order)
+    which = np.cumsum(codes != FULL) - 1
+    perm = perm.tolist()
+    clipped = [clipped[which[k]] for k in perm if codes[k] != FULL]
+    holes = [holes[k] for k in perm]
+    half = total // 2
+    _emit(panel, msp, holes, clipped, hole_blocks, rec, lambda m: half + m * (total - half) // len(holes), total)
@@ -0,0 +1,150 @@
+# grid.py
+# Vectorized hole-center lattice and containment tests for the Perf DXF Generator.
+# Dependencies: numpy  (pip install numpy)
+
+import math
+
+import numpy as np
+
+
+# Classification codes returned by classify_*()
+OUTSIDE = 0   # hole does not overlap the usable region at all
+FULL = 1      # hole lies completely inside the usable region
+CLIPPED = 2   # hole crosses the boundary of the usable region
+
+
+class Lattice:
+    """Straight or staggered (60°) grid of hole centers, centered on ``center``.
+
+    Centers are numbered in the order the generator has always emitted them:
+    column by column for the straight pattern, row by row for the staggered one.
+    centers() materializes any index range of that sequence, so a large panel
+    can be walked in bounded-size chunks.
+    """
+
+    def __init__(self, pattern_choice, grid_span_x, grid_span_y, step, center=(0.0, 0.0)):
+        self.pattern_choice = pattern_choice
+        self.step = step
+        if pattern_choice == "straight":
+            self.row_step = step
+            self.nx = math.ceil(grid_span_x / step) + 1
+            self.ny = math.ceil(grid_span_y / step) + 1
+        else:
+            self.row_step = step * math.sqrt(3) / 2.0
+            self.ny = math.ceil(grid_span_y / self.row_step) + 1
+            self.nx = math.ceil(grid_span_x / step) + 2
+        wX = (self.nx - 1) * step
+        wY = (self.ny - 1) * self.row_step
+        self.x0 = center[0] - wX / 2
+        self.y0 = center[1] - wY / 2
+        # rows that line up vertically repeat every row_period rows
+        self.row_period = 1 if pattern_choice == "straight" else 2
+        self.stagger = 0.0 if pattern_choice == "straight" else step / 2.0
+
+    def __len__(self):
+        return self.nx * self.ny
+
+    def centers(self, start=0, stop=None):
+        """Return (xs, ys) float arrays for centers start..stop-1."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        k = np.arange(start, stop)
+        if self.pattern_choice == "straight":
+            i, j = np.divmod(k, self.ny)
+            return self.x0 + i * self.step, self.y0 + j * self.row_step
+        j, i = np.divmod(k, self.nx)
+        # odd rows are shifted half a pitch to the right
+        xs = self.x0 + i * self.step + np.where(j % 2 == 1, self.stagger, 0.0)
+        return xs, self.y0 + j * self.row_step
+
+    def rows(self, j0, j1):
+        """Return (xs, ys) as (rows, nx) arrays for rows j0..j1-1."""
+        j = np.arange(j0, min(j1, self.ny))[:, None]
+        i = np.arange(self.nx)[None, :]
+        xs = self.x0 + i * self.step
+        if self.stagger:
+            xs = xs + np.where(j % 2 == 1, self.stagger, 0.0)
+        xs = np.broadcast_to(xs, (j.shape[0], self.nx))
+        ys = np.broadcast_to(self.y0 + j * self.row_step, xs.shape)
+        return xs, ys
+
+    def center(self, i, j):
+        """Center of column i in row j."""
+        x = self.x0 + i * self.step
+        if j % 2 == 1:
+            x += self.stagger
+        return x, self.y0 + j * self.row_step
+
+
+def classify_rectangle(xs, ys, half_x, half_y, hole_shape_choice, hole_size):
+    """Classify hole centers against the centered rectangle |x| <= half_x, |y| <= half_y."""
+    ax = np.abs(xs)
+    ay = np.abs(ys)
+    h = hole_size / 2.0  # radius for circles, half-side for squares
+    full = (ax <= half_x - h) & (ay <= half_y - h)
+    if hole_shape_choice == "circle":
+        dx = np.maximum(ax - half_x, 0.0)
+        dy = np.maximum(ay - half_y, 0.0)
+        outside = (dx * dx + dy * dy) >= h * h
+    else:
+        outside = (ax >= half_x + h) | (ay >= half_y + h)
+    return _codes(full, outside)
+
+
+def classify_circle(xs, ys, radius, hole_shape_choice, hole_size):
+    """Classify hole centers against the origin-centered circle of the given radius."""
+    h = hole_size / 2.0
+    if hole_shape_choice == "circle":
+        d = np.hypot(xs, ys)
+        full = d <= radius - h
+        outside = d >= radius + h
+    else:
+        ax = np.abs(xs)
+        ay = np.abs(ys)
+        # fully inside when the square's circumcircle is inside (the generator's
+        # original rule; squares that fit but fail it are cut as clipped holes),
+        # outside when the nearest point of the square is outside
+        full = np.hypot(ax, ay) <= radius - h * math.sqrt(2)
+        outside = np.hypot(np.maximum(ax - h, 0.0), np.maximum(ay - h, 0.0)) >= radius
+    return _codes(full, outside)
+
+
+def _codes(full, outside):
+    codes = np.full(full.shape, CLIPPED, dtype=np.int8)
+    codes[outside] = OUTSIDE
+    codes[full] = FULL
+    return codes
+
+
+def full_arrays(lattice, classify, rows_per_batch=256):
+    """Cover the FULL holes of ``lattice`` with rectangular arrays.
+
+    ``classify(xs, ys)`` returns classification codes for the given centers.
+    Runs of consecutive FULL holes are found row by row, then runs with the same
+    columns on consecutive aligned rows (every row_period rows) are merged.
+    Yields (i, j, ncols, nrows) for the lower-left hole (column i, row j) of each
+    array; the array steps lattice.step in x and row_period * row_step in y.
+    """
+    runs = []  # (row parity, first col, last col + 1, row)
+    for j0 in range(0, lattice.ny, rows_per_batch):
+        xs, ys = lattice.rows(j0, j0 + rows_per_batch)
+        full = classify(xs, ys) == FULL
+        padded = np.zeros((full.shape[0], full.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = full
+        edges = np.diff(padded, axis=1)
+        for (r, i) in np.argwhere(edges == 1).tolist():
+            i_stop = i + int(np.argmax(edges[r, i:] == -1))
+            j = j0 + r
+            runs.append((j % lattice.row_period, i, i_stop, j))
+
+    runs.sort()
+    start = last = None
+    for parity, i, i_stop, j in runs:
+        if start is not None and (i, i_stop) == start[:2] and j == last + lattice.row_period:
+            last = j
+            continue
+        if start is not None:
+            yield start[0], start[2], start[1] - start[0], (last - start[2]) // lattice.row_period + 1
+        start = (i, i_stop, j)
+        last = j
+    if start is not None:
+        yield start[0], start[2], start[1] - start[0], (last - start[2]) // lattice.row_period + 1
@@ -0,0 +1,201 @@
+# instrument.py
+# Optional per-phase timers and counters for generate_dxf.
+#
+#   from perfdxf.instrument import Summary, ChromeTrace
+#   summary = Summary()
+#   generate_dxf(params, "panel.dxf", observers=[summary, ChromeTrace("trace.json")])
+#   print(summary.report)
+#
+# generate_dxf calls Recorder.lap()/count() a handful of times per CHUNK of
+# holes, never per hole; with no observers it uses OFF, whose methods do
+# nothing, so the disabled cost is a few no-op calls per 65536 holes.
+
+import json
+import os
+import sys
+import time
+
+# "tiles" is the wall time spent waiting for and writing pool workers' tiles
+PHASES = ("setup", "arrays", "grid", "classify", "clip", "order", "entities", "tiles", "save")
+
+COUNTERS = (
+    "holes_considered",  # lattice centers
+    "holes_full",        # full holes written (as entities, INSERTs or inside MINSERT arrays)
+    "holes_clipped",     # boundary holes written on HOLES-CLIPPED
+    "holes_discarded",   # considered - full - clipped
+    "clip_calls",        # closed-form clip evaluations
+    "clip_reused",       # clipped holes copied from an earlier result (symmetry)
+    "memo_hits",         # clips served from the prototype memo
+    "memo_misses",       # clips computed and added to the memo
+    "geos_calls",        # Shapely/GEOS operations
+    "loops",             # clipped outlines written
+    "travel_before",     # center-to-center travel (in) in lattice order, with cut_order
+    "travel_after",      # ... and in the chosen cut order
+    "entities",          # modelspace entities written
+    "bytes",             # bytes of DXF output
+)
+
+
+class Cancelled(Exception):
+    """Raise from an observer callback to stop generate_dxf.
+
+    generate_dxf removes the partial output file before re-raising.
+    """
+
+
+class Observer:
+    """Base class for generate_dxf observers; override what you need.
+
+    on_phase(name, start, seconds) is called for every timed span, with
+    ``start`` relative to the start of the run.  on_progress(done, total)
+    is called every few thousand holes with lattice positions processed.
+    on_finish(report) gets the totals: {"seconds", "phases": {name:
+    seconds}, "counters": {name: n}, "memo_hit_rate", "params"}.
+    """
+
+    def on_phase(self, name, start, seconds):
+        pass
+
+    def on_progress(self, done, total):
+        pass
+
+    def on_finish(self, report):
+        pass
+
+
+class Recorder:
+    """Collects phase times and counters and forwards them to observers."""
+
+    def __init__(self, observers, params=None):
+        self.observers = list(observers)
+        self.params = params
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.t0 = self._last = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to ``phase``."""
+        now = time.perf_counter()
+        seconds = now - self._last
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        for ob in self.observers:
+            ob.on_phase(phase, self._last - self.t0, seconds)
+        self._last = time.perf_counter()  # observer work is not charged to the next phase
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def merge(self, phases, counters):
+        """Add phase times and counters collected by another Recorder (a pool worker's)."""
+        for name, seconds in phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for name, n in counters.items():
+            self.counters[name] += n
+
+    def progress(self, done, total):
+        for ob in self.observers:
+            ob.on_progress(done, total)
+
+    def finish(self):
+        c = self.counters
+        c["holes_discarded"] = c["holes_considered"] - c["holes_full"] - c["holes_clipped"]
+        lookups = c["memo_hits"] + c["memo_misses"]
+        report = {
+            "seconds": round(time.perf_counter() - self.t0, 6),
+            "phases": {k: round(v, 6) for k, v in self.phases.items()},
+            "counters": dict(c),
+            "memo_hit_rate": round(c["memo_hits"] / lookups, 4) if lookups else None,
+            "params": self.params,
+        }
+        for ob in self.observers:
+            ob.on_finish(report)
+        return report
+
+
+class _Off:
+    """Stand-in Recorder when nothing observes the run."""
+
+    def lap(self, phase):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def merge(self, phases, counters):
+        pass
+
+    def progress(self, done, total):
+        pass
+
+    def finish(self):
+        return None
+
+
+OFF = _Off()
+
+
+def recorder(observers, params=None):
+    return Recorder(observers, params) if observers else OFF
+
+
+# ---------------- Observers ----------------
+class Summary(Observer):
+    """Keeps the final report in ``.report``."""
+
+    def __init__(self):
+        self.report = None
+
+    def on_finish(self, report):
+        self.report = report
+
+
+class PhaseLog(Observer):
+    """Structured log: one JSON object per phase span, then one for the totals."""
+
+    def __init__(self, target=None):
+        self._owns = not hasattr(target, "write") and target is not None
+        self._out = open(target, "w", encoding="utf-8") if self._owns else (target or sys.stderr)
+
+    def on_phase(self, name, start, seconds):
+        self._out.write(json.dumps({"event": "phase", "phase": name,
+                                    "start": round(start, 6), "seconds": round(seconds, 6)}) + "\n")
+
+    def on_finish(self, report):
+        self._out.write(json.dumps(dict(report, event="finish")) + "\n")
+        if self._owns:
+            self._out.close()
+        else:
+            self._out.flush()
+
+
+class ChromeTrace(Observer):
+    """Chrome trace-event JSON (chrome://tracing, Perfetto) written on finish.
+
+    Each phase span becomes a complete ("X") event; counters are attached to
+    a final "generate_dxf" event spanning the whole run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.events = []
+
+    def on_phase(self, name, start, seconds):
+        self.events.append({"name": name, "cat": "phase", "ph": "X", "pid": os.getpid(), "tid": 0,
+                            "ts": round(start * 1e6, 3), "dur": round(seconds * 1e6, 3)})
+
+    def on_finish(self, report):
+        self.events.append({"name": "generate_dxf", "cat": "run", "ph": "X", "pid": os.getpid(), "tid": 1,
+                            "ts": 0, "dur": round(report["seconds"] * 1e6, 3),
+                            "args": dict(report["counters"], phases=report["phases"])})
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+def format_report(report):
+    """Short human-readable table of a finish report."""
+    lines = [f"generate_dxf: {report['seconds']:.3f}s"]
+    lines += [f"  {name:<9}{secs:9.3f}s" for name, secs in report["phases"].items() if secs]
+    lines += [f"  {name:<17}{n:>12,}" for name, n in report["counters"].items()]
+    if report.get("memo_hit_rate") is not None:
+        lines.append(f"  memo hit rate    {report['memo_hit_rate']:>12.1%}")
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+# memo.py
+# Bounded LRU memo of clipped-hole prototypes.
+#
+# A clipped hole's shape depends only on where it sits relative to the
+# boundary feature that cuts it, so holes with the same (quantized) offset
+# share one prototype, stored as loops relative to the hole center:
+#
+# - rectangle, circular holes: the offsets to the edges the hole crosses.
+#   Every clipped hole of a column along a side edge (or a row along the top
+#   or bottom) has the same key; the prototype is translated onto each one.
+# - circle, circular holes: the distance from the center.  The prototype is
+#   kept for a hole on the +x axis and rotated onto each hole.
+# - circle, square holes: (|x|, |y|) sorted, so holes related by the
+#   mirror/diagonal symmetries share a key; the prototype is reflected.
+# - rectangle, square holes are not memoized: the direct clip is four
+#   min/max operations, cheaper than any lookup.
+#
+# Offsets are quantized to QUANTUM, far below any machining tolerance, so
+# the geometry is the same as clipping directly, up to the last bits of the
+# coordinates.
+
+import math
+from collections import OrderedDict
+
+from .symmetry import reflect_loop
+
+QUANTUM = 1e-9  # inches
+MEMO_SIZE = 4096  # prototypes kept
+
+
+def _q(v):
+    return round(v / QUANTUM)
+
+
+class ClipMemo:
+    """panel.clip() through an LRU memo of prototypes; see the module notes."""
+
+    def __init__(self, panel, maxsize=MEMO_SIZE):
+        self.panel = panel
+        self.maxsize = maxsize
+        self._protos = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if panel.shape_choice == "rectangle":
+            self.clip = self._clip_rect if panel.hole_shape_choice == "circle" else panel.clip
+        else:
+            self.clip = self._clip_disk if panel.hole_shape_choice == "circle" else self._clip_sym
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def _lookup(self, key):
+        proto = self._protos.get(key)
+        if proto is not None:
+            self._protos.move_to_end(key)
+            self.hits += 1
+        return proto
+
+    def _store(self, key, proto):
+        self.misses += 1
+        self._protos[key] = proto
+        if len(self._protos) > self.maxsize:
+            self._protos.popitem(last=False)
+
+    @staticmethod
+    def _relative(loops, cx, cy):
+        return [[(x - cx, y - cy, b) for x, y, b in loop] for loop in loops]
+
+    def _clip_rect(self, x, y):
+        half_x, half_y = self.panel.bounds
+        h = self.panel.h
+        # offsets to the edges the hole crosses; the others don't shape it
+        left = x + half_x
+        right = half_x - x
+        bottom = y + half_y
+        top = half_y - y
+        key = (_q(left) if left < h else None, _q(right) if right < h else None,
+               _q(bottom) if bottom < h else None, _q(top) if top < h else None)
+        proto = self._lookup(key)
+        if proto is None:
+            loops = self.panel.clip(x, y)
+            self._store(key, self._relative(loops, x, y))
+            return loops
+        return [[(x + dx, y + dy, b) for dx, dy, b in loop] for loop in proto]
+
+    def _clip_disk(self, x, y):
+        d = math.hypot(x, y)
+        key = _q(d)
+        proto = self._lookup(key)
+        if proto is None:
+            loops = self.panel.clip(x, y)
+            if d == 0.0:
+                return loops  # no direction to rotate from; never a boundary hole in practice
+            # store it as seen from a hole on the +x axis
+            c, s = x / d, -y / d
+            self._store(key, [[(dx * c - dy * s, dx * s + dy * c, b) for dx, dy, b in loop]
+                              for loop in self._relative(loops, x, y)])
+            return loops
+        c, s = x / d, y / d
+        return [[(x + dx * c - dy * s, y + dx * s + dy * c, b) for dx, dy, b in loop] for loop in proto]
+
+    def _clip_sym(self, x, y):
+        ax, ay = abs(x), abs(y)
+        swap = ax > ay
+        key = (_q(ay), _q(ax)) if swap else (_q(ax), _q(ay))
+        proto = self._lookup(key)
+        # reflection taking this hole onto the canonical one (|x| <= |y|, both >= 0)
+        sx = -1 if x < 0 else 1
+        sy = -1 if y < 0 else 1
+        if proto is None:
+            loops = self.panel.clip(x, y)
+            rel = self._relative(loops, x, y)
+            # to canonical: flip signs first, then swap
+            canon = [reflect_loop(loop, False, sx, sy) for loop in rel]
+            if swap:
+                canon = [reflect_loop(loop, True, 1, 1) for loop in canon]
+            self._store(key, canon)
+            return loops
+        # from canonical: swap first, then flip signs (reflect_loop's order)
+        moved = [reflect_loop(loop, swap, sx, sy) for loop in proto] if (swap or sx < 0 or sy < 0) else proto
+        return [[(x + dx, y + dy, b) for dx, dy, b in loop] for loop in moved]
@@ -0,0 +1,282 @@
+# optimize.py
+# Spec optimizer: search hole size, spacing and pattern for a target open area.
+#
+#   from perfdxf.optimize import search
+#   ranked = search(base, open_area_pct=40, min_web=0.0625, max_holes=50000)
+#   generate_dxf(ranked[0]["params"], "panel.dxf")
+#
+#   python -m perfdxf.optimize --length 48 --width 24 --hole circle --open-area 40 \
+#       --min-web 0.0625 --max-holes 50000
+#   python -m perfdxf.optimize ... --pick 1 -o panel.dxf
+#
+# ``base`` is a params dict with everything but hole_size, spacing and
+# pattern_choice: blank, offset, hole shape, output options.  The search
+# runs in two stages:
+#
+# 1. Every hole size in ``hole_sizes`` (fractional punch sizes by default)
+#    gets the spacings on a SPACING_STEP grid next to the one that would give
+#    the target open area on an endless lattice over the usable part of the
+#    blank, for each pattern.  Without clipped holes the usable part shrinks
+#    to where a hole of that size fits whole.  Open area, web width and hole count of these
+#    candidates are closed-form numpy expressions over the whole grid at
+#    once; the SHORTLIST closest to the target that meet the constraints go on.
+# 2. The shortlist is evaluated exactly by estimate.py (classified lattice,
+#    analytically clipped boundary holes) across a process pool, and ranked:
+#    specs meeting every target (open area within ``tolerance``, web width,
+#    hole count) first, then by distance from the open-area target, then
+#    wider webs, then fewer holes.
+#
+# No DXF is written until the caller generates the chosen candidate.
+
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .params import CHOICES, check_params
+
+HOLE_SIZES = tuple(k / 32 for k in range(2, 33))  # 1/16" .. 1" in 1/32" steps
+SPACING_STEP = 1 / 64  # inches; spacings are searched on this grid
+SPACING_NEIGHBORS = 2  # grid spacings tried on each side of the ideal one
+SHORTLIST = 24  # candidates evaluated exactly
+TOLERANCE = 1.0  # percentage points of open area a candidate may miss the target by
+PATTERNS = CHOICES["pattern_choice"]
+
+_ROW = math.sqrt(3) / 2.0  # staggered row pitch / spacing
+
+
+def web_width(hole_shape_choice, hole_size, spacing, pattern_choice):
+    """Narrowest material between neighbouring holes (negative when they overlap).
+
+    Works on numpy arrays as well as numbers.
+    """
+    if hole_shape_choice == "circle" or pattern_choice == "straight":
+        # staggered neighbours are all one spacing apart; straight squares face each other
+        return spacing - hole_size
+    # staggered squares: next-row neighbours sit spacing/2 across and 0.866 spacing up
+    dx = spacing / 2.0 - hole_size
+    dy = spacing * _ROW - hole_size
+    corner = np.hypot(np.maximum(dx, 0.0), np.maximum(dy, 0.0))
+    return np.minimum(spacing - hole_size, np.where(dx < 0, dy, corner))
+
+
+def _cell(spacing, pattern_choice):
+    return spacing * spacing * (1.0 if pattern_choice == "straight" else _ROW)
+
+
+def _hole_area(hole_shape_choice, hole_size):
+    return math.pi * hole_size * hole_size / 4.0 if hole_shape_choice == "circle" else hole_size * hole_size
+
+
+def _areas(base, hole_sizes):
+    """(area where holes of each of ``hole_sizes`` can go, as an array; whole blank area).
+
+    That is the part of the blank inside the offset, or with keep_clipped
+    off only the part where the hole's center keeps it whole (grid.py).
+    """
+    from .generator import Panel
+    from .estimate import blank
+
+    # any valid hole will do; only the blank matters here
+    panel = Panel(check_params(dict(base, hole_size=1.0, spacing=1.0, pattern_choice="straight", keep_clipped=False)))
+    circle = base["hole_shape_choice"] == "circle"
+    margin = np.asarray(hole_sizes, dtype=float) / 2.0
+    if base.get("keep_clipped", True):
+        margin = np.zeros_like(margin)
+    elif panel.shape_choice == "circle" and not circle:
+        margin = margin * math.sqrt(2.0)  # squares must fit inside by their circumcircle
+    if panel.region is not None:
+        import shapely
+
+        area = panel.region.area
+        usable = np.array([shapely.buffer(area, -m, join_style="round" if circle else "mitre").area if m else area.area
+                           for m in margin.tolist()])
+    elif panel.shape_choice == "rectangle":
+        hx, hy = panel.bounds
+        usable = np.maximum(2.0 * (hx - margin), 0.0) * np.maximum(2.0 * (hy - margin), 0.0)
+    else:
+        usable = math.pi * np.maximum(panel.bounds[0] - margin, 0.0) ** 2
+    return usable, blank(panel)[0]
+
+
+def candidates(base, open_area_pct, min_web=0.0, max_holes=None, hole_sizes=HOLE_SIZES, spacings=None,
+               patterns=PATTERNS):
+    """Stage 1: (hole_size, spacing, pattern) triples worth evaluating, best first.
+
+    With ``spacings`` given, every combination with ``hole_sizes`` is
+    considered instead of the grid around the ideal spacing.  Clipped holes
+    count unless ``base`` has keep_clipped off.
+    """
+    shape = base["hole_shape_choice"]
+    sizes = np.asarray(hole_sizes, dtype=float)
+    usable, blank = _areas(base, sizes)
+    # open area is quoted against the whole blank, but holes only fill the usable part
+    target = open_area_pct / 100.0 * blank / np.maximum(usable, 1e-12)
+    found = []
+    for pattern in patterns:
+        area = _hole_area(shape, sizes)
+        if spacings is None:
+            # spacing giving the target on an endless lattice, then its grid neighbours
+            ideal = np.sqrt(area / (target * _cell(1.0, pattern)))
+            k = np.round(ideal / SPACING_STEP)[:, None] + np.arange(-SPACING_NEIGHBORS, SPACING_NEIGHBORS + 1)
+            at = np.broadcast_to(np.arange(len(sizes))[:, None], k.shape).ravel()
+            step = (k * SPACING_STEP).ravel()
+        else:
+            at, step = (a.ravel() for a in np.meshgrid(np.arange(len(sizes)), np.asarray(spacings, dtype=float)))
+        size = sizes[at]
+        web = web_width(shape, size, step, pattern)
+        ok = (step > 0) & (web >= min_web) & (web > 0)
+        cell = _cell(step[ok], pattern)
+        holes = usable[at[ok]] / cell
+        open_pct = 100.0 * _hole_area(shape, size[ok]) / cell * usable[at[ok]] / blank
+        if max_holes is not None:
+            keep = holes <= max_holes * 1.05  # boundary effects; checked exactly later
+        else:
+            keep = np.ones(len(holes), dtype=bool)
+        for s, p, err in zip(size[ok][keep].tolist(), step[ok][keep].tolist(),
+                             np.abs(open_pct - open_area_pct)[keep].tolist()):
+            found.append((err, s, p, pattern))
+    found.sort()
+    return [(s, p, pattern) for _, s, p, pattern in found]
+
+
+def _evaluate(params):
+    from .estimate import estimate
+
+    try:
+        return estimate(params)
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+def search(base, open_area_pct, min_web=0.0, max_holes=None, allow_clipped=True, hole_sizes=HOLE_SIZES,
+           spacings=None, patterns=PATTERNS, shortlist=SHORTLIST, workers=None, tolerance=TOLERANCE):
+    """Ranked candidate specs for ``base`` (params without hole_size/spacing/pattern_choice).
+
+    Each candidate is an estimate.estimate() dict plus "params" (checked,
+    ready for generate_dxf), "web_width", "open_area_error" (percentage
+    points from the target), "missed" (the targets it misses: "open area"
+    by more than ``tolerance``, "web" under min_web, "holes" over max_holes)
+    and "meets_targets".  ``allow_clipped`` sets keep_clipped, so without
+    it boundary holes are left out of the counts and the open area.
+    ``workers`` processes evaluate the shortlist (default: CPU count; 1
+    evaluates in this process).
+    """
+    base = dict(base, keep_clipped=bool(allow_clipped))
+    picks = candidates(base, open_area_pct, min_web, max_holes, hole_sizes, spacings, patterns)[:shortlist]
+    specs = [check_params(dict(base, hole_size=s, spacing=p, pattern_choice=pattern)) for s, p, pattern in picks]
+    workers = min(workers or os.cpu_count() or 1, max(len(specs), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_evaluate, specs))
+    else:
+        results = [_evaluate(spec) for spec in specs]
+
+    ranked = []
+    for spec, est in zip(specs, results):
+        if "error" in est:
+            continue
+        est.update(params=spec,
+                   web_width=float(web_width(spec["hole_shape_choice"], spec["hole_size"], spec["spacing"],
+                                             spec["pattern_choice"])),
+                   open_area_error=abs(est["open_area_pct"] - open_area_pct))
+        missed = []
+        if est["open_area_error"] > tolerance:
+            missed.append("open area")
+        if est["web_width"] < min_web:
+            missed.append("web")
+        if max_holes is not None and est["holes"] > max_holes:
+            missed.append("holes")
+        est.update(missed=missed, meets_targets=not missed)
+        ranked.append(est)
+    ranked.sort(key=lambda c: (not c["meets_targets"], round(c["open_area_error"], 6), -c["web_width"],
+                               c["holes"]))
+    return ranked
+
+
+def format_candidates(ranked, limit=10):
+    """Table of the best ``limit`` candidates, numbered from 1."""
+    lines = ["  #  pattern    hole    spacing  web      holes  clipped  open %   cut length"]
+    for n, c in enumerate(ranked[:limit], 1):
+        p = c["params"]
+        flag = "" if c["meets_targets"] else f"  (misses {', '.join(c['missed'])})"
+        lines.append(f"{n:>3}  {p['pattern_choice']:<9}{p['hole_size']:>7.4f}{p['spacing']:>9.4f}"
+                     f"{c['web_width']:>7.4f}{c['holes']:>10,}{c['holes_clipped']:>9,}{c['open_area_pct']:>8.2f}"
+                     f"{c['cut_length']:>13,.1f}{flag}")
+    return "\n".join(lines)
+
+
+def _floats(text):
+    return [float(t) for t in text.split(",") if t.strip()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Search hole size, spacing and pattern for a target open area.")
+    outer = ap.add_argument_group("outer shape (give --diameter, --length and --width, or --outline)")
+    outer.add_argument("--diameter", type=float, help="outer diameter (in) of a circular blank")
+    outer.add_argument("--length", type=float, help="outer length (in) of a rectangular blank")
+    outer.add_argument("--width", type=float, help="outer width (in) of a rectangular blank")
+    outer.add_argument("--outline", metavar="FILE", help="DXF file with the closed outer outline and cutouts")
+    outer.add_argument("--keepout-layer", metavar="LAYER", help="closed contours on this layer get no holes")
+    ap.add_argument("--offset", type=float, default=0.125, help="offset from edge (in) (default: %(default)g)")
+    ap.add_argument("--hole", choices=CHOICES["hole_shape_choice"], default="circle",
+                    help="hole shape (default: %(default)s)")
+    targets = ap.add_argument_group("targets")
+    targets.add_argument("--open-area", type=float, required=True, metavar="PCT", help="open area (%%)")
+    targets.add_argument("--min-web", type=float, default=0.0, metavar="IN",
+                         help="narrowest material between holes (default: %(default)g)")
+    targets.add_argument("--max-holes", type=int, default=None, help="most holes allowed")
+    targets.add_argument("--tolerance", type=float, default=TOLERANCE, metavar="PCT",
+                         help="open area may miss the target by this much (default: %(default)g)")
+    targets.add_argument("--no-clipped", action="store_true", help="drop holes that cross the edge")
+    space = ap.add_argument_group("search space")
+    space.add_argument("--hole-sizes", type=_floats, default=list(HOLE_SIZES), metavar="LIST",
+                       help="hole sizes to try, comma-separated (default: 1/16 to 1 in 1/32 steps)")
+    space.add_argument("--spacings", type=_floats, default=None, metavar="LIST",
+                       help="spacings to try (default: the grid around the ideal spacing of each hole size)")
+    space.add_argument("--patterns", type=lambda t: t.split(","), default=list(PATTERNS), metavar="LIST")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("-n", "--show", type=int, default=10, help="candidates listed (default: %(default)s)")
+    ap.add_argument("--pick", type=int, default=None, metavar="N", help="generate candidate N of the list")
+    ap.add_argument("-o", "--output", default=None, help="output file for --pick (default: optimized.dxf)")
+    args = ap.parse_args(argv)
+
+    if sum([args.diameter is not None, args.length is not None, args.outline is not None]) != 1:
+        ap.error("Give one of --diameter, --length/--width or --outline.")
+    if not set(args.patterns) <= set(PATTERNS):
+        ap.error(f"--patterns: choose from {', '.join(PATTERNS)}")
+    base = dict(offset=args.offset, hole_shape_choice=args.hole)
+    if args.outline:
+        base.update(shape_choice="outline", outline_path=args.outline, keepout_layer=args.keepout_layer)
+    elif args.diameter is not None:
+        base.update(shape_choice="circle", outer_diameter=args.diameter)
+    else:
+        base.update(shape_choice="rectangle", outer_length=args.length, outer_width=args.width)
+
+    try:
+        ranked = search(base, args.open_area, args.min_web, args.max_holes, not args.no_clipped,
+                        args.hole_sizes, args.spacings, args.patterns, workers=args.workers,
+                        tolerance=args.tolerance)
+    except ValueError as e:
+        print(f"{ap.prog}: error: {e}", file=sys.stderr)
+        return 1
+    if not ranked:
+        print("No spec meets the web width and hole count targets.", file=sys.stderr)
+        return 1
+    print(format_candidates(ranked, args.show))
+    if args.pick is not None:
+        if not 1 <= args.pick <= len(ranked):
+            ap.error(f"--pick must be between 1 and {len(ranked)}")
+        from .generator import generate_dxf
+
+        output = args.output or "optimized.dxf"
+        generate_dxf(ranked[args.pick - 1]["params"], output)
+        print(f"Saved candidate {args.pick} as {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# order.py
+# Cut-order optimization: CAM software and most laser/punch post-processors
+# cut entities in the order they appear in the DXF, so the hole order is the
+# toolpath.  Every method returns a permutation of the hole centers:
+#
+# - "serpentine": row by row, alternating direction (boustrophedon).
+# - "hilbert": along a Hilbert curve over hole-pitch cells, so each stretch
+#   of the path stays in a small neighbourhood.
+# - "nn": greedy nearest neighbour, found through a grid of pitch-sized
+#   buckets, then improved by 2-opt moves within a sliding window of the
+#   path.  Both steps are linear in the number of holes.
+#
+# travel() is the rapid-traverse length from center to center, the figure
+# the generator reports before and after ordering.
+
+import math
+
+import numpy as np
+
+WINDOW = 24  # 2-opt reverses path segments up to this many holes long
+PASSES = 3  # 2-opt sweeps over the whole path
+NN_RINGS = 8  # bucket rings searched before falling back to a scan of all holes
+
+
+def travel(xs, ys, perm=None):
+    """Length of the path through (xs, ys), in ``perm`` order if given."""
+    if perm is not None:
+        xs, ys = xs[perm], ys[perm]
+    return float(np.hypot(np.diff(xs), np.diff(ys)).sum())
+
+
+def serpentine(xs, ys, lattice):
+    rows = np.rint((ys - ys.min()) / lattice.row_step).astype(np.int64)
+    return np.lexsort((np.where(rows % 2 == 1, -xs, xs), rows))
+
+
+def _hilbert_index(x, y, bits):
+    """Distance along a 2**bits square Hilbert curve of integer cells (x, y)."""
+    n = 1 << bits
+    d = np.zeros(x.shape, dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # rotate the quadrant so the sub-curve starts where the parent enters it
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+    return d
+
+
+def hilbert(xs, ys, lattice):
+    # half-pitch columns on staggered lattices, so odd rows get cells of their own
+    x = np.rint((xs - xs.min()) / (lattice.stagger or lattice.step)).astype(np.int64)
+    y = np.rint((ys - ys.min()) / lattice.row_step).astype(np.int64)
+    bits = max(1, int(max(x.max(), y.max())).bit_length())
+    return np.argsort(_hilbert_index(x, y, bits), kind="stable")
+
+
+def _ring(cx, cy, r):
+    if r == 0:
+        return [(cx, cy)]
+    cells = [(cx + i, cy - r) for i in range(-r, r + 1)] + [(cx + i, cy + r) for i in range(-r, r + 1)]
+    return cells + [(cx - r, cy + j) for j in range(-r + 1, r)] + [(cx + r, cy + j) for j in range(-r + 1, r)]
+
+
+def nearest_neighbor(xs, ys, cell):
+    """Greedy path from the lower-left hole, always to the closest unvisited one."""
+    n = len(xs)
+    x0, y0 = xs.min(), ys.min()
+    ix = np.floor((xs - x0) / cell).astype(np.int64).tolist()
+    iy = np.floor((ys - y0) / cell).astype(np.int64).tolist()
+    buckets = {}
+    for k, key in enumerate(zip(ix, iy)):
+        buckets.setdefault(key, []).append(k)
+    xl, yl = xs.tolist(), ys.tolist()
+    alive = np.ones(n, dtype=bool)
+    path = np.empty(n, dtype=np.int64)
+    cur = int(np.argmin(xs - x0 + ys - y0))
+    for t in range(n):
+        path[t] = cur
+        alive[cur] = False
+        bucket = buckets[ix[cur], iy[cur]]
+        bucket.remove(cur)
+        if not bucket:
+            del buckets[ix[cur], iy[cur]]
+        if not buckets:
+            break
+        px, py = xl[cur], yl[cur]
+        best, best_d = -1, math.inf
+        for r in range(NN_RINGS + 1):
+            for key in _ring(ix[cur], iy[cur], r):
+                for k in buckets.get(key, ()):
+                    d = (xl[k] - px) ** 2 + (yl[k] - py) ** 2
+                    if d < best_d:
+                        best, best_d = k, d
+            # anything in an unsearched ring is at least r cells away
+            if best_d <= (r * cell) ** 2:
+                break
+        else:
+            # stranded: nothing provably nearest close by, so scan everything left
+            d = (xs - px) ** 2 + (ys - py) ** 2
+            d[~alive] = np.inf
+            best = int(np.argmin(d))
+        cur = best
+    return path
+
+
+def two_opt(xs, ys, path, window=WINDOW, passes=PASSES):
+    """Improve an open path in place with 2-opt moves that reverse up to ``window`` holes."""
+    n = len(path)
+    for _ in range(passes):
+        improved = False
+        for k in range(2, min(window, n - 2) + 1):
+            px, py = xs[path], ys[path]
+            # reversing path[i+1 .. i+k] swaps edges (i, i+1), (i+k, i+k+1)
+            # for (i, i+k), (i+1, i+k+1)
+            i = np.arange(n - k - 1)
+            old = (np.hypot(px[i + 1] - px[i], py[i + 1] - py[i])
+                   + np.hypot(px[i + k + 1] - px[i + k], py[i + k + 1] - py[i + k]))
+            new = (np.hypot(px[i + k] - px[i], py[i + k] - py[i])
+                   + np.hypot(px[i + k + 1] - px[i + 1], py[i + k + 1] - py[i + 1]))
+            last = -1
+            for a in np.flatnonzero(old - new > 1e-9).tolist():
+                if a > last:  # moves may not share an edge
+                    path[a + 1:a + k + 1] = path[a + 1:a + k + 1][::-1].copy()
+                    last = a + k
+                    improved = True
+        if not improved:
+            break
+    return path
+
+
+def cut_order(method, xs, ys, lattice):
+    """Permutation of the holes at (xs, ys), taken from ``lattice``, for ``method``."""
+    if method == "lattice" or len(xs) < 3:
+        return np.arange(len(xs))
+    if method == "serpentine":
+        return serpentine(xs, ys, lattice)
+    if method == "hilbert":
+        return hilbert(xs, ys, lattice)
+    if method == "nn":
+        return two_opt(xs, ys, nearest_neighbor(xs, ys, lattice.step))
+    raise ValueError(f"Unknown cut order: {method}")
@@ -0,0 +1,306 @@
+# outline.py
+# Arbitrary panel outlines read from an existing DXF file.
+#
+# An outline is one or more closed contours: closed LWPOLYLINE/POLYLINE (arcs
+# kept as bulges), CIRCLE, closed ELLIPSE/SPLINE (flattened), and chains of
+# LINE/ARC entities whose ends meet.  Contours nest even-odd, so a contour
+# inside the outer one is a cutout, one inside a cutout is an island, and so
+# on.  Contours on the keep-out layer mark areas that get no holes but are
+# not cut.  The usable region is what remains, inset by the offset.
+#
+# Containment is done in bulk with Shapely: contains_xy() against the
+# prepared region sorts centers into inside/outside, and an STRtree over the
+# region's boundary segments picks out the few holes that reach the boundary.
+# Only those are tested exactly and clipped, against the piece of the region
+# in a small tile around the hole, so the cost per clipped hole does not grow
+# with the number of vertices in the outline.  Arcs of the region and of
+# clipped round holes become chords at most FLATTEN_TOL from the true curve.
+#
+# Dependencies: shapely >= 2.0, numpy; ezdxf to read the file
+
+import math
+from functools import reduce
+
+import numpy as np
+
+from .grid import OUTSIDE, FULL, CLIPPED
+
+FLATTEN_TOL = 1e-4  # inches; max distance between an arc and its chords
+JOIN_TOL = 1e-6  # inches; LINE/ARC ends closer than this are joined
+TILE = 8  # clip tiles are TILE hole pitches square
+
+
+# ---------------- Reading ----------------
+def read_outline(path, layer=None, keepout_layer=None):
+    """Closed contours of a DXF file as (outline loops, keep-out loops).
+
+    Loops are lists of (x, y, bulge) vertices, like clip.py's.  Entities on
+    ``keepout_layer`` are keep-outs; the rest, or only those on ``layer``
+    if given, make up the outline.  Open contours that don't chain into a
+    closed one (construction lines, dimensions) are ignored.
+    """
+    import ezdxf
+
+    try:
+        doc = ezdxf.readfile(path)
+    except (OSError, ezdxf.DXFError) as e:
+        raise ValueError(f"Cannot read outline DXF {path}: {e}")
+    found = {False: ([], []), True: ([], [])}  # keep-out? -> (closed loops, open pieces)
+    for e in doc.modelspace():
+        name = e.dxf.get("layer", "0")
+        keepout = keepout_layer is not None and name == keepout_layer
+        if not keepout and layer is not None and name != layer:
+            continue
+        pts, closed = _contour(e)
+        if pts is not None:
+            found[keepout][0 if closed else 1].append(pts)
+    loops, keepouts = ([*closed, *_chain(pieces)] for closed, pieces in (found[False], found[True]))
+    if not loops:
+        raise ValueError(f"No closed outline found in {path}.")
+    return loops, keepouts
+
+
+def _same(p, q):
+    return abs(p[0] - q[0]) <= JOIN_TOL and abs(p[1] - q[1]) <= JOIN_TOL
+
+
+def _to_wcs(e, pts):
+    """(x, y, bulge) vertices given in ``e``'s OCS, in WCS.
+
+    A mirrored OCS (extrusion (0, 0, -1), common in mirrored drawings) flips
+    x, and arcs that ran counter-clockwise in the OCS run clockwise in WCS.
+    """
+    ocs = e.ocs()
+    if not ocs.transform:
+        return pts
+    sign = -1.0 if e.dxf.extrusion.z < 0 else 1.0
+    wcs = ocs.points_to_wcs([(x, y) for x, y, _ in pts])
+    return [(p.x, p.y, sign * float(b)) for p, (_, _, b) in zip(wcs, pts)]
+
+
+def _contour(e):
+    """(vertices, closed) of one entity, or (None, False) if it isn't a contour."""
+    kind = e.dxftype()
+    if kind == "LWPOLYLINE":
+        pts = _to_wcs(e, [(x, y, b) for x, y, b in e.get_points("xyb")])
+        closed = e.closed
+    elif kind == "POLYLINE":
+        if not e.is_2d_polyline:
+            return None, False
+        pts = _to_wcs(e, [(v.dxf.location.x, v.dxf.location.y, v.dxf.bulge) for v in e.vertices])
+        closed = e.is_closed
+    elif kind == "CIRCLE":
+        c, r = e.dxf.center, e.dxf.radius
+        # two half-circle bulges; a circle is the same circle either way round
+        c = _to_wcs(e, [(c.x, c.y, 0.0)])[0]
+        return [(c[0] - r, c[1], 1.0), (c[0] + r, c[1], 1.0)], True
+    elif kind == "LINE":
+        s, t = e.dxf.start, e.dxf.end
+        return [(s.x, s.y, 0.0), (t.x, t.y, 0.0)], False
+    elif kind == "ARC":
+        sweep = math.radians((e.dxf.end_angle - e.dxf.start_angle) % 360.0) or 2.0 * math.pi
+        bulge = math.tan(sweep / 4.0)
+        if e.dxf.extrusion.z < 0:  # mirrored OCS: the arc runs clockwise in WCS
+            bulge = -bulge
+        s, t = e.start_point, e.end_point
+        return [(s.x, s.y, bulge), (t.x, t.y, 0.0)], False
+    elif kind in ("ELLIPSE", "SPLINE"):
+        from ezdxf import path as dxfpath
+
+        pts = [(v.x, v.y, 0.0) for v in dxfpath.make_path(e).flattening(FLATTEN_TOL)]
+        closed = False
+    else:
+        return None, False
+    if len(pts) > 2 and _same(pts[0], pts[-1]):
+        pts, closed = pts[:-1], True  # explicitly repeated start point
+    return (pts, closed) if len(pts) >= 2 else (None, False)
+
+
+def _reverse(piece):
+    """Open piece walked the other way; each arc keeps its bulge, negated."""
+    n = len(piece) - 1
+    return [(piece[n - k][0], piece[n - k][1], -piece[n - k - 1][2] if k < n else 0.0)
+            for k in range(n + 1)]
+
+
+def _chain(pieces):
+    """Join open pieces end to end into closed loops."""
+    pieces = list(pieces)
+    loops = []
+    while pieces:
+        loop = pieces.pop()
+        while not _same(loop[0], loop[-1]):
+            for n, p in enumerate(pieces):
+                if _same(loop[-1], p[0]):
+                    break
+                if _same(loop[-1], p[-1]):
+                    p = _reverse(p)
+                    break
+            else:
+                break  # dangling end
+            del pieces[n]
+            loop = loop[:-1] + p
+        if len(loop) > 2 and _same(loop[0], loop[-1]):
+            loops.append(loop[:-1])
+    return loops
+
+
+# ---------------- Geometry ----------------
+def _segments(radius, sweep, tol=FLATTEN_TOL):
+    """Chords needed to keep an arc within ``tol`` of the true curve."""
+    if tol >= radius:
+        return max(1, math.ceil(sweep / (math.pi / 2)))
+    return max(1, math.ceil(sweep / (2.0 * math.acos(1.0 - tol / radius))))
+
+
+def flatten(loop, tol=FLATTEN_TOL):
+    """(x, y) points of a bulge loop with its arcs replaced by chords."""
+    pts = []
+    n = len(loop)
+    for k, (x, y, b) in enumerate(loop):
+        pts.append((x, y))
+        if not b:
+            continue
+        x1, y1 = loop[(k + 1) % n][:2]
+        c = math.hypot(x1 - x, y1 - y)
+        if c == 0.0:
+            continue
+        theta = 4.0 * math.atan(b)
+        r = c / (2.0 * abs(math.sin(theta / 2.0)))
+        # the center sits left of the chord for CCW arcs under half a turn
+        off = c * (1.0 - b * b) / (4.0 * b)
+        cx = (x + x1) / 2.0 - (y1 - y) / c * off
+        cy = (y + y1) / 2.0 + (x1 - x) / c * off
+        a0 = math.atan2(y - cy, x - cx)
+        steps = _segments(r, abs(theta), tol)
+        pts += [(cx + r * math.cos(a0 + theta * s / steps), cy + r * math.sin(a0 + theta * s / steps))
+                for s in range(1, steps)]
+    return pts
+
+
+def _even_odd(loops):
+    """Area enclosed by the loops under the even-odd rule."""
+    import shapely
+
+    polys = [p for p in (shapely.make_valid(shapely.polygons(flatten(loop))) for loop in loops if len(loop) > 1)
+             if p.area > 0.0]
+    if not polys:
+        return shapely.Polygon()
+    # nesting depth of each contour = how many others contain it (whole
+    # contours are tested: a probe point inside one can also fall inside the
+    # contours nested in it)
+    inner, outer = shapely.STRtree(polys).query(polys, predicate="within")
+    depth = np.bincount(inner[inner != outer], minlength=len(polys))
+    levels = [shapely.union_all([p for p, d in zip(polys, depth) if d == level])
+              for level in range(int(depth.max()) + 1)]
+    return reduce(shapely.symmetric_difference, levels)
+
+
+def _loops(geom):
+    """Bulge loops of the polygons in ``geom``: exteriors CCW, interiors CW."""
+    import shapely
+    from shapely.geometry.polygon import orient
+
+    loops = []
+    for part in shapely.get_parts(geom):
+        if part.geom_type != "Polygon" or part.is_empty:
+            continue  # a hole that only touches the region
+        part = orient(part, 1.0)
+        for ring in (part.exterior, *part.interiors):
+            loops.append([(x, y, 0.0) for x, y in ring.coords[:-1]])
+    return loops
+
+
+class OutlineRegion:
+    """Usable region of an outline panel, with classify()/clip() like grid.py and clip.py.
+
+    ``loops`` and ``keepouts`` come from read_outline().  ``geos_calls``
+    counts the exact per-hole tests and clips.
+    """
+
+    def __init__(self, loops, keepouts, offset, hole_shape_choice, hole_size, step):
+        import shapely
+
+        area = _even_odd(loops)
+        if keepouts:
+            area = area.difference(_even_odd(keepouts))
+        if offset > 0:
+            area = area.buffer(-offset, quad_segs=_segments(offset, math.pi / 2))
+        if area.is_empty:
+            raise ValueError("Offset too large for the outline.")
+        shapely.prepare(area)
+        self.area = area
+        self.bounds = area.bounds
+        self.hole_shape_choice = hole_shape_choice
+        self.h = hole_size / 2.0
+        # distance from a center within which its hole can touch the boundary
+        self.reach = self.h if hole_shape_choice == "circle" else self.h * math.sqrt(2.0)
+        self.quad_segs = _segments(self.h, math.pi / 2)
+
+        edges = [np.stack([c[:-1], c[1:]], axis=1)
+                 for c in map(shapely.get_coordinates, shapely.get_rings(shapely.get_parts(area)))]
+        self.tree = shapely.STRtree(shapely.linestrings(np.concatenate(edges)))
+        self.tile = TILE * step
+        self._tiles = {}
+        self._blocks = {}
+        self.geos_calls = 0
+
+    def classify(self, xs, ys):
+        """OUTSIDE / FULL / CLIPPED code for each hole center (arrays of any shape)."""
+        import shapely
+
+        shape = np.shape(xs)
+        xs = np.ravel(xs)
+        ys = np.ravel(ys)
+        codes = np.where(shapely.contains_xy(self.area, xs, ys), FULL, OUTSIDE).astype(np.int8)
+        pts = shapely.points(xs, ys)
+        near = np.unique(self.tree.query(pts, predicate="dwithin", distance=self.reach)[0])
+        if near.size:
+            self.geos_calls += int(near.size)
+            x, y, h = xs[near], ys[near], self.h
+            if self.hole_shape_choice == "circle":
+                _, dist = self.tree.query_nearest(pts[near], return_distance=True, all_matches=False)
+                # holes within the flattening tolerance of tangent are not cut
+                codes[near[dist < h - FLATTEN_TOL]] = CLIPPED
+            else:
+                boxes = shapely.box(x - h, y - h, x + h, y + h)
+                full = shapely.covers(self.area, boxes)
+                hit = shapely.intersects(self.area, boxes) & ~shapely.touches(self.area, boxes)
+                codes[near] = np.where(full, FULL, np.where(hit, CLIPPED, OUTSIDE))
+        return codes.reshape(shape)
+
+    def _cut(self, cache, key, size, source):
+        piece = cache.get(key)
+        if piece is None:
+            import shapely
+
+            m = self.reach * 1.01
+            x0 = self.bounds[0] + key[0] * size
+            y0 = self.bounds[1] + key[1] * size
+            piece = source().intersection(shapely.box(x0 - m, y0 - m, x0 + size + m, y0 + size + m))
+            cache[key] = piece
+        return piece
+
+    def _piece(self, x, y):
+        """The region within reach of any hole centered in (x, y)'s tile.
+
+        Tiles are cut from blocks of TILE x TILE tiles, which are cut from
+        the whole region, so each intersection works on few vertices.
+        """
+        i = math.floor((x - self.bounds[0]) / self.tile)
+        j = math.floor((y - self.bounds[1]) / self.tile)
+        block = (i // TILE, j // TILE)
+        return self._cut(self._tiles, (i, j), self.tile,
+                         lambda: self._cut(self._blocks, block, self.tile * TILE, lambda: self.area))
+
+    def clip(self, x, y):
+        """Loops of the hole at (x, y) cut to the region."""
+        import shapely
+
+        h = self.h
+        if self.hole_shape_choice == "circle":
+            hole = shapely.buffer(shapely.Point(x, y), h, quad_segs=self.quad_segs)
+        else:
+            hole = shapely.box(x - h, y - h, x + h, y + h)
+        self.geos_calls += 1
+        return _loops(shapely.intersection(hole, self._piece(x, y)))
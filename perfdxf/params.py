@@ -0,0 +1,98 @@
+# params.py
+# Panel parameter checks shared by the GUI, the CLI, batch manifests and the cache.
+#
+# Kept free of numpy/ezdxf imports so front-ends can validate input cheaply.
+
+# Optional params keys and their defaults
+OPTION_DEFAULTS = {"output_format": "dxf", "hole_blocks": "none", "symmetry": False, "clip_memo": False,
+                   "cut_order": "lattice"}
+
+# Values of the "output_format" option and their file name suffixes (see generator.py)
+OUTPUT_FORMATS = {"dxf": ".dxf", "dxf-stream": ".dxf", "dxf-binary": ".dxf", "svg": ".svg", "gcode": ".nc"}
+
+# Ways to write full holes for the "hole_blocks" option (see generator.py)
+HOLE_BLOCKS = ("none", "insert", "minsert")
+
+# Hole orders for the "cut_order" option (see order.py)
+CUT_ORDERS = ("lattice", "serpentine", "hilbert", "nn")
+
+_TRUE = {"1", "true", "yes", "y", "on"}
+
+CHOICES = {
+    "shape_choice": ("rectangle", "circle", "outline"),
+    "hole_shape_choice": ("circle", "square"),
+    "pattern_choice": ("straight", "staggered"),
+}
+
+
+def _float(s, name):
+    try:
+        return float(s)
+    except Exception:
+        raise ValueError(f"{name} must be a number.")
+
+
+def _required(raw, key, name):
+    v = raw.get(key)
+    if v is None or (isinstance(v, str) and not v.strip()):
+        raise ValueError(f"{name} is required.")
+    return v
+
+
+def _flag(v):
+    return v.strip().lower() in _TRUE if isinstance(v, str) else bool(v)
+
+
+def check_params(raw):
+    """Validate a params dict and return a normalized copy for generate_dxf.
+
+    Numbers and flags may still be strings (form fields, CSV cells, JSON);
+    missing or invalid fields raise ValueError.  Outer dimensions and outline
+    keys that don't apply to the chosen shape are dropped, and optional keys
+    (OPTION_DEFAULTS) are filled in, so equal specs give equal dicts.
+    """
+    for key, allowed in CHOICES.items():
+        if raw.get(key) not in allowed:
+            raise ValueError(f"{key} must be one of: {', '.join(allowed)}.")
+    params = dict(OPTION_DEFAULTS, **raw)
+    for key in ("outer_length", "outer_width", "outer_diameter", "outline_path", "outline_layer", "keepout_layer"):
+        params.pop(key, None)
+    params.update(
+        offset=_float(_required(raw, "offset", "Offset"), "Offset"),
+        hole_size=_float(_required(raw, "hole_size", "Hole size"), "Hole size"),
+        spacing=_float(_required(raw, "spacing", "Spacing"), "Spacing"),
+        keep_clipped=_flag(_required(raw, "keep_clipped", "Keep clipped")),
+        symmetry=_flag(params["symmetry"]),
+        clip_memo=_flag(params["clip_memo"]),
+    )
+    if not isinstance(params["output_format"], str) or params["output_format"] not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of: {', '.join(OUTPUT_FORMATS)}.")
+    if params["hole_blocks"] not in HOLE_BLOCKS:
+        raise ValueError(f"hole_blocks must be one of: {', '.join(HOLE_BLOCKS)}.")
+    if params["cut_order"] not in CUT_ORDERS:
+        raise ValueError(f"cut_order must be one of: {', '.join(CUT_ORDERS)}.")
+    if params["hole_size"] <= 0: raise ValueError("Hole size must be > 0.")
+    if params["spacing"] <= 0: raise ValueError("Spacing (center-to-center) must be > 0.")
+    if params["offset"] < 0: raise ValueError("Offset must be ≥ 0.")
+
+    if params["shape_choice"] == "rectangle":
+        params["outer_length"] = _float(_required(raw, "outer_length", "Length"), "Length")
+        params["outer_width"]  = _float(_required(raw, "outer_width", "Width"), "Width")
+        if params["outer_length"] <= 0 or params["outer_width"] <= 0:
+            raise ValueError("Length and Width must be > 0.")
+        if (params["outer_length"] - 2*params["offset"] <= 0) or (params["outer_width"] - 2*params["offset"] <= 0):
+            raise ValueError("Offset too large for given rectangle dimensions.")
+    elif params["shape_choice"] == "outline":
+        # the file is only read by the generator; the offset is checked there
+        if not raw.get("outline_path"):
+            raise ValueError("Outline DXF file is required.")
+        params["outline_path"] = str(raw["outline_path"])
+        params["outline_layer"] = str(raw["outline_layer"]) if raw.get("outline_layer") else None
+        params["keepout_layer"] = str(raw["keepout_layer"]) if raw.get("keepout_layer") else None
+    else:
+        params["outer_diameter"] = _float(_required(raw, "outer_diameter", "Diameter"), "Diameter")
+        if params["outer_diameter"] <= 0:
+            raise ValueError("Diameter must be > 0.")
+        if (params["outer_diameter"]/2 - params["offset"] <= 0):
+            raise ValueError("Offset too large for given diameter.")
+    return params
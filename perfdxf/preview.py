@@ -0,0 +1,198 @@
+# preview.py
+# Incremental panel preview for the GUI canvas.
+#
+#   view = Preview(420, 420)
+#   scene = view.update(params)   # cheap to call again after every edit
+#
+# update() returns a Scene in canvas pixels (y down).  Outlines become
+# polylines.  Full holes are drawn one by one while there are at most
+# MAX_SHAPES of them and they are at least MIN_HOLE_PX across; otherwise
+# they are stamped into one raster image (level of detail), where holes
+# smaller than a pixel shade their pixel by the area they cover.
+#
+# Every step is cached on the params it depends on, so an edit only redoes
+# what it invalidates: keep_clipped reuses the classification and clipped
+# outlines, hole size/shape reuse the lattice, and the outer geometry is
+# only rebuilt when the blank, offset, spacing or pattern change.
+#
+# Nothing here imports tkinter; the GUI only turns a Scene into canvas items.
+
+import math
+
+import numpy as np
+
+from .generator import Panel, _rect_coords
+from .grid import FULL, CLIPPED
+from .outline import flatten
+from .estimate import clipped_totals, summary
+
+MAX_SHAPES = 3000  # full holes drawn as canvas items before switching to a raster
+MIN_HOLE_PX = 3.0  # smaller holes are rastered too
+MAX_HOLES = 2_000_000  # lattices beyond this aren't previewed at all
+MARGIN_PX = 8
+
+# Layer colors of dxf_stream.LAYERS, on a white canvas
+OUTER_COLOR = "#000000"
+HOLE_RGB = (0, 160, 0)
+CLIPPED_RGB = (220, 0, 0)
+
+# params that decide the hole lattice; the hole shape and size only decide
+# which lattice positions are full, clipped or dropped
+_LATTICE_KEYS = ("shape_choice", "outer_length", "outer_width", "outer_diameter", "outline_path",
+                 "outline_layer", "keepout_layer", "offset", "spacing", "pattern_choice")
+_HOLE_KEYS = ("hole_shape_choice", "hole_size")
+
+
+class Scene:
+    """What to draw, in canvas pixels.
+
+    ``outer`` and ``clipped`` are lists of closed polylines as flat
+    [x0, y0, x1, y1, ...] lists.  ``holes`` lists the (x0, y0, x1, y1) boxes
+    of full holes to draw as ovals (circle) or rectangles (square), unless
+    they were rastered into ``image``: binary PPM bytes covering the whole
+    canvas.  ``full`` / ``clipped_count`` count the holes a DXF would get,
+    and ``estimate`` holds estimate.summary()'s open area and cut length.
+    """
+
+    def __init__(self):
+        self.outer = []
+        self.holes = []
+        self.hole_shape = "circle"
+        self.clipped = []
+        self.image = None
+        self.full = 0
+        self.clipped_count = 0
+        self.too_many = 0  # lattice size when the preview was skipped
+        self.estimate = None
+
+
+def _ppm(rgb):
+    h, w, _ = rgb.shape
+    return f"P6 {w} {h} 255\n".encode("ascii") + rgb.tobytes()
+
+
+class Preview:
+    """Preview engine for a canvas of ``width`` x ``height`` pixels; see the module notes."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._cache = {}  # step -> (key, value)
+        self.recomputed = []  # steps rebuilt by the last update(), for tuning
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+
+    def _step(self, name, key, build):
+        hit = self._cache.get(name)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        value = build()
+        self._cache[name] = (key, value)
+        self.recomputed.append(name)
+        return value
+
+    def update(self, params):
+        """Scene for checked ``params`` (see params.check_params)."""
+        self.recomputed = []
+        lattice_key = tuple(params.get(k) for k in _LATTICE_KEYS)
+        hole_key = lattice_key + tuple(params.get(k) for k in _HOLE_KEYS)
+        view_key = lattice_key + (self.width, self.height)
+
+        panel = self._step("panel", hole_key, lambda: Panel(params))
+        scene = Scene()
+        scene.hole_shape = panel.hole_shape_choice
+        if len(panel.lattice) > MAX_HOLES:
+            scene.too_many = len(panel.lattice)
+            return scene
+        xs, ys = self._step("centers", lattice_key, panel.lattice.centers)
+        codes = self._step("classify", hole_key, lambda: panel.classify(xs, ys))
+        clip_at = np.flatnonzero(codes == CLIPPED)
+        scale, ox, oy = self._step("view", view_key, lambda: self._fit(panel))
+        tol = 0.5 / scale  # half a pixel, in inches
+
+        scene.outer = self._step("outer", view_key, lambda: [
+            self._polyline(loop, scale, ox, oy, tol) for loop in self._outer_loops(panel)])
+        full_at = np.flatnonzero(codes == FULL)
+        scene.full = len(full_at)
+        if params["keep_clipped"]:
+            scene.clipped_count = len(clip_at)
+            totals = self._step("totals", hole_key, lambda: clipped_totals(panel, xs[clip_at], ys[clip_at]))
+        else:
+            totals = (0.0, 0.0)
+        scene.estimate = summary(panel, scene.full, len(clip_at), totals, params["keep_clipped"])
+        px = panel.h * scale  # hole half-size in pixels
+        lod = len(full_at) > MAX_SHAPES or 2 * px < MIN_HOLE_PX
+        if not lod:
+            cx = ox + xs[full_at] * scale
+            cy = oy - ys[full_at] * scale
+            scene.holes = np.stack([cx - px, cy - px, cx + px, cy + px], axis=1).tolist()
+        clip_lod = len(clip_at) > MAX_SHAPES or 2 * px < MIN_HOLE_PX
+        if params["keep_clipped"] and not clip_lod:
+            loops = self._step("clip", hole_key, lambda: [
+                panel.clip(x, y) for x, y in zip(xs[clip_at].tolist(), ys[clip_at].tolist())])
+            scene.clipped = self._step("clipped", hole_key + (self.width, self.height), lambda: [
+                self._polyline(loop, scale, ox, oy, tol) for hole in loops for loop in hole])
+        if lod or (params["keep_clipped"] and clip_lod):
+            scene.image = self._step("raster", hole_key + (self.width, self.height, params["keep_clipped"]),
+                                     lambda: self._raster(panel, xs, ys, full_at if lod else full_at[:0],
+                                                          clip_at if params["keep_clipped"] and clip_lod
+                                                          else clip_at[:0], scale, ox, oy))
+        return scene
+
+    # ---------------- Steps ----------------
+    def _fit(self, panel):
+        """(scale px/in, canvas x of x = 0, canvas y of y = 0) showing the whole blank."""
+        x0, y0, x1, y1 = panel.extent()
+        scale = min((self.width - 2 * MARGIN_PX) / max(x1 - x0, 1e-9),
+                    (self.height - 2 * MARGIN_PX) / max(y1 - y0, 1e-9))
+        return scale, self.width / 2 - (x0 + x1) / 2 * scale, self.height / 2 + (y0 + y1) / 2 * scale
+
+    @staticmethod
+    def _outer_loops(panel):
+        if panel.shape_choice == "rectangle":
+            return [[(x, y, 0.0) for x, y in _rect_coords(*panel.outer)[:-1]]]
+        if panel.region is not None:
+            return panel.outer
+        r = panel.outer[0]
+        return [[(-r, 0.0, 1.0), (r, 0.0, 1.0)]]
+
+    @staticmethod
+    def _polyline(loop, scale, ox, oy, tol):
+        pts = flatten(loop, tol)
+        flat = []
+        for x, y in pts + pts[:1]:
+            flat += (ox + x * scale, oy - y * scale)
+        return flat
+
+    def _raster(self, panel, xs, ys, full_at, clip_at, scale, ox, oy):
+        w, h = self.width, self.height
+        rgb = np.full((h, w, 3), 255, dtype=np.uint8)
+        px = panel.h * scale
+        for at, color in ((full_at, HOLE_RGB), (clip_at, CLIPPED_RGB)):
+            if not len(at):
+                continue
+            cx = ox + xs[at] * scale
+            cy = oy - ys[at] * scale
+            if px < 1.0:
+                # sub-pixel holes: shade each pixel by the hole area it holds
+                area = math.pi * px * px if panel.hole_shape_choice == "circle" else 4 * px * px
+                ix = np.clip(cx.astype(np.int64), 0, w - 1)
+                iy = np.clip(cy.astype(np.int64), 0, h - 1)
+                cover = np.minimum(np.bincount(iy * w + ix, minlength=w * h) * area, 1.0).reshape(h, w)
+                mask = cover > 0
+                rgb[mask] = (255 - cover[mask, None] * (255 - np.array(color))).astype(np.uint8)
+                continue
+            r = min(int(math.ceil(px)), 16)
+            ix = np.rint(cx).astype(np.int64)
+            iy = np.rint(cy).astype(np.int64)
+            for dy in range(-r, r + 1):
+                for dx in range(-r, r + 1):
+                    if panel.hole_shape_choice == "circle" and dx * dx + dy * dy > px * px:
+                        continue
+                    x = ix + dx
+                    y = iy + dy
+                    ok = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+                    rgb[y[ok], x[ok]] = color
+        return _ppm(rgb)
@@ -0,0 +1,480 @@
+# service.py
+# Long-running local generation service: keeps the generator warm in a pool
+# of worker processes and serves panels over HTTP on a TCP port or a Unix
+# socket.
+#
+#   python -m perfdxf.service --port 8765 -j 4
+#   python -m perfdxf.service --socket /tmp/perfdxf.sock --cache
+#
+#   POST /generate   body: JSON params, as PerfDXFGUI._validate or a batch
+#                    manifest entry gives them; reply: the file
+#   GET  /metrics    JSON: queue depth, latency percentiles, throughput
+#   GET  /health     "ok"
+#
+# Requests with equal specs (cache.cache_key) that arrive while one is being
+# generated wait for that one instead of starting their own: the worker
+# writes the file once into a scratch directory and every waiting request
+# streams it back from there.  At most max_queue distinct specs are in
+# flight; beyond that requests get 503 with Retry-After.  When a worker
+# process dies the pool is replaced: the jobs it was running or holding get
+# an error, later requests go to the new pool.
+#
+# Client (also what the ERP side needs):
+#
+#   client = Client(port=8765)          # or Client(socket_path="/tmp/perfdxf.sock")
+#   client.generate(params, "panel.dxf")
+#   client.metrics()
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .params import check_params
+from .cache import cache_key, DXFCache, DEFAULT_MAX_BYTES
+
+MAX_QUEUE = 64  # distinct specs in flight before requests are turned away
+STREAM_BYTES = 1 << 20  # response chunk size
+LATENCY_WINDOW = 1000  # requests kept for the latency percentiles
+RATE_WINDOW = 60.0  # seconds of history behind the throughput figures
+
+CONTENT_TYPES = {"svg": "image/svg+xml", "gcode": "text/plain; charset=us-ascii"}
+
+
+# ---------------- Worker processes ----------------
+_cache = None  # DXFCache of a worker process, when the service uses one
+
+
+def _init_worker(cache_opts):
+    """Load the generator and its dependencies once per worker process."""
+    global _cache
+    from . import generator  # noqa: F401  (numpy)
+    for name in ("ezdxf", "shapely"):
+        try:
+            __import__(name)
+        except ImportError:
+            pass  # only needed for some formats and outline panels
+    if cache_opts is not None:
+        _cache = DXFCache(cache_opts["root"], cache_opts["max_bytes"])
+
+
+def _render(params, path):
+    """Generate ``params`` into ``path``; returns (seconds, served from the cache)."""
+    from .generator import generate_dxf
+
+    t0 = time.perf_counter()
+    if _cache is not None:
+        hit = _cache.generate(params, path)
+    else:
+        generate_dxf(params, path)
+        hit = False
+    return time.perf_counter() - t0, hit
+
+
+# ---------------- Service ----------------
+class _Job:
+    """One spec being generated, shared by every request that asked for it."""
+
+    def __init__(self, key, path, pool, future):
+        self.key = key
+        self.path = path
+        self.pool = pool
+        self.future = future
+        self.waiters = 1
+
+
+class Metrics:
+    """Request counters plus sliding windows for latency and throughput; thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.coalesced = 0
+        self.generated = 0
+        self.cache_hits = 0
+        self.rejected = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._latency = deque(maxlen=LATENCY_WINDOW)
+        self._done = deque()  # (time, bytes) of recent responses
+
+    def count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def finished(self, seconds, size):
+        """Record a request answered with ``size`` bytes after ``seconds``."""
+        now = time.time()
+        with self._lock:
+            self._latency.append(seconds)
+            self._done.append((now, size))
+            self.bytes_sent += size
+            while self._done and self._done[0][0] < now - RATE_WINDOW:
+                self._done.popleft()
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            recent = [size for t, size in self._done if t >= now - RATE_WINDOW]
+            lat = sorted(self._latency)
+        window = min(RATE_WINDOW, max(now - self.started, 1e-9))
+
+        def pct(p):
+            if not lat:
+                return None
+            rank = min(len(lat), max(1, round(p / 100.0 * len(lat))))  # nearest rank
+            return round(lat[rank - 1] * 1000.0, 3)
+
+        return {
+            "uptime_seconds": round(now - self.started, 3),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "generated": self.generated,
+            "cache_hits": self.cache_hits,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "latency_ms": {"p50": pct(50), "p90": pct(90), "p99": pct(99), "max": pct(100),
+                           "samples": len(lat)},
+            "throughput": {"window_seconds": round(window, 3),
+                           "requests_per_second": round(len(recent) / window, 3),
+                           "bytes_per_second": round(sum(recent) / window, 1)},
+        }
+
+
+class GenerationService:
+    """Worker pool plus the table of in-flight specs; the HTTP layer calls submit()/release()."""
+
+    def __init__(self, workers=None, max_queue=MAX_QUEUE, cache_opts=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.cache_opts = cache_opts
+        self.pool = self._new_pool()
+        self.scratch = tempfile.mkdtemp(prefix="perfdxf-service-")
+        self.metrics = Metrics()
+        self._lock = threading.Lock()
+        self._inflight = {}  # cache key -> _Job
+        self._serial = 0
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.cache_opts,))
+
+    def _replace_pool(self, broken):
+        """Swap in a fresh pool for ``broken``, unless that happened already; call under _lock."""
+        if self.pool is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._new_pool()
+
+    def submit(self, raw):
+        """Job generating ``raw`` params, joining an identical one in flight.
+
+        Returns (job, params, coalesced).  Raises ValueError for bad params
+        and OverflowError when max_queue specs are already in flight.
+        """
+        self.metrics.count("requests")
+        params = check_params({k: v for k, v in raw.items() if k != "name"})
+        key = cache_key(params)
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                job.waiters += 1
+                self.metrics.count("coalesced")
+                return job, params, True
+            if len(self._inflight) >= self.max_queue:
+                self.metrics.count("rejected")
+                raise OverflowError(f"{len(self._inflight)} panels already in progress")
+            self._serial += 1
+            path = os.path.join(self.scratch, f"{self._serial}-{key[:16]}")
+            try:
+                future = self.pool.submit(_render, params, path)
+            except BrokenProcessPool:  # a worker died since the last job
+                self._replace_pool(self.pool)
+                future = self.pool.submit(_render, params, path)
+            job = self._inflight[key] = _Job(key, path, self.pool, future)
+            return job, params, False
+
+    def wait(self, job):
+        """Block until ``job`` is done; returns (seconds, cache hit) or raises its error.
+
+        The first request back takes the job out of the in-flight table, so
+        later identical requests start a fresh generation (or hit the cache).
+        A job lost with a dead worker raises BrokenProcessPool and its pool is
+        replaced.
+        """
+        try:
+            return job.future.result()
+        except BrokenProcessPool:
+            with self._lock:
+                self._replace_pool(job.pool)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+                    if job.future.exception() is None:
+                        self.metrics.count("generated")
+                        self.metrics.count("cache_hits", int(job.future.result()[1]))
+
+    def release(self, job):
+        """A request is done with ``job``; the last one deletes its file."""
+        with self._lock:
+            job.waiters -= 1
+            last = job.waiters == 0
+        if last:
+            try:
+                os.remove(job.path)
+            except FileNotFoundError:
+                pass
+
+    def status(self):
+        with self._lock:
+            jobs = list(self._inflight.values())
+        running = sum(1 for j in jobs if j.future.running())
+        snap = self.metrics.snapshot()
+        snap.update(workers=self.workers, max_queue=self.max_queue, in_flight=len(jobs),
+                    running=running, queue_depth=len(jobs) - running,
+                    waiting_requests=sum(j.waiters for j in jobs))
+        return snap
+
+    def close(self):
+        with self._lock:
+            pool = self.pool
+        pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+# ---------------- HTTP ----------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "perfdxf"
+
+    def address_string(self):
+        # Unix sockets have no peer address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status, body, content_type="application/json", headers=()):
+        data = body if isinstance(body, bytes) else (json.dumps(body, indent=2) + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._reply(200, self.server.service.status())
+        elif self.path == "/health":
+            self._reply(200, b"ok\n", "text/plain")
+        else:
+            self._reply(404, {"error": f"no such endpoint: {self.path}"})
+
+    def _discard_body(self):
+        """Read and drop the request body so the connection can take the next request."""
+        try:
+            left = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            left = -1
+        if left < 0:
+            self.close_connection = True
+            return
+        while left > 0:
+            chunk = self.rfile.read(min(left, STREAM_BYTES))
+            if not chunk:
+                self.close_connection = True
+                break
+            left -= len(chunk)
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._discard_body()
+            self._reply(404, {"error": f"no such endpoint: {self.path}"})
+            return
+        t0 = time.perf_counter()
+        service = self.server.service
+        try:
+            raw = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            if not isinstance(raw, dict):
+                raise ValueError("Request body must be a JSON object of panel params.")
+            job, params, coalesced = service.submit(raw)
+        except OverflowError as e:
+            self._reply(503, {"error": str(e)}, headers=[("Retry-After", "1")])
+            return
+        except ValueError as e:  # also bad JSON
+            service.metrics.count("errors")
+            self._reply(400, {"error": str(e)})
+            return
+        except Exception as e:
+            service.metrics.count("errors")
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        try:
+            try:
+                seconds, hit = service.wait(job)
+            except ValueError as e:  # e.g. an unreadable outline file
+                service.metrics.count("errors")
+                self._reply(400, {"error": str(e)})
+                return
+            except Exception as e:
+                service.metrics.count("errors")
+                self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            with open(job.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPES.get(params["output_format"], "application/dxf"))
+                self.send_header("Content-Length", str(size))
+                self.send_header("X-Perfdxf-Key", job.key)
+                self.send_header("X-Perfdxf-Coalesced", "1" if coalesced else "0")
+                self.send_header("X-Perfdxf-Cache", "hit" if hit else "miss")
+                self.send_header("X-Perfdxf-Generate-Seconds", f"{seconds:.6f}")
+                self.end_headers()
+                shutil.copyfileobj(f, self.wfile, STREAM_BYTES)
+        finally:
+            service.release(job)
+        service.metrics.finished(time.perf_counter() - t0, size)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, port=None, host="127.0.0.1", socket_path=None, verbose=False):
+    """HTTP server for ``service`` on host:port (port 0 picks a free one) or a Unix socket."""
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port or 0), _Handler)
+        server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+# ---------------- Client ----------------
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class ServiceError(Exception):
+    """Error reply from the service; ``status`` is the HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class Client:
+    """Minimal client for a running service, over TCP or a Unix socket.
+
+    Not thread-safe: give each thread its own Client.
+    """
+
+    def __init__(self, port=None, host="127.0.0.1", socket_path=None, timeout=None):
+        self._conn = (_UnixConnection(socket_path, timeout) if socket_path is not None
+                      else http.client.HTTPConnection(host, port, timeout=timeout))
+
+    def _request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self._conn.request(method, path, body=body, headers=headers)
+        resp = self._conn.getresponse()
+        return resp
+
+    def generate(self, params, dest):
+        """Generate ``params`` into ``dest`` (path or binary stream); returns the reply headers."""
+        resp = self._request("POST", "/generate", json.dumps(params).encode("utf-8"))
+        if resp.status != 200:
+            data = resp.read()
+            try:
+                message = json.loads(data)["error"]
+            except (ValueError, KeyError, TypeError):
+                message = data.decode("utf-8", "replace")
+            raise ServiceError(resp.status, message)
+        if hasattr(dest, "write"):
+            shutil.copyfileobj(resp, dest, STREAM_BYTES)
+        else:
+            with open(dest, "wb") as f:
+                shutil.copyfileobj(resp, f, STREAM_BYTES)
+        return dict(resp.getheaders())
+
+    def metrics(self):
+        resp = self._request("GET", "/metrics")
+        return json.loads(resp.read())
+
+    def close(self):
+        self._conn.close()
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve panel generation over local HTTP.")
+    where = ap.add_mutually_exclusive_group()
+    where.add_argument("--port", type=int, default=8765, help="TCP port on 127.0.0.1 (default: %(default)s)")
+    where.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead")
+    ap.add_argument("--host", default="127.0.0.1", help="address to bind with --port (default: %(default)s)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--max-queue", type=int, default=MAX_QUEUE,
+                    help="distinct specs in flight before requests get 503 (default: %(default)s)")
+    ap.add_argument("--cache", nargs="?", const="", default=None, metavar="DIR",
+                    help="serve repeat specs from the DXF cache (default dir: $PERF_DXF_CACHE or per-user)")
+    ap.add_argument("--cache-size", type=float, default=DEFAULT_MAX_BYTES / 2**20, metavar="MB",
+                    help="cache size limit in MiB (default: %(default)g)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="log every request to stderr")
+    args = ap.parse_args(argv)
+
+    cache_opts = None
+    if args.cache is not None:
+        cache_opts = {"root": args.cache or None, "max_bytes": int(args.cache_size * 2**20)}
+    service = GenerationService(args.workers, args.max_queue, cache_opts)
+    server = make_server(service, args.port, args.host, args.socket, args.verbose)
+    where = args.socket or "http://%s:%d" % server.server_address[:2]
+    print(f"perfdxf service on {where} with {service.workers} workers", file=sys.stderr, flush=True)
+    signal.signal(signal.SIGTERM, _stop)  # shut down cleanly when a supervisor stops us
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket:
+            try:
+                os.remove(args.socket)
+            except FileNotFoundError:
+                pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
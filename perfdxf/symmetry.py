@@ -0,0 +1,137 @@
+# symmetry.py
+# Clip each boundary hole once per symmetry class and replicate it by reflection.
+#
+# The usable region (centered rectangle or circle) and both hole shapes are
+# symmetric about the x and y axes, and circles/squares also about the
+# diagonals.  Whether the lattice shares a symmetry depends on its indices:
+#
+# - straight: column i <-> nx-1-i and row j <-> ny-1-j always map centers to
+#   centers; circular blanks (nx == ny) can also swap i and j.
+# - staggered: even rows mirror i <-> nx-1-i, odd rows (shifted half a pitch)
+#   mirror i <-> nx-2-i, so the last center of an odd row has no partner.
+#   Rows mirror j <-> ny-1-j only when ny is odd; otherwise an even row would
+#   land on an odd one.
+#
+# Symmetry works on lattice indices, never on float comparisons.  A hole's
+# loops are its class representative's loops, taken relative to the
+# representative's center, reflected, and added to the hole's own lattice
+# center.  The geometry is the same as clipping directly, up to the last bit
+# of the coordinates, and loops may start at a different vertex.
+
+import numpy as np
+
+from .grid import CLIPPED
+
+
+def reflect_loop(loop, swap, sx, sy):
+    """Reflect a bulge loop of (dx, dy, bulge) offsets, keeping it CCW.
+
+    ``swap`` exchanges dx and dy first, then ``sx``/``sy`` (+1 or -1) scale
+    the axes.  An odd number of reflections reverses the orientation, so the
+    vertices are reversed; each arc then keeps its bulge, now on the vertex
+    that starts it in the new order.
+    """
+    if swap:
+        pts = [(sx * dy, sy * dx) for dx, dy, _ in loop]
+    else:
+        pts = [(sx * dx, sy * dy) for dx, dy, _ in loop]
+    bulges = [b for _, _, b in loop]
+    if (swap + (sx < 0) + (sy < 0)) % 2 == 0:
+        return [(x, y, b) for (x, y), b in zip(pts, bulges)]
+    n = len(loop)
+    return [(pts[n - 1 - k][0], pts[n - 1 - k][1], bulges[(n - 2 - k) % n]) for k in range(n)]
+
+
+class Symmetry:
+    """Symmetry classes of a Panel's lattice, with a memo of clipped loops.
+
+    clip(indices, centers) returns the clip loops for the given lattice
+    indices (all CLIPPED holes), clipping only one hole per class with
+    ``clip_fn`` (default panel.clip).
+    """
+
+    def __init__(self, panel, clip_fn=None):
+        self.panel = panel
+        self._clip = clip_fn or panel.clip
+        lat = panel.lattice
+        self.lattice = lat
+        self.staggered = lat.pattern_choice == "staggered"
+        self.mirror_y = not self.staggered or lat.ny % 2 == 1
+        self.swap = (panel.shape_choice == "circle" and not self.staggered
+                     and lat.nx == lat.ny and lat.row_step == lat.step)
+        self._base = {}   # class key -> representative's loops as center offsets
+        self._moved = {}  # (key, op) -> reflected offsets
+        self.calls = 0    # representatives clipped
+        self.reused = 0   # holes served from the memo
+
+    def _indices(self, k):
+        lat = self.lattice
+        if self.staggered:
+            j, i = np.divmod(k, lat.nx)
+        else:
+            i, j = np.divmod(k, lat.ny)
+        return i, j
+
+    def _key(self, i, j):
+        lat = self.lattice
+        return j * lat.nx + i if self.staggered else i * lat.ny + j
+
+    def canonical(self, k):
+        """Class key and reflection (swap, flip_x, flip_y) for lattice indices ``k``."""
+        lat = self.lattice
+        i, j = self._indices(np.asarray(k))
+        if self.staggered:
+            mi = np.where(j % 2 == 1, lat.nx - 2 - i, lat.nx - 1 - i)
+        else:
+            mi = lat.nx - 1 - i
+        fx = (mi < i) & (mi >= 0)
+        i = np.where(fx, mi, i)
+        if self.mirror_y:
+            mj = lat.ny - 1 - j
+            fy = mj < j
+            j = np.where(fy, mj, j)
+        else:
+            fy = np.zeros(i.shape, dtype=bool)
+        if self.swap:
+            sw = i > j
+            i, j = np.where(sw, j, i), np.where(sw, i, j)
+        else:
+            sw = np.zeros(i.shape, dtype=bool)
+        return self._key(i, j), sw, fx, fy
+
+    def _offsets(self, key, op):
+        moved = self._moved.get((key, op))
+        if moved is None:
+            base = self._base.get(key)
+            if base is None:
+                lat = self.lattice
+                if self.staggered:
+                    j, i = divmod(key, lat.nx)
+                else:
+                    i, j = divmod(key, lat.ny)
+                cx, cy = lat.center(i, j)
+                base = [[(x - cx, y - cy, b) for x, y, b in loop] for loop in self._clip(cx, cy)]
+                self._base[key] = base
+                self.calls += 1
+            swap, fx, fy = op
+            moved = base if op == (False, False, False) else \
+                [reflect_loop(loop, swap, -1 if fx else 1, -1 if fy else 1) for loop in base]
+            self._moved[(key, op)] = moved
+        return moved
+
+    def clip(self, indices, centers):
+        """Loops for the CLIPPED holes at lattice ``indices`` with the given (x, y) centers."""
+        keys, sw, fx, fy = self.canonical(indices)
+        calls = self.calls
+        out = []
+        for key, s, a, b, (x, y) in zip(keys.tolist(), sw.tolist(), fx.tolist(), fy.tolist(), centers):
+            offsets = self._offsets(key, (s, a, b))
+            out.append([[(x + dx, y + dy, bulge) for dx, dy, bulge in loop] for loop in offsets])
+        self.reused += len(out) - (self.calls - calls)
+        return out
+
+    def clip_chunk(self, start, codes, keep, holes):
+        """clip() for one generator chunk: ``holes`` are its kept (x, y, code) triples."""
+        indices = np.flatnonzero(keep & (codes == CLIPPED)) + start
+        centers = [(x, y) for x, y, code in holes if code == CLIPPED]
+        return self.clip(indices, centers)
@@ -0,0 +1,91 @@
+# helpers.py
+# Shared test helpers: generate a panel and compare outputs as geometry.
+
+import itertools
+import math
+import os
+import tempfile
+
+import ezdxf
+
+from perfdxf.generator import generate_dxf
+from perfdxf.params import check_params
+
+TOL = 1e-9  # inches
+
+
+def panel_raw(shape="rectangle", hole="circle", pattern="straight", keep_clipped=True, **kw):
+    """Unchecked params for a small panel with plenty of boundary holes; keys given as None are left out."""
+    raw = dict(shape_choice=shape, outer_length=13.3, outer_width=9.7, outer_diameter=12.9, offset=0.125,
+               hole_shape_choice=hole, hole_size=0.45, spacing=0.7, pattern_choice=pattern,
+               keep_clipped=keep_clipped, output_format="dxf-stream")
+    raw.update(kw)
+    return {k: v for k, v in raw.items() if v is not None}
+
+
+def panel_params(shape="rectangle", hole="circle", pattern="straight", keep_clipped=True, **kw):
+    """check_params(panel_raw(...))."""
+    return check_params(panel_raw(shape, hole, pattern, keep_clipped, **kw))
+
+
+CASES = list(itertools.product(["rectangle", "circle"], ["circle", "square"], ["straight", "staggered"],
+                               [True, False]))
+
+
+def read_entities(doc):
+    """(type, layer, data) of every modelspace entity of an ezdxf document, in file order.
+
+    LWPOLYLINE and R12 POLYLINE both read as "POLYLINE" with (x, y, bulge) vertices.
+    """
+    ents = []
+    for e in doc.modelspace():
+        kind = e.dxftype()
+        if kind == "CIRCLE":
+            data = (e.dxf.center.x, e.dxf.center.y, e.dxf.radius)
+        elif kind == "LWPOLYLINE":
+            kind, data = "POLYLINE", [(x, y, b) for x, y, _, _, b in e.get_points()]
+        elif kind == "POLYLINE":
+            data = [(v.dxf.location.x, v.dxf.location.y, v.dxf.bulge) for v in e.vertices]
+        else:
+            data = tuple(e.dxf.insert)
+        ents.append((kind, e.dxf.layer, data))
+    return ents
+
+
+def generate_doc(params, path=None, **kw):
+    """generate_dxf into ``path`` (a temporary file by default) and read it back with ezdxf."""
+    if path is not None:
+        generate_dxf(params, str(path), **kw)
+        return ezdxf.readfile(str(path))
+    fd, tmp = tempfile.mkstemp(suffix=".dxf")
+    os.close(fd)
+    try:
+        generate_dxf(params, tmp, **kw)
+        return ezdxf.readfile(tmp)
+    finally:
+        os.remove(tmp)
+
+
+def entities(params):
+    """read_entities() of the panel generated from ``params``."""
+    return read_entities(generate_doc(params))
+
+
+def _close(a, b):
+    return all(math.isclose(u, v, rel_tol=0.0, abs_tol=TOL) for u, v in zip(a, b))
+
+
+def _same_loop(a, b):
+    """Equal closed loops within TOL, whichever vertex they start at."""
+    if len(a) != len(b):
+        return False
+    return any(all(_close(a[k], b[(k + s) % len(b)]) for k in range(len(a))) for s in range(len(b)))
+
+
+def assert_same_geometry(expected, got):
+    assert len(expected) == len(got)
+    for k, ((ta, la, da), (tb, lb, db)) in enumerate(zip(expected, got)):
+        assert (ta, la) == (tb, lb), k
+        same = _same_loop(da, db) if ta == "POLYLINE" else _close(da, db)
+        assert same, (k, da, db)
+
@@ -0,0 +1,138 @@
+# test_backends.py
+# The binary DXF, SVG and G-code writers against the ASCII DXF stream.
+
+import math
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from helpers import CASES, assert_same_geometry, entities, generate_doc, panel_params, read_entities
+from perfdxf.generator import generate_dxf
+
+SVG = "{http://www.w3.org/2000/svg}"
+XLINK = "{http://www.w3.org/1999/xlink}"
+GCODE_TOL = 1e-4  # the G-code writer rounds to 4 decimals
+
+
+def _written(params, tmp_path, fmt):
+    path = tmp_path / f"panel.{fmt}"
+    generate_dxf(dict(params, output_format=fmt), str(path))
+    return path.read_text(encoding="ascii")
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES)
+def test_binary_matches_ascii(shape, hole, pattern, keep_clipped):
+    params = panel_params(shape, hole, pattern, keep_clipped)
+    doc = generate_doc(dict(params, output_format="dxf-binary"))
+    assert doc.dxfversion == "AC1009"
+    assert_same_geometry(entities(params), read_entities(doc))
+
+
+@pytest.mark.parametrize("blocks", ["insert", "minsert"])
+def test_binary_blocks_match_ascii(blocks):
+    params = panel_params("circle", "square", "staggered", True, hole_blocks=blocks)
+    binary, ascii_ = generate_doc(dict(params, output_format="dxf-binary")), generate_doc(params)
+    assert_same_geometry(read_entities(ascii_), read_entities(binary))
+    ref = [e.dxf.insert for e in ascii_.modelspace() if e.dxftype() == "INSERT"]
+    got = [e.dxf.insert for e in binary.modelspace() if e.dxftype() == "INSERT"]
+    assert ref and got == ref
+    assert ([(e.dxf.column_count, e.dxf.row_count) for e in binary.modelspace() if e.dxftype() == "INSERT"]
+            == [(e.dxf.column_count, e.dxf.row_count) for e in ascii_.modelspace() if e.dxftype() == "INSERT"])
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES)
+def test_svg_is_well_formed(shape, hole, pattern, keep_clipped, tmp_path):
+    params = panel_params(shape, hole, pattern, keep_clipped)
+    root = ET.fromstring(_written(params, tmp_path, "svg"))
+    assert root.tag == f"{SVG}svg"
+    (group,) = root.findall(f"{SVG}g")
+    drawn = [(el.tag[len(SVG):], el.get("class")) for el in group]
+    ref = entities(params)
+    assert drawn == [("circle" if kind == "CIRCLE" else "path", layer) for kind, layer, _ in ref]
+    for el, (kind, _, data) in zip(group, ref):
+        if kind == "CIRCLE":
+            got = (float(el.get("cx")), float(el.get("cy")), float(el.get("r")))
+            assert all(math.isclose(u, v, abs_tol=1e-5) for u, v in zip(got, data))
+        else:
+            x, y = el.get("d")[1:].split("L")[0].split("A")[0].split()
+            assert math.isclose(float(x), data[0][0], abs_tol=1e-5)
+            assert math.isclose(float(y), data[0][1], abs_tol=1e-5)
+
+
+def test_svg_blocks_are_used(tmp_path):
+    params = panel_params("rectangle", "circle", "straight", True, hole_blocks="minsert")
+    root = ET.fromstring(_written(params, tmp_path, "svg"))
+    symbols = root.findall(f"{SVG}defs/{SVG}symbol")
+    assert [s.get("id") for s in symbols] == ["HOLE"]
+    uses = root.findall(f"{SVG}g/{SVG}use")
+    assert uses and {u.get(f"{XLINK}href") for u in uses} == {"#HOLE"}
+    full = panel_params("rectangle", "circle", "straight", True)
+    assert len(uses) == sum(layer == "HOLES" for _, layer, _ in entities(full))
+
+
+def _gcode_paths(text):
+    """Punch points and contours ([start, (G-word, x, y, i, j), ...]) of a G-code program."""
+    hits, contours = [], []
+    pos, contour = None, None
+    for line in text.splitlines():
+        words = line.split()
+        if not words or words[0].startswith(("(", "%")):
+            continue
+        coords = {w[0]: float(w[1:]) for w in words[1:]}
+        if words[0] == "G00":
+            pos = (coords["X"], coords["Y"])
+        elif words[0] == "M20":
+            hits.append(pos)
+        elif words[0] == "M21":
+            contour = [pos]
+        elif words[0] == "M22":
+            contours.append(contour)
+            contour = None
+        elif words[0] in ("G01", "G02", "G03"):
+            contour.append((words[0], coords["X"], coords["Y"], coords.get("I"), coords.get("J")))
+    return hits, contours
+
+
+def _near(a, b):
+    return all(math.isclose(u, v, abs_tol=GCODE_TOL) for u, v in zip(a, b))
+
+
+@pytest.mark.parametrize("shape, hole, pattern", [("rectangle", "circle", "straight"),
+                                                   ("circle", "circle", "staggered"),
+                                                   ("circle", "square", "straight")])
+def test_gcode_contours_follow_the_clipped_loops(shape, hole, pattern, tmp_path):
+    params = panel_params(shape, hole, pattern, True)
+    hits, contours = _gcode_paths(_written(params, tmp_path, "gcode"))
+    ref = entities(params)
+    assert len(hits) == sum(layer == "HOLES" for _, layer, _ in ref)
+    loops = []
+    for kind, layer, data in ref:
+        if layer == "HOLES":
+            continue
+        if kind == "CIRCLE":
+            x, y, r = data
+            loops.append([(x - r, y, 1.0), (x + r, y, 1.0)])
+        else:
+            loops.append(list(data))
+    assert len(contours) == len(loops)
+    arcs = 0
+    for contour, loop in zip(contours, loops):
+        assert _near(contour[0], loop[0])
+        moves = contour[1:]
+        assert len(moves) == len(loop)
+        for k, (word, x, y, i, j) in enumerate(moves):
+            x0, y0, b = loop[k]
+            x1, y1 = loop[(k + 1) % len(loop)][:2]
+            assert _near((x, y), (x1, y1))
+            if not b:
+                assert word == "G01"
+                continue
+            arcs += 1
+            assert word == ("G03" if b > 0 else "G02")
+            # the I/J center is equidistant from both ends, at the bulge arc's radius
+            cx, cy = x0 + i, y0 + j
+            r = math.hypot(x1 - x0, y1 - y0) * (1 + b * b) / (4 * abs(b))
+            assert math.isclose(math.hypot(x0 - cx, y0 - cy), r, abs_tol=2 * GCODE_TOL)
+            assert math.isclose(math.hypot(x1 - cx, y1 - cy), r, abs_tol=2 * GCODE_TOL)
+    if hole == "circle":
+        assert arcs
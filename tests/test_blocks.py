@@ -0,0 +1,45 @@
+# test_blocks.py
+# hole_blocks "insert" / "minsert" expand to the same holes as flat output.
+
+import ezdxf.disassemble
+import pytest
+
+from helpers import CASES, generate_doc, panel_params
+from perfdxf.params import check_params
+
+
+def _holes(doc):
+    """Sorted (layer, x, y) of every hole, block references expanded."""
+    holes = []
+    for e in ezdxf.disassemble.recursive_decompose(doc.modelspace()):
+        if e.dxf.layer == "OUTER":
+            continue
+        layer = "HOLES" if e.dxf.layer == "0" else e.dxf.layer  # block contents sit on layer 0
+        if e.dxftype() == "CIRCLE":
+            holes.append((layer, e.dxf.center.x, e.dxf.center.y))
+        else:
+            pts = [(v[0], v[1]) for v in (e.get_points() if e.dxftype() == "LWPOLYLINE"
+                                          else (v.dxf.location for v in e.vertices))]
+            xs, ys = zip(*pts)
+            holes.append((layer, (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2))
+    return sorted((layer, round(x, 6), round(y, 6)) for layer, x, y in holes)
+
+
+@pytest.mark.parametrize("output_format", ["dxf-stream", "dxf"])
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES)
+@pytest.mark.parametrize("mode", ["insert", "minsert"])
+def test_blocks_expand_to_flat_holes(mode, shape, hole, pattern, keep_clipped, output_format):
+    params = panel_params(shape, hole, pattern, keep_clipped, output_format=output_format)
+    flat = _holes(generate_doc(params))
+    doc = generate_doc(dict(params, hole_blocks=mode))
+    assert "HOLE" in doc.blocks
+    refs = doc.modelspace().query("INSERT")
+    assert len(refs) > 0
+    if mode == "minsert":
+        assert len(refs) < sum(1 for layer, _, _ in flat if layer == "HOLES")
+    assert _holes(doc) == flat
+
+
+def test_unknown_block_mode():
+    with pytest.raises(ValueError, match="hole_blocks must be one of"):
+        check_params(panel_params("rectangle", "circle", "straight", True, hole_blocks="array"))
@@ -0,0 +1,76 @@
+# test_cache.py
+# DXFCache hits, misses and hard-linked outputs.
+
+import io
+import json
+
+import pytest
+
+from helpers import panel_params
+from perfdxf.cache import DXFCache, main
+from perfdxf.generator import generate_dxf
+
+
+def _bytes(params):
+    out = io.BytesIO()
+    generate_dxf(params, out)
+    return out.getvalue()
+
+
+def test_miss_then_hit(tmp_path):
+    cache = DXFCache(tmp_path / "cache")
+    a = panel_params()
+    assert not cache.generate(a, str(tmp_path / "a.dxf"))
+    assert cache.generate(a, str(tmp_path / "b.dxf"))
+    assert (tmp_path / "b.dxf").read_bytes() == _bytes(a)
+    assert cache.stats()["entries"] == 1
+
+
+def test_miss_does_not_write_through_link(tmp_path):
+    cache = DXFCache(tmp_path / "cache")
+    a, b = panel_params(), panel_params(spacing=1.5)
+    out = str(tmp_path / "out.dxf")
+    cache.generate(a, str(tmp_path / "first.dxf"))
+    assert cache.generate(a, out, link=True)
+    assert not cache.generate(b, out, link=True)
+    assert cache.get_bytes(a) == _bytes(a)
+    assert cache.get_bytes(b) == _bytes(b)
+    with open(out, "rb") as f:
+        assert f.read() == _bytes(b)
+
+
+def test_stream_target(tmp_path):
+    cache = DXFCache(tmp_path / "cache")
+    a = panel_params()
+    first, second = io.BytesIO(), io.BytesIO()
+    assert not cache.generate(a, first)
+    assert cache.generate(a, second)
+    assert first.getvalue() == second.getvalue() == _bytes(a)
+
+
+def test_stats_persist_across_instances(tmp_path, capsys):
+    root = tmp_path / "cache"
+    a = panel_params()
+    DXFCache(root).generate(a, str(tmp_path / "a.dxf"))
+    DXFCache(root).generate(a, str(tmp_path / "b.dxf"))
+    DXFCache(root).generate(a, str(tmp_path / "c.dxf"))
+    st = DXFCache(root).stats()
+    assert (st["hits"], st["misses"]) == (0, 0)
+    assert (st["total_hits"], st["total_misses"], st["total_hit_rate"]) == (2, 1, 0.6667)
+    main(["--dir", str(root), "stats"])
+    out = json.loads(capsys.readouterr().out)
+    assert (out["entries"], out["total_hits"], out["total_misses"]) == (1, 2, 1)
+    main(["--dir", str(root), "clear"])
+    assert DXFCache(root).stats()["total_hits"] == 0
+
+
+@pytest.mark.parametrize("output_format, suffix", [("dxf", ".dxf"), ("dxf-binary", ".dxf"), ("svg", ".svg"),
+                                                   ("gcode", ".nc")])
+def test_entry_suffix(tmp_path, output_format, suffix):
+    cache = DXFCache(tmp_path / "cache")
+    params = panel_params(output_format=output_format)
+    cache.generate(params, io.BytesIO())
+    path = cache.lookup(params)
+    assert path.suffix == suffix
+    assert cache.stats()["entries"] == 1
+    assert cache.invalidate(params) == 1
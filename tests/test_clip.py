@@ -0,0 +1,73 @@
+# test_clip.py
+# Closed-form clips against the generator's original Shapely buffer + intersection.
+
+import math
+import random
+
+import pytest
+
+from perfdxf.clip import clip_circle_to_circle, clip_circle_to_rect, clip_square_to_circle, clip_square_to_rect
+from perfdxf.estimate import loop_area
+from perfdxf.outline import flatten
+
+shapely = pytest.importorskip("shapely")
+from shapely.geometry import Point, box  # noqa: E402
+
+HX, HY, R = 6.0, 4.0, 5.0  # usable rectangle half-sizes and circle radius
+H = 0.35  # hole radius or half-side
+RESOLUTION = 512  # buffer segments per quarter circle
+TOL = 1e-4  # area (sq in) and bounds (in) allowed between a polygonized reference and exact arcs
+
+
+def _reference(hole, boundary, x, y):
+    shape = Point(x, y).buffer(H, quad_segs=RESOLUTION) if hole == "circle" else box(x - H, y - H, x + H, y + H)
+    region = box(-HX, -HY, HX, HY) if boundary == "rectangle" else Point(0, 0).buffer(R, quad_segs=RESOLUTION)
+    return shape.intersection(region)
+
+
+def _clip(hole, boundary, x, y):
+    if boundary == "rectangle":
+        fn = clip_circle_to_rect if hole == "circle" else clip_square_to_rect
+        return fn(x, y, H, HX, HY)
+    fn = clip_circle_to_circle if hole == "circle" else clip_square_to_circle
+    return fn(x, y, H, R)
+
+
+def _ring_centers(boundary, n=150, seed=7):
+    """Random centers within reach of the boundary, plus ones on it, touching it and at corners."""
+    rnd = random.Random(seed)
+    reach = H * math.sqrt(2) * 1.05
+    if boundary == "rectangle":
+        pts = []
+        for _ in range(n):
+            side, across = rnd.choice((-1, 1)), rnd.uniform(-reach, reach)
+            if rnd.random() < 0.5:
+                pts.append((side * HX + across, rnd.uniform(-HY - reach, HY + reach)))
+            else:
+                pts.append((rnd.uniform(-HX - reach, HX + reach), side * HY + across))
+        pts += [(HX, 0.0), (0.0, -HY), (HX - H, 1.0), (HX + H, 1.0), (-HX, HY), (HX - H, HY - H), (HX + H, HY + H),
+                (HX - 0.1, -HY + 0.2)]
+        return pts
+    pts = []
+    for _ in range(n):
+        a = rnd.uniform(0.0, 2.0 * math.pi)
+        d = R + rnd.uniform(-reach, reach)
+        pts.append((d * math.cos(a), d * math.sin(a)))
+    pts += [(R, 0.0), (0.0, -R), (R - H, 0.0), (R + H, 0.0), (R / math.sqrt(2), R / math.sqrt(2)),
+            (R - H - 1e-12, 0.0)]
+    return pts
+
+
+@pytest.mark.parametrize("hole", ["circle", "square"])
+@pytest.mark.parametrize("boundary", ["rectangle", "circle"])
+def test_clip_matches_shapely(hole, boundary):
+    for x, y in _ring_centers(boundary):
+        loops = _clip(hole, boundary, x, y)
+        ref = _reference(hole, boundary, x, y)
+        area = sum(loop_area(loop) for loop in loops)
+        assert area == pytest.approx(ref.area, abs=TOL), (x, y)
+        if not loops:
+            continue
+        assert len(loops) == 1 and area > 0.0, (x, y)  # convex pieces, counter-clockwise
+        xs, ys = zip(*flatten(loops[0], tol=1e-7))
+        assert (min(xs), min(ys), max(xs), max(ys)) == pytest.approx(ref.bounds, abs=TOL), (x, y)
@@ -0,0 +1,37 @@
+# test_dxf_stream.py
+# The streaming R12 writer against ezdxf's own document output.
+
+import pytest
+
+from helpers import CASES, assert_same_geometry, generate_doc, panel_params, read_entities
+
+
+def _audited(doc):
+    auditor = doc.audit()
+    assert not auditor.has_errors, [str(e) for e in auditor.errors]
+    return read_entities(doc)
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES)
+def test_stream_matches_ezdxf(shape, hole, pattern, keep_clipped):
+    params = panel_params(shape, hole, pattern, keep_clipped)
+    stream = _audited(generate_doc(params))
+    assert len(stream) > 1
+    assert_same_geometry(_audited(generate_doc(dict(params, output_format="dxf"))), stream)
+
+
+@pytest.mark.parametrize("shape", ["rectangle", "circle"])
+def test_empty_panel(shape):
+    # no hole fits and clipped holes are dropped: only the outline is written
+    params = panel_params(shape, "circle", "straight", False, hole_size=20.0, spacing=30.0)
+    stream = _audited(generate_doc(params))
+    assert [(kind, layer) for kind, layer, _ in stream] == [("POLYLINE" if shape == "rectangle" else "CIRCLE",
+                                                            "OUTER")]
+    assert_same_geometry(_audited(generate_doc(dict(params, output_format="dxf"))), stream)
+
+
+def test_stream_header(tmp_path):
+    doc = generate_doc(panel_params("rectangle", "circle", "straight", True), tmp_path / "panel.dxf")
+    assert doc.dxfversion == "AC1009"
+    assert doc.header["$INSUNITS"] == 1
+    assert {"OUTER", "HOLES", "HOLES-CLIPPED"} <= {layer.dxf.name for layer in doc.layers}
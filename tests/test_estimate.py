@@ -0,0 +1,58 @@
+# test_estimate.py
+# estimate() counts against the counters of a real generate_dxf run.
+
+import io
+
+import ezdxf
+import pytest
+
+from helpers import CASES, panel_params
+from perfdxf.estimate import estimate
+from perfdxf.generator import generate_dxf
+from perfdxf.instrument import Summary
+
+
+def _counted(params):
+    s = Summary()
+    generate_dxf(params, io.BytesIO(), observers=[s])
+    return s.report["counters"]
+
+
+def _assert_counts_match(params):
+    est = estimate(params)
+    counters = _counted(params)
+    assert est["holes_full"] == counters["holes_full"]
+    assert est["holes_clipped"] == counters["holes_clipped"]
+    assert est["holes"] == counters["holes_full"] + counters["holes_clipped"]
+    return est
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES)
+def test_counts_match_generate(shape, hole, pattern, keep_clipped):
+    est = _assert_counts_match(panel_params(shape, hole, pattern, keep_clipped))
+    assert est["holes_full"] > 0
+    assert (est["holes_clipped"] > 0) == keep_clipped
+
+
+@pytest.mark.parametrize("blocks", ["insert", "minsert"])
+def test_counts_match_generate_with_blocks(blocks):
+    _assert_counts_match(panel_params("circle", "circle", "staggered", True, hole_blocks=blocks))
+
+
+@pytest.mark.parametrize("hole, pattern, keep_clipped", [("circle", "staggered", True),
+                                                         ("square", "straight", True),
+                                                         ("circle", "straight", False)])
+def test_outline_counts_match_generate(hole, pattern, keep_clipped, tmp_path):
+    # 12 x 8 plate with one rounded end, a square cutout and a round keep-out
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(-6, -4, 0), (4, -4, 1), (4, 4, 0), (-6, 4, 0)], format="xyb", close=True)
+    msp.add_lwpolyline([(-3, -1), (-1, -1), (-1, 1), (-3, 1)], close=True)
+    msp.add_circle((3, 0), 1.5, dxfattribs={"layer": "KEEPOUT"})
+    path = tmp_path / "outline.dxf"
+    doc.saveas(path)
+    params = panel_params("outline", hole, pattern, keep_clipped, outline_path=str(path),
+                          keepout_layer="KEEPOUT")
+    est = _assert_counts_match(params)
+    assert est["holes_full"] > 0
+    assert (est["holes_clipped"] > 0) == keep_clipped
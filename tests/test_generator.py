@@ -0,0 +1,53 @@
+# test_generator.py
+# generate_dxf end to end: cancellation, output cleanup and parallel tiles.
+
+import io
+
+import pytest
+
+from helpers import panel_params
+from perfdxf.generator import CHUNK, Panel, generate_dxf
+from perfdxf.instrument import Cancelled, Observer
+from perfdxf.params import OUTPUT_FORMATS
+
+
+class _CancelAt(Observer):
+    def __init__(self, phase):
+        self.phase = phase
+
+    def on_phase(self, name, start, seconds):
+        if name == self.phase:
+            raise Cancelled()
+
+
+@pytest.mark.parametrize("output_format", list(OUTPUT_FORMATS))
+@pytest.mark.parametrize("phase", ["setup", "save"])
+def test_cancel_leaves_no_output(tmp_path, output_format, phase):
+    path = tmp_path / "panel.out"
+    with pytest.raises(Cancelled):
+        generate_dxf(panel_params("circle", output_format=output_format), str(path), observers=[_CancelAt(phase)])
+    assert not path.exists()
+
+
+def test_finished_run_keeps_output(tmp_path):
+    path = tmp_path / "panel.dxf"
+    generate_dxf(panel_params("circle"), str(path), observers=[_CancelAt("no such phase")])
+    assert path.read_bytes().endswith(b"EOF\n")
+
+
+@pytest.mark.parametrize("shape, hole, pattern, options", [
+    ("rectangle", "circle", "straight", {}),
+    ("rectangle", "square", "staggered", {"keep_clipped": False}),
+    ("circle", "circle", "staggered", {"hole_blocks": "insert"}),
+    ("circle", "square", "straight", {"symmetry": True}),
+    ("circle", "circle", "straight", {"hole_blocks": "minsert"}),
+])
+def test_parallel_matches_serial(shape, hole, pattern, options):
+    # more than CHUNK lattice centers, so the pool gets several tiles
+    params = panel_params(shape, hole, pattern, **dict(dict(outer_length=28, outer_width=28, outer_diameter=28,
+                                                            hole_size=0.06, spacing=0.1), **options))
+    assert len(Panel(params).lattice) > CHUNK
+    serial, parallel = io.BytesIO(), io.BytesIO()
+    generate_dxf(params, serial)
+    generate_dxf(params, parallel, workers=2)
+    assert parallel.getvalue() == serial.getvalue()
@@ -0,0 +1,46 @@
+# test_grid.py
+# Lattice classification against the generator's original per-hole rules.
+
+import io
+import math
+
+import pytest
+
+from helpers import panel_params
+from perfdxf.generator import Panel, generate_dxf
+from perfdxf.grid import FULL, CLIPPED
+from perfdxf.instrument import Summary
+
+GRID = dict(outer_diameter=25.875, hole_size=0.7, spacing=1.1)
+
+
+@pytest.mark.parametrize("pattern", ["straight", "staggered"])
+@pytest.mark.parametrize("size, spacing", [(0.7, 1.1), (1.0, 2.0), (0.5, 0.8)])
+def test_circle_square_full_uses_circumradius(pattern, size, spacing):
+    panel = Panel(panel_params("circle", "square", pattern, False, **dict(GRID, hole_size=size, spacing=spacing)))
+    xs, ys = panel.lattice.centers()
+    codes = panel.classify(xs, ys)
+    radius = panel.bounds[0]
+    r_sq = size * math.sqrt(2) / 2.0
+    expected = [math.hypot(x, y) <= radius - r_sq for x, y in zip(xs.tolist(), ys.tolist())]
+    assert (codes == FULL).tolist() == expected
+
+
+def test_circle_square_clipped_holes_overlap():
+    panel = Panel(panel_params("circle", "square", "staggered", True, **GRID))
+    xs, ys = panel.lattice.centers()
+    at = panel.classify(xs, ys) == CLIPPED
+    assert at.any()
+    for x, y in zip(xs[at].tolist(), ys[at].tolist()):
+        assert panel.clip(x, y), (x, y)
+
+
+def test_circle_square_staggered_counts():
+    s = Summary()
+    params = panel_params("circle", "square", "staggered", False, **GRID)
+    generate_dxf(params, io.BytesIO(), observers=[s])
+    xs, ys = Panel(params).lattice.centers()
+    r_sq = 0.7 * math.sqrt(2) / 2.0
+    radius = params["outer_diameter"] / 2 - params["offset"]
+    expected = sum(math.hypot(x, y) <= radius - r_sq for x, y in zip(xs.tolist(), ys.tolist()))
+    assert s.report["counters"]["holes_full"] == expected
@@ -0,0 +1,35 @@
+# test_gui_job.py
+# The GUI's background job (no window needed): output only appears when finished.
+
+import queue
+
+import pytest
+
+from helpers import panel_params
+
+gui = pytest.importorskip("perf_dxf_gui")  # needs tkinter, not a display
+
+
+class _CancelOnSave(gui._Job):
+    def on_phase(self, name, start, seconds):
+        if name == "save":
+            self.cancelled.set()
+        super().on_phase(name, start, seconds)
+
+
+def test_job_writes_target(tmp_path):
+    path = tmp_path / "panel.dxf"
+    job = gui._Job(panel_params("rectangle", "circle", "straight", True), str(path), False, queue.Queue())
+    assert job.run() is False
+    assert path.read_bytes().endswith(b"EOF\n")
+    assert [p.name for p in tmp_path.iterdir()] == ["panel.dxf"]
+
+
+@pytest.mark.parametrize("output_format", ["dxf", "dxf-stream"])
+def test_cancel_while_saving_leaves_nothing(tmp_path, output_format):
+    path = tmp_path / "panel.dxf"
+    job = _CancelOnSave(panel_params("circle", "square", "staggered", True, output_format=output_format),
+                        str(path), False, queue.Queue())
+    with pytest.raises(gui.Cancelled):
+        job.run()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,43 @@
+# test_memo.py
+# clip_memo=True must draw the same geometry as clipping every hole directly.
+
+import pytest
+
+from helpers import CASES, assert_same_geometry, entities, panel_params
+from perfdxf.generator import Panel
+from perfdxf.grid import CLIPPED
+from perfdxf.memo import ClipMemo
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES)
+def test_memo_matches_default(shape, hole, pattern, keep_clipped):
+    params = panel_params(shape, hole, pattern, keep_clipped)
+    assert_same_geometry(entities(params), entities(dict(params, clip_memo=True)))
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES[::2])
+def test_memo_with_symmetry_matches_default(shape, hole, pattern, keep_clipped):
+    params = panel_params(shape, hole, pattern, keep_clipped)
+    assert_same_geometry(entities(params), entities(dict(params, clip_memo=True, symmetry=True)))
+
+
+@pytest.mark.parametrize("shape, hole", [("rectangle", "circle"), ("circle", "circle"), ("circle", "square")])
+def test_memo_hits(shape, hole):
+    panel = Panel(panel_params(shape, hole, "straight", True))
+    xs, ys = panel.lattice.centers()
+    at = panel.classify(xs, ys) == CLIPPED
+    memo = ClipMemo(panel)
+    for x, y in zip(xs[at].tolist(), ys[at].tolist()):
+        memo.clip(x, y)
+    assert memo.hits + memo.misses == int(at.sum())
+    assert memo.hits > 0
+
+
+def test_memo_is_bounded():
+    panel = Panel(panel_params("circle", "square", "staggered", True))
+    xs, ys = panel.lattice.centers()
+    at = panel.classify(xs, ys) == CLIPPED
+    memo = ClipMemo(panel, maxsize=4)
+    for x, y in zip(xs[at].tolist(), ys[at].tolist()):
+        memo.clip(x, y)
+    assert len(memo._protos) == 4
@@ -0,0 +1,60 @@
+# test_optimize.py
+# The spec optimizer: every candidate it ranks as meeting the targets does.
+
+import pytest
+
+from perfdxf.generator import Panel
+from perfdxf.optimize import TOLERANCE, search
+
+shapely = pytest.importorskip("shapely")
+
+BASES = {
+    "rectangle": dict(shape_choice="rectangle", outer_length=24.0, outer_width=12.0, offset=0.125),
+    "circle": dict(shape_choice="circle", outer_diameter=20.0, offset=0.125),
+}
+
+
+def _web(params):
+    """Narrowest gap between a hole and its lattice neighbours, measured with Shapely."""
+    lattice = Panel(params).lattice
+    h = params["hole_size"] / 2.0
+
+    def hole(x, y):
+        if params["hole_shape_choice"] == "circle":
+            return shapely.Point(x, y).buffer(h, quad_segs=256)
+        return shapely.box(x - h, y - h, x + h, y + h)
+
+    s = lattice.step
+    neighbours = [(s, 0.0), (lattice.stagger or s, lattice.row_step), (lattice.stagger - s, lattice.row_step)]
+    return min(hole(0.0, 0.0).distance(hole(x, y)) for x, y in neighbours)
+
+
+@pytest.mark.parametrize("allow_clipped", [True, False])
+@pytest.mark.parametrize("hole", ["circle", "square"])
+@pytest.mark.parametrize("shape", ["rectangle", "circle"])
+def test_candidates_meet_the_targets(shape, hole, allow_clipped):
+    min_web, max_holes = 0.125, 600
+    ranked = search(dict(BASES[shape], hole_shape_choice=hole), 35.0, min_web=min_web, max_holes=max_holes,
+                    allow_clipped=allow_clipped, workers=1)
+    meeting = [c for c in ranked if c["meets_targets"]]
+    assert len(meeting) >= 5
+    # specs meeting every target are ranked first
+    assert [c["meets_targets"] for c in ranked] == sorted((c["meets_targets"] for c in ranked), reverse=True)
+    for c in meeting:
+        assert abs(c["open_area_pct"] - 35.0) <= TOLERANCE
+        assert c["holes"] <= max_holes
+        assert c["web_width"] >= min_web
+    for c in ranked:
+        assert c["web_width"] == pytest.approx(_web(c["params"]), abs=1e-4)
+        assert c["params"]["keep_clipped"] == allow_clipped
+        if not allow_clipped:
+            assert c["holes_clipped"] == 0
+        assert c["meets_targets"] == (abs(c["open_area_pct"] - 35.0) <= TOLERANCE and c["holes"] <= max_holes
+                                      and c["web_width"] >= min_web)
+
+
+def test_tight_hole_count_is_reported():
+    ranked = search(dict(BASES["rectangle"], hole_shape_choice="circle"), 40.0, max_holes=150, workers=1)
+    for c in ranked:
+        assert ("holes" in c["missed"]) == (c["holes"] > 150)
+    assert any("holes" in c["missed"] for c in ranked)
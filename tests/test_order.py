@@ -0,0 +1,67 @@
+# test_order.py
+# Cut orders are permutations of the holes and don't change what is cut.
+
+import io
+
+import numpy as np
+import pytest
+
+from helpers import generate_doc, panel_params, read_entities
+from perfdxf.generator import Panel, generate_dxf
+from perfdxf.grid import OUTSIDE
+from perfdxf.instrument import Summary
+from perfdxf.order import cut_order, nearest_neighbor, travel, two_opt
+from perfdxf.params import CUT_ORDERS
+
+ORDERS = [m for m in CUT_ORDERS if m != "lattice"]
+
+
+def _holes(shape, pattern):
+    panel = Panel(panel_params(shape, "circle", pattern, True))
+    xs, ys = panel.lattice.centers()
+    keep = panel.classify(xs, ys) != OUTSIDE
+    return panel.lattice, xs[keep], ys[keep]
+
+
+def _key(entity):
+    kind, layer, data = entity
+    if kind == "POLYLINE":
+        return kind, layer, tuple(tuple(round(v, 9) for v in p) for p in data)
+    return kind, layer, tuple(round(v, 9) for v in data)
+
+
+@pytest.mark.parametrize("method", ORDERS)
+@pytest.mark.parametrize("shape, pattern", [("rectangle", "straight"), ("circle", "staggered")])
+def test_order_is_a_permutation(method, shape, pattern):
+    lattice, xs, ys = _holes(shape, pattern)
+    perm = cut_order(method, xs, ys, lattice)
+    assert sorted(perm.tolist()) == list(range(len(xs)))
+
+
+@pytest.mark.parametrize("shape, pattern", [("rectangle", "straight"), ("circle", "staggered")])
+def test_two_opt_never_lengthens(shape, pattern):
+    lattice, xs, ys = _holes(shape, pattern)
+    path = nearest_neighbor(xs, ys, lattice.step)
+    before = travel(xs, ys, path)
+    assert travel(xs, ys, two_opt(xs, ys, path.copy())) <= before + 1e-9
+    shuffled = np.random.default_rng(5).permutation(len(xs))
+    assert travel(xs, ys, two_opt(xs, ys, shuffled.copy())) <= travel(xs, ys, shuffled) + 1e-9
+
+
+@pytest.mark.parametrize("method", ORDERS)
+@pytest.mark.parametrize("shape, hole, pattern", [("rectangle", "square", "staggered"),
+                                                 ("circle", "circle", "straight")])
+def test_order_writes_the_same_entities(method, shape, hole, pattern):
+    params = panel_params(shape, hole, pattern, True)
+    lattice_order = read_entities(generate_doc(params))
+    ordered = read_entities(generate_doc(dict(params, cut_order=method)))
+    assert sorted(map(_key, ordered)) == sorted(map(_key, lattice_order))
+    assert ordered != lattice_order
+
+
+@pytest.mark.parametrize("shape, pattern", [("rectangle", "straight"), ("circle", "staggered")])
+def test_nn_reports_shorter_travel(shape, pattern):
+    s = Summary()
+    generate_dxf(panel_params(shape, "circle", pattern, True, cut_order="nn"), io.BytesIO(), observers=[s])
+    counters = s.report["counters"]
+    assert counters["travel_after"] <= counters["travel_before"]
@@ -0,0 +1,146 @@
+# test_outline.py
+# Outlines read from DXF: contour chaining, even-odd nesting, keep-outs, OCS, classify/clip.
+
+import math
+import random
+
+import ezdxf
+import pytest
+
+from helpers import entities, panel_params
+from perfdxf.estimate import loop_area
+from perfdxf.grid import CLIPPED, FULL, OUTSIDE
+from perfdxf.outline import OutlineRegion, _even_odd, flatten, read_outline
+
+shapely = pytest.importorskip("shapely")
+
+
+def _save(tmp_path, draw, name="outline.dxf"):
+    doc = ezdxf.new()
+    draw(doc.modelspace())
+    path = tmp_path / name
+    doc.saveas(path)
+    return str(path)
+
+
+def _square(msp, half, cx=0.0, cy=0.0, layer="0"):
+    msp.add_lwpolyline([(cx - half, cy - half), (cx + half, cy - half), (cx + half, cy + half),
+                        (cx - half, cy + half)], close=True, dxfattribs={"layer": layer})
+
+
+def _bounds(loop):
+    xs, ys = zip(*flatten(loop, tol=1e-6))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def test_lines_and_arcs_chain_into_a_loop(tmp_path):
+    # 10 x 6 slot with round ends, drawn as loose LINE/ARC pieces, one line reversed
+    def draw(msp):
+        msp.add_line((0, -3), (10, -3))
+        msp.add_arc((10, 0), 3, -90, 90)
+        msp.add_line((0, 3), (10, 3))  # runs against the loop direction
+        msp.add_arc((0, 0), 3, 90, 270)
+        msp.add_line((20, 20), (25, 20))  # dangling construction line, ignored
+
+    loops, keepouts = read_outline(_save(tmp_path, draw))
+    assert len(loops) == 1 and keepouts == []
+    assert abs(loop_area(loops[0])) == pytest.approx(60.0 + 9.0 * math.pi, abs=1e-9)
+    assert _bounds(loops[0]) == pytest.approx((-3.0, -3.0, 13.0, 3.0), abs=1e-5)
+
+
+def test_no_closed_outline(tmp_path):
+    with pytest.raises(ValueError, match="No closed outline"):
+        read_outline(_save(tmp_path, lambda msp: msp.add_line((0, 0), (1, 0))))
+
+
+def test_even_odd_nesting(tmp_path):
+    # outer 20 x 20, a 10 x 10 cutout, and a 4 x 4 island inside the cutout
+    def draw(msp):
+        _square(msp, 10.0)
+        _square(msp, 5.0)
+        _square(msp, 2.0)
+
+    loops, _ = read_outline(_save(tmp_path, draw))
+    assert _even_odd(loops).area == pytest.approx(400.0 - 100.0 + 16.0)
+    region = OutlineRegion(loops, [], 0.0, "circle", 0.5, 1.0)
+    codes = region.classify([0.0, 3.5, 7.5, 11.0], [0.0, 0.0, 0.0, 0.0])
+    assert codes.tolist() == [FULL, OUTSIDE, FULL, OUTSIDE]
+
+
+def test_keepout_layer(tmp_path):
+    def draw(msp):
+        _square(msp, 10.0)
+        msp.add_circle((4, 4), 2, dxfattribs={"layer": "KEEPOUT"})
+        _square(msp, 1.0, -6, -6, layer="NOTES")
+
+    path = _save(tmp_path, draw)
+    loops, keepouts = read_outline(path, keepout_layer="KEEPOUT")
+    assert len(loops) == 2 and len(keepouts) == 1
+    loops, keepouts = read_outline(path, layer="0", keepout_layer="KEEPOUT")
+    assert len(loops) == 1 and len(keepouts) == 1
+    region = OutlineRegion(loops, keepouts, 0.0, "square", 0.5, 1.0)
+    assert region.area.area == pytest.approx(400.0 - 4.0 * math.pi, abs=1e-2)
+    assert region.classify([4.0, 4.0, -4.0], [4.0, 2.0, -4.0]).tolist() == [OUTSIDE, CLIPPED, FULL]
+
+
+def test_mirrored_ocs(tmp_path):
+    # each entity drawn with extrusion (0, 0, -1): OCS x is WCS -x, arcs turn the other way
+    mirrored = {"extrusion": (0, 0, -1)}
+
+    def draw(msp):
+        # upper half disk at x = 20: OCS arc 0..180 deg about (-20, 0), closed by a WCS line
+        msp.add_arc((-20, 0), 2, 0, 180, dxfattribs=mirrored)
+        msp.add_line((18, 0), (22, 0))
+        msp.add_circle((3, 1), 1, dxfattribs=mirrored)
+        # OCS half disk below the chord (1, 0) -> (5, 0)
+        msp.add_lwpolyline([(1, 0, 1.0), (5, 0, 0.0)], format="xyb", close=True, dxfattribs=mirrored)
+
+    loops, _ = read_outline(_save(tmp_path, draw))
+    found = sorted((round(abs(loop_area(loop)), 9), tuple(round(v, 5) for v in _bounds(loop))) for loop in loops)
+    half = round(2.0 * math.pi, 9)
+    assert found == sorted([
+        (half, (18.0, 0.0, 22.0, 2.0)),
+        (round(math.pi, 9), (-4.0, 0.0, -2.0, 2.0)),
+        (half, (-5.0, -2.0, -1.0, 0.0)),
+    ])
+
+
+@pytest.mark.parametrize("hole", ["circle", "square"])
+def test_classify_and_clip_near_boundary(tmp_path, hole):
+    # plate with a round cutout and a notch; holes scattered around both boundaries
+    def draw(msp):
+        msp.add_lwpolyline([(0, 0), (12, 0), (12, 8), (7, 8), (6, 6), (5, 8), (0, 8)], close=True)
+        msp.add_circle((4, 4), 1.5)
+
+    loops, _ = read_outline(_save(tmp_path, draw))
+    h = 0.3
+    region = OutlineRegion(loops, [], 0.2, hole, 2 * h, 0.7)
+    rnd = random.Random(3)
+    xs = [rnd.uniform(-0.5, 12.5) for _ in range(400)]
+    ys = [rnd.uniform(-0.5, 8.5) for _ in range(400)]
+    codes = region.classify(xs, ys).tolist()
+    assert {FULL, CLIPPED, OUTSIDE} <= set(codes)
+    for x, y, code in zip(xs, ys, codes):
+        shape = shapely.Point(x, y).buffer(h, quad_segs=64) if hole == "circle" else shapely.box(x - h, y - h,
+                                                                                                  x + h, y + h)
+        ref = shape.intersection(region.area).area
+        if code == FULL:
+            assert ref == pytest.approx(shape.area, abs=1e-3), (x, y)
+        elif code == OUTSIDE:
+            assert ref == pytest.approx(0.0, abs=1e-3), (x, y)
+        else:
+            got = sum(loop_area(loop) for loop in region.clip(x, y))
+            assert got == pytest.approx(ref, abs=1e-3), (x, y)
+
+
+def test_outline_panel_output(tmp_path):
+    def draw(msp):
+        _square(msp, 10.0)
+        _square(msp, 3.0)
+        msp.add_circle((6, 6), 2, dxfattribs={"layer": "KEEPOUT"})
+
+    params = panel_params("outline", "circle", "staggered", True, outline_path=_save(tmp_path, draw),
+                          keepout_layer="KEEPOUT")
+    layers = [layer for _, layer, _ in entities(params)]
+    assert layers.count("OUTER") == 2  # outline and cutout; the keep-out is not cut
+    assert layers.count("HOLES") > 0 and layers.count("HOLES-CLIPPED") > 0
@@ -0,0 +1,46 @@
+# test_params.py
+# check_params on incomplete and string-typed input (manifests, service requests).
+
+import pytest
+
+from helpers import panel_raw
+from perfdxf.params import check_params
+
+
+def _raw(**kw):
+    """panel_raw() with every value as a string, as read from a CSV manifest or form."""
+    return {k: v if isinstance(v, bool) else str(v) for k, v in panel_raw(**kw).items()}
+
+
+def test_strings_are_normalized():
+    params = check_params(_raw(keep_clipped="true"))
+    assert params["offset"] == 0.125 and params["hole_size"] == 0.45 and params["spacing"] == 0.7
+    assert params["outer_length"] == 13.3 and params["keep_clipped"] is True
+    assert "outer_diameter" not in params
+
+
+@pytest.mark.parametrize("key, name", [("offset", "Offset"), ("hole_size", "Hole size"), ("spacing", "Spacing"),
+                                       ("keep_clipped", "Keep clipped"), ("outer_length", "Length"),
+                                       ("outer_width", "Width")])
+def test_missing_field_is_required(key, name):
+    with pytest.raises(ValueError, match=f"^{name} is required"):
+        check_params(_raw(**{key: None}))
+    with pytest.raises(ValueError, match=f"^{name} is required"):
+        check_params(_raw(**{key: " "}))
+
+
+def test_missing_diameter_is_required():
+    with pytest.raises(ValueError, match="^Diameter is required"):
+        check_params(_raw(shape="circle", outer_diameter=None))
+
+
+@pytest.mark.parametrize("value, expected", [("false", False), ("no", False), ("0", False), ("No", False),
+                                             ("yes", True), ("1", True), ("True", True), (False, False),
+                                             (True, True)])
+def test_keep_clipped_flag(value, expected):
+    assert check_params(_raw(keep_clipped=value))["keep_clipped"] is expected
+
+
+def test_bad_number():
+    with pytest.raises(ValueError, match="^Spacing must be a number"):
+        check_params(_raw(spacing="wide"))
@@ -0,0 +1,131 @@
+# test_service.py
+# The generation service over HTTP: replies, coalescing keys and bad requests.
+
+import http.client
+import io
+import json
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from helpers import panel_raw
+from perfdxf.generator import generate_dxf
+from perfdxf.params import check_params
+from perfdxf.service import Client, GenerationService, ServiceError, make_server
+
+SPEC = panel_raw()
+
+
+@pytest.fixture(scope="module")
+def client():
+    service = GenerationService(workers=1)
+    server = make_server(service, 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    c = Client(server.server_address[1], timeout=60)
+    yield c
+    c.close()
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_generate(client):
+    out = io.BytesIO()
+    headers = client.generate(SPEC, out)
+    expected = io.BytesIO()
+    generate_dxf(check_params(SPEC), expected)
+    assert out.getvalue() == expected.getvalue()
+    assert headers["X-Perfdxf-Cache"] == "miss"
+
+
+@pytest.mark.parametrize("key, message", [("offset", "Offset is required."), ("hole_size", "Hole size is required."),
+                                          ("spacing", "Spacing is required."),
+                                          ("keep_clipped", "Keep clipped is required.")])
+def test_incomplete_payload_is_400(client, key, message):
+    with pytest.raises(ServiceError) as e:
+        client.generate({k: v for k, v in SPEC.items() if k != key}, io.BytesIO())
+    assert e.value.status == 400
+    assert message in str(e.value)
+    # the connection and the server are still usable
+    client.generate(SPEC, io.BytesIO())
+
+
+@pytest.mark.parametrize("body", [dict(SPEC, spacing=[1]), dict(SPEC, output_format=["dxf"]),
+                                  dict(SPEC, shape_choice="hexagon")])
+def test_invalid_payload_is_400(client, body):
+    with pytest.raises(ServiceError) as e:
+        client.generate(body, io.BytesIO())
+    assert e.value.status == 400
+
+
+def test_non_object_is_400(client):
+    with pytest.raises(ServiceError) as e:
+        client.generate([SPEC], io.BytesIO())
+    assert e.value.status == 400
+    assert client.metrics()["errors"] >= 1
+
+
+def test_dead_worker_fails_only_its_job():
+    service = GenerationService(workers=1)
+    server = make_server(service, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        # a panel big enough to still be generating when its worker is killed
+        slow = dict(SPEC, outer_length=48.0, outer_width=48.0, hole_size=0.03, spacing=0.05)
+        errors = []
+
+        def run():
+            c = Client(port, timeout=60)
+            try:
+                c.generate(slow, io.BytesIO())
+            except ServiceError as e:
+                errors.append(e)
+            finally:
+                c.close()
+
+        t = threading.Thread(target=run)
+        t.start()
+        deadline = time.monotonic() + 30
+        while not service.status()["running"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        broken = service.pool
+        for pid in list(broken._processes):
+            os.kill(pid, signal.SIGKILL)
+        t.join(60)
+        assert [e.status for e in errors] == [500]
+        assert "BrokenProcessPool" in str(errors[0])
+
+        c = Client(port, timeout=60)
+        out = io.BytesIO()
+        c.generate(SPEC, out)
+        c.close()
+        expected = io.BytesIO()
+        generate_dxf(check_params(SPEC), expected)
+        assert out.getvalue() == expected.getvalue()
+        assert service.pool is not broken
+        assert service.status()["in_flight"] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def test_unknown_post_keeps_the_connection(client):
+    conn = http.client.HTTPConnection("127.0.0.1", client._conn.port, timeout=60)
+    try:
+        conn.request("POST", "/nope", body=json.dumps(SPEC).encode("utf-8"),
+                     headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        assert resp.status == 404
+        resp.read()
+        conn.request("GET", "/health")
+        resp = conn.getresponse()
+        assert (resp.status, resp.read()) == (200, b"ok\n")
+    finally:
+        conn.close()
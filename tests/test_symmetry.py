@@ -0,0 +1,35 @@
+# test_symmetry.py
+# symmetry=True must draw the same geometry as clipping every hole directly.
+
+import pytest
+
+from helpers import CASES, assert_same_geometry, entities, panel_params
+from perfdxf.generator import Panel
+from perfdxf.grid import CLIPPED
+from perfdxf.symmetry import Symmetry, reflect_loop
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES)
+def test_symmetry_matches_default(shape, hole, pattern, keep_clipped):
+    params = panel_params(shape, hole, pattern, keep_clipped)
+    assert_same_geometry(entities(params), entities(dict(params, symmetry=True)))
+
+
+@pytest.mark.parametrize("shape, hole, pattern, keep_clipped", CASES[::2])
+def test_symmetry_reuses_clips(shape, hole, pattern, keep_clipped):
+    panel = Panel(panel_params(shape, hole, pattern, keep_clipped))
+    xs, ys = panel.lattice.centers()
+    at = (panel.classify(xs, ys) == CLIPPED).nonzero()[0]
+    sym = Symmetry(panel)
+    sym.clip(at, list(zip(xs[at].tolist(), ys[at].tolist())))
+    assert sym.calls + sym.reused == len(at)
+    assert sym.calls < len(at)
+
+
+def test_reflect_loop_keeps_arcs():
+    # half disk right of the y axis: arc from (0, -1) to (0, 1), then the diameter back
+    loop = [(0.0, -1.0, 1.0), (0.0, 1.0, 0.0)]
+    # mirrored in x: the arc now runs (0, 1) -> (0, -1) through (-1, 0)
+    assert reflect_loop(loop, False, -1, 1) == [(0.0, 1.0, 1.0), (0.0, -1.0, 0.0)]
+    # x and y swapped: the arc now runs (1, 0) -> (-1, 0) through (0, 1)
+    assert reflect_loop(loop, True, 1, 1) == [(1.0, 0.0, 1.0), (-1.0, 0.0, 0.0)]